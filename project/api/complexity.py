@@ -0,0 +1,97 @@
+"""
+Word complexity scoring.
+
+A word's difficulty combines three features, each computed with NumPy over
+the whole dictionary at once:
+
+* letter rarity: mean -log frequency of its letters in the dictionary;
+* diacritics: how many of Ą Č Ę Ė Į Š Ų Ū Ž it uses;
+* splitting: averaged over a fixed sample of probe guesses, the share of the
+  dictionary that gets the same feedback pattern as the word, i.e. how many
+  candidates are still left after guessing the probe. Probes are scored in
+  batches spread over a process pool.
+
+Features are standardized and summed, and the sum is ranked into
+``COMPLEXITY_LEVELS`` equally sized levels (1 = easiest).
+"""
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+import numpy as np
+
+from api.scoring import ALPHABET, PATTERN_COUNT, encode_words, score_many
+
+COMPLEXITY_LEVELS = 10
+DIACRITICS = 'ĄČĘĖĮŠŲŪŽ'
+
+_DIACRITIC_MASK = np.array([letter in DIACRITICS for letter in ALPHABET], dtype=np.uint8)
+
+
+def letter_rarity(encoded):
+    counts = np.bincount(encoded.ravel(), minlength=len(ALPHABET)).astype(np.float64)
+    rarity = -np.log((counts + 1) / (counts.sum() + len(ALPHABET)))
+    return rarity[encoded].mean(axis=1)
+
+
+def diacritic_counts(encoded):
+    return _DIACRITIC_MASK[encoded].sum(axis=1)
+
+
+def remaining_candidates(probes, encoded, batch_size=64):
+    """
+    Returns, for every word, the summed number of words sharing its feedback
+    pattern over all probes.
+    """
+    totals = np.zeros(len(encoded), dtype=np.float64)
+    for start in range(0, len(probes), batch_size):
+        codes = score_many(probes[start:start + batch_size], encoded).astype(np.intp)
+        offsets = np.arange(len(codes))[:, None] * PATTERN_COUNT
+        counts = np.bincount((codes + offsets).ravel(), minlength=len(codes) * PATTERN_COUNT)
+        totals += counts[codes + offsets].sum(axis=0)
+    return totals
+
+
+def split_scores(encoded, probes, workers=1):
+    """
+    Mean share of the dictionary left after each probe guess, computed over
+    `workers` processes.
+    """
+    if workers <= 1 or len(probes) < 2 * workers:
+        totals = remaining_candidates(probes, encoded)
+    else:
+        chunks = np.array_split(probes, workers)
+        with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as pool:
+            totals = sum(pool.map(remaining_candidates, chunks, [encoded] * len(chunks)))
+    return totals / (len(probes) * len(encoded))
+
+
+def standardize(values):
+    values = values.astype(np.float64)
+    spread = values.std()
+    return (values - values.mean()) / spread if spread else np.zeros_like(values)
+
+
+def difficulty(words, probe_count=256, workers=1, seed=0):
+    """
+    Returns the raw difficulty of every word; higher is harder.
+    """
+    encoded = encode_words(words)
+    rng = random.Random(seed)
+    probes = encoded[sorted(rng.sample(range(len(encoded)), min(probe_count, len(encoded))))]
+    return (
+        standardize(letter_rarity(encoded))
+        + standardize(diacritic_counts(encoded))
+        + standardize(split_scores(encoded, probes, workers))
+    )
+
+
+def complexity_levels(scores, levels=COMPLEXITY_LEVELS):
+    """
+    Ranks scores into levels 1..levels of (nearly) equal size.
+    """
+    if not len(scores):
+        return np.zeros(0, dtype=np.int64)
+    ranks = np.empty(len(scores), dtype=np.int64)
+    ranks[np.argsort(scores, kind='stable')] = np.arange(len(scores))
+    return ranks * levels // len(scores) + 1
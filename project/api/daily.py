@@ -0,0 +1,164 @@
+"""
+Daily word schedule.
+
+Each calendar day (in ``TIME_ZONE``) gets one word from ``dictionary_words``.
+Days are assigned to complexity strata by smooth weighted round-robin, so
+every complexity level shows up in proportion to its share of the
+dictionary and is spread evenly over time, and a word is not repeated within
+``DAILY_WORD_REPEAT_WINDOW`` days. The schedule is precomputed
+``DAILY_WORD_DAYS_AHEAD`` days ahead into ``daily_words``; existing days are
+never rewritten, so every worker reads the same word, and workers keep the
+rows they have read in a dict keyed by date.
+"""
+import datetime
+import random
+from collections import deque
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+
+from api.models import DailyWord, DictionaryWord
+from api.validation import WORD_LENGTH, normalize_word
+
+
+def days_ahead():
+    return getattr(settings, 'DAILY_WORD_DAYS_AHEAD', 120)
+
+
+def repeat_window():
+    return getattr(settings, 'DAILY_WORD_REPEAT_WINDOW', 365)
+
+
+def load_strata():
+    """
+    Returns {complexity: [word, ...]} for the words a game can use.
+    """
+    strata = {}
+    for word, complexity in DictionaryWord.objects.values_list('word_text', 'complexity').iterator(chunk_size=10000):
+        if len(normalize_word(word)) == WORD_LENGTH:
+            strata.setdefault(complexity, []).append(word)
+    for words in strata.values():
+        words.sort()
+    return strata
+
+
+def generate_schedule(strata, days, recent=(), window=365, rng=random):
+    """
+    Returns [(word, complexity), ...] for `days` consecutive days.
+
+    recent: words of the days right before the first one, oldest first.
+    """
+    total = sum(len(words) for words in strata.values())
+    if not total:
+        return []
+
+    recent = deque(recent, maxlen=window or None)
+    recent_set = set(recent)
+    credit = dict.fromkeys(strata, 0)
+    schedule = []
+    for _ in range(days):
+        for complexity, words in strata.items():
+            credit[complexity] += len(words)
+        complexity = max(credit, key=lambda level: (credit[level], -level))
+        credit[complexity] -= total
+
+        word = pick_word(strata[complexity], recent_set, rng)
+        if word is None:
+            # Every word of the stratum was used within the window; reuse the oldest
+            stratum = set(strata[complexity])
+            word = next(word for word in recent if word in stratum)
+        if window:
+            if len(recent) == recent.maxlen:
+                recent_set.discard(recent[0])
+            recent.append(word)
+            recent_set.add(word)
+        schedule.append((word, complexity))
+    return schedule
+
+
+def pick_word(words, excluded, rng, attempts=8):
+    for _ in range(attempts):
+        word = words[rng.randrange(len(words))]
+        if word not in excluded:
+            return word
+    candidates = [word for word in words if word not in excluded]
+    return rng.choice(candidates) if candidates else None
+
+
+def schedule_daily_words(start=None, days=None, window=None, rng=random):
+    """
+    Fills in missing days of the schedule from `start` (default: today) and
+    returns the number of days added. Days already scheduled are kept.
+    """
+    start = start or timezone.localdate()
+    days = days_ahead() if days is None else days
+    window = repeat_window() if window is None else window
+
+    scheduled = dict(
+        DailyWord.objects.filter(date__gte=start - datetime.timedelta(days=window))
+        .values_list('date', 'word_text')
+    )
+    missing_from = start
+    while missing_from in scheduled and missing_from < start + datetime.timedelta(days=days):
+        missing_from += datetime.timedelta(days=1)
+    count = (start + datetime.timedelta(days=days) - missing_from).days
+    if count <= 0:
+        return 0
+
+    recent = [word for date, word in sorted(scheduled.items()) if date < missing_from]
+    upcoming = {word for date, word in scheduled.items() if date >= missing_from}
+    schedule = generate_schedule(load_strata(), count, recent + sorted(upcoming), window, rng)
+    created = DailyWord.objects.bulk_create(
+        [
+            DailyWord(date=missing_from + datetime.timedelta(days=offset), word_text=word, complexity=complexity)
+            for offset, (word, complexity) in enumerate(schedule)
+            if missing_from + datetime.timedelta(days=offset) not in scheduled
+        ],
+        ignore_conflicts=True
+    )
+    invalidate_daily_words()
+    return len(created)
+
+
+_words_by_date = {}
+
+
+def word_for_day(date=None):
+    """
+    Returns the word of `date` (default: today), scheduling it if nobody has yet.
+    """
+    date = date or timezone.localdate()
+    word = _words_by_date.get(date)
+    if word is None:
+        word = load_words_from(date).get(date)
+    if word is None:
+        schedule_daily_words(start=date)
+        word = load_words_from(date).get(date)
+    return word
+
+
+async def aword_for_day(date=None):
+    date = date or timezone.localdate()
+    word = _words_by_date.get(date)
+    if word is not None:
+        return word
+    return await sync_to_async(word_for_day)(date)
+
+
+def load_words_from(date):
+    """
+    Caches the scheduled words from `date` up to DAILY_WORD_DAYS_AHEAD days
+    later and returns the cache.
+    """
+    for old_date in [cached for cached in list(_words_by_date) if cached < date - datetime.timedelta(days=1)]:
+        _words_by_date.pop(old_date, None)
+    _words_by_date.update(
+        DailyWord.objects.filter(date__gte=date, date__lt=date + datetime.timedelta(days=days_ahead()))
+        .values_list('date', 'word_text')
+    )
+    return _words_by_date
+
+
+def invalidate_daily_words():
+    _words_by_date.clear()
@@ -0,0 +1,117 @@
+"""
+In-process, read-only index over ``dictionary_words``.
+
+Every worker loads the dictionary once and keeps it in memory: a frozenset
+for constant-time guess validation and a tuple sorted by complexity, so a
+random word within a complexity band is a single ``randrange`` over a slice
+of it. The index is reloaded only when the stamp in ``dictionary_versions``
+changes, and that stamp is checked at most every
+``DICTIONARY_VERSION_CHECK_INTERVAL`` seconds.
+"""
+import random
+import threading
+import time
+from bisect import bisect_left, bisect_right
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from api.letters import LetterIndex
+from api.models import DictionaryVersion, DictionaryWord
+from api.validation import WORD_LENGTH, normalize_word
+
+
+class DictionaryIndex:
+    __slots__ = ('version', 'words', '_ordered', '_complexities', '_letters')
+
+    def __init__(self, rows, version=None):
+        """
+        rows: iterable of (word_text, complexity) pairs
+        """
+        ordered = sorted(rows, key=lambda row: (row[1], row[0]))
+        self.version = version
+        self.words = frozenset(normalize_word(word) for word, _ in ordered)
+        self._ordered = tuple(word for word, _ in ordered)
+        self._complexities = tuple(complexity for _, complexity in ordered)
+        self._letters = None
+
+    def __len__(self):
+        return len(self._ordered)
+
+    def __contains__(self, word):
+        return normalize_word(word) in self.words
+
+    def band(self, min_complexity=None, max_complexity=None):
+        """
+        Returns the (start, stop) slice of words whose complexity lies
+        within [min_complexity, max_complexity].
+        """
+        start = 0 if min_complexity is None else bisect_left(self._complexities, min_complexity)
+        stop = len(self._ordered) if max_complexity is None else bisect_right(self._complexities, max_complexity)
+        return start, max(start, stop)
+
+    def random_word(self, min_complexity=None, max_complexity=None, rng=random):
+        """
+        Returns a random word within the complexity band, or None if the band is empty.
+        """
+        start, stop = self.band(min_complexity, max_complexity)
+        if start == stop:
+            return None
+        return self._ordered[rng.randrange(start, stop)]
+
+    def letter_index(self):
+        """
+        The api.letters.LetterIndex of the words, built on first use.
+        """
+        if self._letters is None:
+            self._letters = LetterIndex(self.words)
+        return self._letters
+
+
+def load_dictionary(version=None):
+    rows = DictionaryWord.objects.values_list('word_text', 'complexity').iterator(chunk_size=10000)
+    return DictionaryIndex(((word, complexity) for word, complexity in rows if len(normalize_word(word)) == WORD_LENGTH), version)
+
+
+_index = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def _is_fresh():
+    interval = getattr(settings, 'DICTIONARY_VERSION_CHECK_INTERVAL', 30)
+    return _index is not None and time.monotonic() - _checked_at < interval
+
+
+def get_dictionary():
+    """
+    Returns this worker's dictionary index, reloading it if the dictionary
+    version stamp has changed since it was loaded.
+    """
+    global _index, _checked_at  # pylint: disable=global-statement
+    if _is_fresh():
+        return _index
+
+    with _lock:
+        stamp = DictionaryVersion.current()
+        if _index is None or _index.version != stamp:
+            _index = load_dictionary(stamp)
+        _checked_at = time.monotonic()
+    return _index
+
+
+async def aget_dictionary():
+    """
+    Async get_dictionary(): only hops to a thread when the stamp is due for a check.
+    """
+    if _is_fresh():
+        return _index
+    return await sync_to_async(get_dictionary)()
+
+
+def invalidate_dictionary():
+    """
+    Forces the next get_dictionary() call to re-check the version stamp.
+    """
+    global _checked_at  # pylint: disable=global-statement
+    _checked_at = 0.0
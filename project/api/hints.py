@@ -0,0 +1,163 @@
+"""
+Hints: the dictionary words a game's target can still be, and the guesses
+expected to tell the most about which one it is.
+
+Candidates are the words that give every guess of the game the feedback it
+got (scored as in api.scoring). Each worker keeps the candidates of recent
+games (at most ``HINT_MAX_GAMES``, for ``HINT_TTL`` seconds) along with the
+last attempt applied to them, so a hint only filters by the guesses made
+since the previous one.
+
+A guess's expected information is the entropy, in bits, of the feedback
+patterns it gets over the candidates. It is computed with score_many for a
+batch of guesses against all candidates at a time. Before the first guess
+every game has the same candidates, so that ranking is computed once per
+dictionary version and kept in the default cache.
+"""
+import threading
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+from api.dictionary import get_dictionary
+from api.models import Guess
+from api.scoring import PATTERN_COUNT, encode_words, score, score_many
+from api.state import LocalStateCache
+
+
+class HintIndex:
+    """
+    The dictionary words of one dictionary version, encoded for scoring.
+    """
+    def __init__(self, words, version=None):
+        self.version = version
+        self.words = tuple(sorted(words))
+        self.encoded = encode_words(self.words)
+        self._first_guesses = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.words)
+
+    def first_guesses(self, count):
+        """
+        rank_guesses() before any guess.
+        """
+        ranking = self._first_guesses.get(count)
+        if ranking is None:
+            with self._lock:
+                ranking = self._first_guesses.get(count)
+                if ranking is None:
+                    key = f'hints:first-guesses:{self.version}:{count}'
+                    ranking = cache.get(key) if self.version is not None else None
+                    if ranking is None:
+                        ranking = rank_guesses(self, np.arange(len(self.words)), count)
+                        if self.version is not None:
+                            cache.set(key, ranking, None)
+                    self._first_guesses[count] = ranking
+        return ranking
+
+
+def expected_information(guesses, targets, batch_size=256):
+    """
+    Entropy in bits of the feedback each encoded guess gets over the encoded
+    targets, all equally likely.
+    """
+    bits = np.zeros(len(guesses), dtype=np.float64)
+    if not len(targets):
+        return bits
+    for start in range(0, len(guesses), batch_size):
+        codes = score_many(guesses[start:start + batch_size], targets).astype(np.intp)
+        offsets = np.arange(len(codes))[:, None] * PATTERN_COUNT
+        counts = np.bincount((codes + offsets).ravel(), minlength=len(codes) * PATTERN_COUNT)
+        shares = counts.reshape(len(codes), PATTERN_COUNT) / len(targets)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            bits[start:start + len(codes)] = -np.where(shares > 0, shares * np.log2(shares), 0.0).sum(axis=1)
+    return bits
+
+
+def filter_candidates(index, candidates, guess, pattern):
+    """
+    The candidates (positions in index.words) for which guess gets pattern.
+    """
+    codes = score_many(encode_words([guess]), index.encoded[candidates])[0]
+    return candidates[codes == pattern]
+
+
+def rank_guesses(index, candidates, count=5):
+    """
+    The `count` best (word, bits) guesses over the candidates. Among guesses
+    expected to tell as much, words that can still be the target come first.
+    """
+    if len(candidates) <= 1:
+        return [(index.words[position], 0.0) for position in candidates]
+    # Rounded so that equal splits compare equal whatever the summation order
+    bits = np.round(expected_information(index.encoded, index.encoded[candidates]), 9)
+    possible = np.zeros(len(index.words), dtype=bool)
+    possible[candidates] = True
+    order = np.lexsort((~possible, -bits))[:count]
+    return [(index.words[position], float(bits[position])) for position in order]
+
+
+_index = None
+_candidates = None
+_lock = threading.Lock()
+
+
+def get_hint_index():
+    """
+    Returns the hint index of the current dictionary and the cache of game
+    candidates over it, both replaced when the dictionary changes.
+    """
+    global _index, _candidates  # pylint: disable=global-statement
+    dictionary = get_dictionary()
+    with _lock:
+        if _index is None or _index.version != dictionary.version:
+            _index = HintIndex(dictionary.words, dictionary.version)
+            _candidates = LocalStateCache(
+                getattr(settings, 'HINT_MAX_GAMES', 10000), getattr(settings, 'HINT_TTL', 3600)
+            )
+        return _index, _candidates
+
+
+def game_hint(game_id, word_to_guess, created_at=None):
+    """
+    The candidates and best next guesses of a game, after its stored guesses.
+    created_at, the game's, limits the guess lookup to its partition.
+    """
+    index, candidate_cache = get_hint_index()
+    applied, candidates = candidate_cache.get_many([game_id]).get(game_id, (0, None))
+
+    new_guesses = Guess.objects.filter(game_id=game_id, attempt_number__gt=applied)
+    if created_at is not None:
+        new_guesses = new_guesses.filter(game_created_at=created_at)
+    new_guesses = (
+        new_guesses
+        .order_by('attempt_number')
+        .values_list('attempt_number', 'guessed_word')
+    )
+    for attempt, word in new_guesses:
+        if candidates is None:
+            candidates = np.arange(len(index.words))
+        candidates = filter_candidates(index, candidates, word, score(word, word_to_guess))
+        applied = attempt
+    candidate_cache.set_many({game_id: (applied, candidates)})
+
+    count = getattr(settings, 'HINT_SUGGESTIONS', 5)
+    if candidates is None:
+        remaining, ranking = len(index.words), index.first_guesses(count)
+    else:
+        remaining, ranking = len(candidates), rank_guesses(index, candidates, count)
+    return {
+        'attempts': applied,
+        'candidates': remaining,
+        'suggestions': [{'word': word, 'bits': round(bits, 3)} for word, bits in ranking],
+    }
+
+
+def reset_hints():
+    global _index, _candidates  # pylint: disable=global-statement
+    with _lock:
+        _index = None
+        _candidates = None
@@ -0,0 +1,282 @@
+"""
+Daily, weekly and all-time leaderboards.
+
+A player's entry on a board is their best won game in its period: fewest
+attempts, then shortest ``ended_at - created_at``. Each worker keeps the
+boards in memory as sorted lists, so adding a game, finding a player's rank
+and reading the top K or the entries around a player are all O(log n)
+instead of an ``ORDER BY ... LIMIT`` over ``game_sessions`` per request.
+
+On first use a worker restores the latest ``LeaderboardSnapshot`` and
+replays the games that ended after it. From then on a listener thread
+receives the id of every game that ends through Postgres ``LISTEN
+game_finished`` (sent by a trigger on ``game_sessions``, see migration 0007)
+and applies it. With ``LEADERBOARD_LISTEN`` off, the worker instead catches
+up from the database at most every ``LEADERBOARD_REFRESH_INTERVAL`` seconds.
+Applying a game twice changes nothing, so overlapping catch-ups are safe.
+
+Snapshots are written by the ``snapshot_leaderboards`` command.
+"""
+import datetime
+import logging
+import threading
+import time
+
+import psycopg
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection
+from django.utils import timezone
+from sortedcontainers import SortedList
+
+from api.models import Game, LeaderboardSnapshot
+from api.stats import game_results
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'game_finished'
+PERIODS = ('daily', 'weekly', 'all')
+# Games can commit a while after their ended_at (e.g. through the
+# write-behind buffer), so catch-ups look back this much further.
+CATCH_UP_MARGIN = datetime.timedelta(minutes=1)
+# Snapshots kept by save_snapshot()
+KEEP_SNAPSHOTS = 3
+
+
+def listen_enabled():
+    return getattr(settings, 'LEADERBOARD_LISTEN', False)
+
+
+def refresh_interval():
+    return getattr(settings, 'LEADERBOARD_REFRESH_INTERVAL', 5)
+
+
+def board_names(when):
+    """
+    Returns {period: board name} for the boards a game ended at `when` is on.
+    """
+    local = timezone.localtime(when)
+    year, week, _ = local.isocalendar()
+    return {
+        'daily': f'daily:{local.date().isoformat()}',
+        'weekly': f'weekly:{year}-W{week:02d}',
+        'all': 'all',
+    }
+
+
+class Leaderboard:
+    """
+    One board: the best (attempts, duration in ms) of every player, sorted.
+    """
+    def __init__(self, entries=()):
+        self._best = {player_id: (attempts, duration, player_id) for player_id, attempts, duration in entries}
+        self._entries = SortedList(self._best.values())
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, player_id, attempts, duration):
+        """
+        Returns True when the result is the player's new best.
+        """
+        key = (attempts, duration, player_id)
+        current = self._best.get(player_id)
+        if current is not None:
+            if current <= key:
+                return False
+            self._entries.remove(current)
+        self._entries.add(key)
+        self._best[player_id] = key
+        return True
+
+    def rank(self, player_id):
+        key = self._best.get(player_id)
+        return None if key is None else self._entries.index(key) + 1
+
+    def _slice(self, start, stop):
+        return [
+            {'rank': rank, 'player_id': player_id, 'attempts': attempts, 'duration': duration}
+            for rank, (attempts, duration, player_id) in enumerate(self._entries.islice(start, stop), start + 1)
+        ]
+
+    def top(self, limit):
+        return self._slice(0, limit)
+
+    def around(self, player_id, radius):
+        rank = self.rank(player_id)
+        if rank is None:
+            return []
+        return self._slice(max(0, rank - 1 - radius), rank + radius)
+
+    def dump(self):
+        return [[player_id, attempts, duration] for attempts, duration, player_id in self._entries]
+
+
+def finished_games(queryset):
+    """
+    (player id, attempts, created_at, ended_at) of the won games of players.
+    """
+    return (
+        game_results(queryset.filter(player__isnull=False, ended_at__isnull=False))
+        .filter(won=True)
+        .order_by()
+        .values_list('player_id', 'attempts', 'created_at', 'ended_at')
+    )
+
+
+class Leaderboards:
+    """
+    The boards of the current and previous day and week, and all-time.
+    Safe to read from request threads while the listener thread writes.
+    """
+    def __init__(self, boards=None, high_water=None):
+        self.boards = {name: Leaderboard(entries) for name, entries in (boards or {}).items()}
+        self.high_water = high_water
+        self.refreshed_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def add_game(self, player_id, attempts, created_at, ended_at):
+        duration = int((ended_at - created_at).total_seconds() * 1000)
+        with self._lock:
+            for name in board_names(ended_at).values():
+                board = self.boards.get(name)
+                if board is None:
+                    board = self.boards[name] = Leaderboard()
+                board.add(player_id, attempts, duration)
+            if self.high_water is None or ended_at > self.high_water:
+                self.high_water = ended_at
+
+    def add_games(self, queryset):
+        count = 0
+        for row in finished_games(queryset).iterator(chunk_size=5000):
+            self.add_game(*row)
+            count += 1
+        self.prune()
+        return count
+
+    def catch_up(self):
+        """
+        Applies the games that ended since the newest one already applied.
+        """
+        games = Game.objects.all()
+        if self.high_water is not None:
+            games = games.filter(ended_at__gte=self.high_water - CATCH_UP_MARGIN)
+        count = self.add_games(games)
+        self.refreshed_at = time.monotonic()
+        return count
+
+    def prune(self, now=None):
+        """
+        Drops daily and weekly boards older than the previous period.
+        """
+        now = now or timezone.now()
+        keep = set(board_names(now).values()) | set(board_names(now - datetime.timedelta(days=1)).values())
+        keep |= set(board_names(now - datetime.timedelta(weeks=1)).values())
+        with self._lock:
+            for name in [name for name in self.boards if name not in keep]:
+                del self.boards[name]
+
+    def standings(self, period, player_id=None, limit=10, radius=2, now=None):
+        """
+        Top `limit` entries of the current `period` board and, for a player
+        on it, their rank and the `radius` entries either side.
+        """
+        name = board_names(now or timezone.now())[period]
+        with self._lock:
+            board = self.boards.get(name) or Leaderboard()
+            result = {'board': name, 'players': len(board), 'top': board.top(limit)}
+            if player_id is not None:
+                result['rank'] = board.rank(player_id)
+                result['around'] = board.around(player_id, radius)
+        return result
+
+    def dump(self):
+        with self._lock:
+            return {name: board.dump() for name, board in self.boards.items()}, self.high_water
+
+
+def load_leaderboards():
+    """
+    Restores the latest snapshot, or builds from all finished games when
+    there is none, and catches up with the games that ended since.
+    """
+    snapshot = LeaderboardSnapshot.objects.order_by('-created_at', '-id').first()
+    if snapshot is None:
+        leaderboards = Leaderboards()
+    else:
+        leaderboards = Leaderboards(snapshot.boards, snapshot.high_water)
+    leaderboards.catch_up()
+    return leaderboards
+
+
+def save_snapshot(leaderboards):
+    boards, high_water = leaderboards.dump()
+    snapshot = LeaderboardSnapshot.objects.create(boards=boards, high_water=high_water)
+    stale = LeaderboardSnapshot.objects.order_by('-created_at', '-id').values_list('id', flat=True)[KEEP_SNAPSHOTS:]
+    LeaderboardSnapshot.objects.filter(id__in=list(stale)).delete()
+    return snapshot
+
+
+class Listener(threading.Thread):
+    """
+    Applies games as their game_finished notifications arrive. Reconnects
+    after errors and catches up on whatever it missed meanwhile.
+    """
+    def __init__(self, leaderboards, timeout=1.0):
+        super().__init__(name='leaderboard-listener', daemon=True)
+        self.leaderboards = leaderboards
+        self.timeout = timeout
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.listen()
+            except (DatabaseError, psycopg.Error):
+                logger.exception("Leaderboard listener failed, reconnecting")
+            self._stop_event.wait(self.timeout)
+        close_old_connections()
+
+    def listen(self):
+        # A connection of its own rather than one from the pool, which it
+        # would hold for as long as it listens.
+        conn = connection.Database.connect(**connection.get_connection_params())
+        try:
+            conn.autocommit = True
+            conn.execute(f"LISTEN {CHANNEL}")
+            self.leaderboards.catch_up()
+            while not self._stop_event.is_set():
+                game_ids = [notify.payload for notify in conn.notifies(timeout=self.timeout)]
+                if game_ids:
+                    self.leaderboards.add_games(Game.objects.filter(id__in=game_ids))
+                close_old_connections()
+        finally:
+            conn.close()
+
+
+_leaderboards = None
+_listener = None
+_lock = threading.Lock()
+
+
+def get_leaderboards():
+    global _leaderboards, _listener  # pylint: disable=global-statement
+    with _lock:
+        if _leaderboards is None:
+            _leaderboards = load_leaderboards()
+            if listen_enabled():
+                _listener = Listener(_leaderboards)
+                _listener.start()
+        elif _listener is None and time.monotonic() - _leaderboards.refreshed_at >= refresh_interval():
+            _leaderboards.catch_up()
+        return _leaderboards
+
+
+def reset_leaderboards():
+    global _leaderboards, _listener  # pylint: disable=global-statement
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+        _leaderboards = _listener = None
@@ -0,0 +1,159 @@
+"""
+Letter-position bitset index over the dictionary.
+
+Words are numbered by their place in a sorted tuple, and a set of words is
+a Python int with bit i set for word i. The index keeps one such set per
+(position, letter) and, per letter, the words with at least 1, 2, ...
+copies of it. Any set of green/yellow/gray constraints then resolves with
+one AND (or AND NOT) per constraint, e.g. "Š in position 1 and no E" is
+``at[0]['Š'] & ~at_least['E'][1]``.
+
+``Constraints`` collects what the feedback on guesses reveals about the
+target. Hard mode uses its ``hard_mode()`` part: every green letter stays
+in place and every revealed letter is used again. A single guess is checked
+with ``Constraints.allows()`` on the word itself; the index is for finding
+all the words that match.
+"""
+from collections import Counter
+
+import numpy as np
+
+from api.scoring import GREEN, LETTER_CODES, NONE, decode_pattern, encode_words, score
+from api.validation import ALPHABET, WORD_LENGTH, normalize_word
+
+
+class Constraints:
+    """
+    greens: {position: letter}
+    excluded: {position: set of letters not at that position}
+    min_counts: {letter: the least number of copies}
+    max_counts: {letter: the most number of copies}
+    """
+    def __init__(self, greens=None, excluded=None, min_counts=None, max_counts=None):
+        self.greens = dict(greens or {})
+        self.excluded = {position: set(letters) for position, letters in (excluded or {}).items()}
+        self.min_counts = dict(min_counts or {})
+        self.max_counts = dict(max_counts or {})
+
+    def __bool__(self):
+        return bool(self.greens or self.excluded or self.min_counts or self.max_counts)
+
+    def add_feedback(self, guess, code):
+        """
+        Adds what the feedback pattern code on guess reveals; returns self.
+        """
+        guess = normalize_word(guess)
+        digits = decode_pattern(code)
+        found = Counter(letter for letter, digit in zip(guess, digits) if digit != NONE)
+        for position, (letter, digit) in enumerate(zip(guess, digits)):
+            if digit == GREEN:
+                self.greens[position] = letter
+            else:
+                self.excluded.setdefault(position, set()).add(letter)
+            if digit == NONE:
+                # A gray copy means the target has no more copies than were found
+                self.max_counts[letter] = min(self.max_counts.get(letter, WORD_LENGTH), found[letter])
+        for letter, count in found.items():
+            self.min_counts[letter] = max(self.min_counts.get(letter, 0), count)
+        return self
+
+    def allows(self, word):
+        """
+        Whether word meets the constraints.
+        """
+        word = normalize_word(word)
+        if len(word) != WORD_LENGTH:
+            return False
+        counts = Counter(word)
+        return (
+            all(word[position] == letter for position, letter in self.greens.items())
+            and all(word[position] not in letters for position, letters in self.excluded.items())
+            and all(counts[letter] >= count for letter, count in self.min_counts.items())
+            and all(counts[letter] <= count for letter, count in self.max_counts.items())
+        )
+
+    def hard_mode(self):
+        """
+        The constraints a hard-mode guess must meet: greens in place and
+        revealed letters used.
+        """
+        return Constraints(greens=self.greens, min_counts=self.min_counts)
+
+    def describe(self):
+        """
+        Lists the greens and required letters, e.g. 'Š in position 1, A'.
+        """
+        required = Counter(self.min_counts)
+        parts = []
+        for position, letter in sorted(self.greens.items()):
+            parts.append(f"{letter} in position {position + 1}")
+            required[letter] -= 1
+        parts.extend(letter * count for letter, count in sorted(required.items()) if count > 0)
+        return ', '.join(parts)
+
+
+def _bitset(mask):
+    return int.from_bytes(np.packbits(mask, bitorder='little').tobytes(), 'little')
+
+
+class LetterIndex:
+    def __init__(self, words):
+        self.words = tuple(sorted(normalize_word(word) for word in words))
+        self.places = {word: place for place, word in enumerate(self.words)}
+        self.all = (1 << len(self.words)) - 1
+        encoded = encode_words(self.words)
+        self.at = [
+            {letter: _bitset(encoded[:, position] == code) for code, letter in enumerate(ALPHABET)}
+            for position in range(WORD_LENGTH)
+        ]
+        copies = np.stack([(encoded == code).sum(axis=1) for code in range(len(ALPHABET))], axis=1)
+        # at_least[letter][n]: words with at least n copies (index 0 is every word)
+        self.at_least = {
+            letter: [self.all] + [_bitset(copies[:, code] >= n) for n in range(1, WORD_LENGTH + 1)] + [0]
+            for letter, code in LETTER_CODES.items()
+        }
+
+    def __len__(self):
+        return len(self.words)
+
+    def match(self, constraints):
+        """
+        The set of words that meet the constraints.
+        """
+        bits = self.all
+        for position, letter in constraints.greens.items():
+            bits &= self.at[position].get(letter, 0)
+        for position, letters in constraints.excluded.items():
+            for letter in letters:
+                bits &= ~self.at[position].get(letter, 0)
+        for letter, count in constraints.min_counts.items():
+            bits &= self.at_least[letter][min(count, WORD_LENGTH + 1)] if letter in self.at_least else 0
+        for letter, count in constraints.max_counts.items():
+            if letter in self.at_least and count < WORD_LENGTH:
+                bits &= ~self.at_least[letter][count + 1]
+        return bits
+
+    def contains(self, bits, word):
+        place = self.places.get(normalize_word(word))
+        return place is not None and bool(bits >> place & 1)
+
+    def matching_words(self, bits, limit=None):
+        """
+        The words of a set, in sorted order.
+        """
+        words = []
+        while bits and (limit is None or len(words) < limit):
+            lowest = bits & -bits
+            words.append(self.words[lowest.bit_length() - 1])
+            bits ^= lowest
+        return words
+
+
+def hard_mode_constraints(guesses, word_to_guess):
+    """
+    The hard-mode constraints revealed by the guesses at word_to_guess.
+    """
+    constraints = Constraints()
+    for guess in guesses:
+        constraints.add_feedback(guess, score(guess, word_to_guess))
+    return constraints.hard_mode()
@@ -0,0 +1,25 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.partitions import archive_partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Exports the monthly game_sessions and game_guesses partitions older than the retention "
+        "period to gzipped CSV files, then detaches and drops them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--before', type=datetime.date.fromisoformat, default=None,
+                            help="Archive months before this date (default: GAME_RETENTION_MONTHS ago)")
+        parser.add_argument('--output-dir', default=None, help="Directory for the files (default GAME_ARCHIVE_DIR)")
+
+    def handle(self, *args, **options):
+        directory = options['output_dir'] or settings.GAME_ARCHIVE_DIR
+        paths = archive_partitions(directory, options['before'])
+        for path in paths:
+            self.stdout.write(f"Archived {path}")
+        self.stdout.write(self.style.SUCCESS(f"Archived {len(paths)} partitions"))
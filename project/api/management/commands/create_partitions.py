@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.partitions import add_months, create_partitions, month_start, months_ahead
+
+
+class Command(BaseCommand):
+    help = (
+        "Creates the monthly partitions of game_sessions and game_guesses for this month and the "
+        "next --months months. Meant to run periodically (e.g. daily from cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months', type=int, default=None, help="Months ahead (default GAME_PARTITION_MONTHS_AHEAD)")
+
+    def handle(self, *args, **options):
+        first = month_start(timezone.localdate())
+        months = months_ahead() if options['months'] is None else options['months']
+        created = create_partitions(first, add_months(first, months))
+        for name in created:
+            self.stdout.write(f"Created {name}")
+        self.stdout.write(self.style.SUCCESS(f"Created {len(created)} partitions"))
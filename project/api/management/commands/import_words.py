@@ -0,0 +1,126 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from api.dictionary import invalidate_dictionary
+from api.models import DictionaryVersion, DictionaryWord
+from api.validation import is_valid_word, normalize_word
+
+# dictionary_words.complexity is a positive smallint
+MAX_COMPLEXITY = 32767
+
+
+def parse_complexity(value):
+    """
+    The complexity given in a line, or None if it is not an integer the
+    column can hold.
+    """
+    if not (value.isascii() and value.isdigit()):
+        return None
+    value = int(value)
+    return value if value <= MAX_COMPLEXITY else None
+
+
+class RecentWords:
+    """
+    Bounded-memory duplicate filter: remembers between `size` and 2 * `size`
+    of the most recent words. Duplicates it misses are removed by the
+    DISTINCT ON of the final merge.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.current = set()
+        self.previous = set()
+
+    def seen(self, word):
+        if word in self.current or word in self.previous:
+            return True
+        if len(self.current) >= self.size:
+            self.previous, self.current = self.current, set()
+        self.current.add(word)
+        return False
+
+
+class Command(BaseCommand):
+    help = (
+        "Streams a word list (one word per line, or word<TAB>complexity) of valid Lithuanian words into dictionary_words "
+        "through a COPY into a staging table, merged with ON CONFLICT (word_text)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Word file, UTF-8")
+        parser.add_argument(
+            '--complexity', type=int, default=0,
+            help="Complexity for words without one; 0 marks them as not yet scored"
+        )
+        parser.add_argument('--dedupe-window', type=int, default=100000, help="Recent words kept for deduplication")
+
+    def handle(self, *args, **options):
+        if not 0 <= options['complexity'] <= MAX_COMPLEXITY:
+            raise CommandError(f"--complexity must be between 0 and {MAX_COMPLEXITY}")
+        stats = {'read': 0, 'rejected': 0, 'duplicates': 0}
+        try:
+            with open(options['path'], encoding='utf-8-sig') as lines, transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "CREATE TEMPORARY TABLE dictionary_import "
+                        "(word_text varchar(100), complexity smallint, scored boolean) ON COMMIT DROP"
+                    )
+                    with cursor.copy("COPY dictionary_import (word_text, complexity, scored) FROM STDIN") as copy:
+                        for row in self.parse(lines, options, stats):
+                            copy.write_row(row)
+                    merged = self.merge(cursor)
+                DictionaryVersion.bump()
+        except OSError as error:
+            raise CommandError(error) from error
+        invalidate_dictionary()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Read {stats['read']} lines: {merged} words added or updated, "
+            f"{stats['rejected']} rejected, {stats['duplicates']} duplicates skipped"
+        ))
+
+    def parse(self, lines, options, stats):
+        """
+        Yields (word, complexity, scored) rows for valid, not recently seen words.
+        """
+        recent = RecentWords(options['dedupe_window'])
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            stats['read'] += 1
+
+            word, _, complexity = line.partition('\t')
+            word = normalize_word(word.strip())
+            complexity = complexity.strip()
+            scored = parse_complexity(complexity) if complexity else None
+            if not is_valid_word(word, normalized=True) or (complexity and scored is None):
+                stats['rejected'] += 1
+                continue
+            if recent.seen(word):
+                stats['duplicates'] += 1
+                continue
+
+            if complexity:
+                yield word, scored, True
+            else:
+                yield word, options['complexity'], False
+
+    @staticmethod
+    def merge(cursor):
+        """
+        Inserts new words. Existing words only take the complexity from the
+        file when it had one.
+        """
+        table = DictionaryWord._meta.db_table
+        cursor.execute("CREATE INDEX ON dictionary_import (word_text) WHERE scored")
+        cursor.execute(
+            f"INSERT INTO {table} (word_text, complexity) "
+            f"SELECT DISTINCT ON (word_text) word_text, complexity FROM dictionary_import "
+            f"ORDER BY word_text, scored DESC "
+            f"ON CONFLICT (word_text) DO UPDATE SET complexity = EXCLUDED.complexity "
+            f"WHERE EXISTS (SELECT 1 FROM dictionary_import i WHERE i.word_text = EXCLUDED.word_text AND i.scored) "
+            f"AND {table}.complexity IS DISTINCT FROM EXCLUDED.complexity"
+        )
+        return cursor.rowcount
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.stats import rebuild_stats
+
+
+class Command(BaseCommand):
+    help = "Recomputes player and global stats from all finished games, reading them in chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000, help="Games read per query")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            games, players = rebuild_stats(options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt stats from {games} games of {players} players"))
@@ -0,0 +1,18 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+
+from api.daily import days_ahead, repeat_window, schedule_daily_words
+
+
+class Command(BaseCommand):
+    help = "Precomputes the daily word schedule, keeping days that are already scheduled."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=datetime.date.fromisoformat, help="First day (YYYY-MM-DD), default today")
+        parser.add_argument('--days', type=int, default=days_ahead(), help="Number of days to schedule")
+        parser.add_argument('--window', type=int, default=repeat_window(), help="Days without repeating a word")
+
+    def handle(self, *args, **options):
+        created = schedule_daily_words(start=options['start'], days=options['days'], window=options['window'])
+        self.stdout.write(self.style.SUCCESS(f"Scheduled {created} new daily words"))
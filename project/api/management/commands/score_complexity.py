@@ -0,0 +1,53 @@
+import os
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.complexity import complexity_levels, difficulty
+from api.dictionary import invalidate_dictionary
+from api.models import DictionaryVersion, DictionaryWord
+from api.validation import WORD_LENGTH, normalize_word
+
+
+class Command(BaseCommand):
+    help = (
+        "Computes DictionaryWord.complexity from letter rarity, diacritics and how well words split "
+        "the candidate set. By default only unscored words (complexity 0) and --words are updated."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help="Rescore every word")
+        parser.add_argument('--words', nargs='*', default=[], help="Also rescore these words")
+        parser.add_argument('--probes', type=int, default=256, help="Probe guesses used for the split feature")
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Worker processes")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Rows per UPDATE")
+
+    def handle(self, *args, **options):
+        words = [
+            word for word in DictionaryWord.objects.only('id', 'word_text', 'complexity').order_by('id')
+            if len(normalize_word(word.word_text)) == WORD_LENGTH
+        ]
+        if not words:
+            self.stdout.write("No words to score")
+            return
+
+        # Features are computed over the whole dictionary (they are relative to
+        # it), but only changed words get a new level, so levels stay stable.
+        scores = difficulty([word.word_text for word in words], options['probes'], options['workers'])
+        levels = complexity_levels(scores)
+
+        requested = {normalize_word(word) for word in options['words']}
+        changed = []
+        for word, level in zip(words, levels.tolist()):
+            if options['all'] or word.complexity == 0 or normalize_word(word.word_text) in requested:
+                if word.complexity != level:
+                    word.complexity = level
+                    changed.append(word)
+
+        with transaction.atomic():
+            DictionaryWord.objects.bulk_update(changed, ['complexity'], batch_size=options['batch_size'])
+            if changed:
+                DictionaryVersion.bump()
+        invalidate_dictionary()
+
+        self.stdout.write(self.style.SUCCESS(f"Scored {len(words)} words, updated {len(changed)}"))
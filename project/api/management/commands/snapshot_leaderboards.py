@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from api.leaderboard import Leaderboards, load_leaderboards, save_snapshot
+
+
+class Command(BaseCommand):
+    help = (
+        "Saves a snapshot of the leaderboards that workers restore at startup. "
+        "Meant to run periodically (e.g. from cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help="Ignore the last snapshot and replay all games")
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            leaderboards = Leaderboards()
+            leaderboards.catch_up()
+        else:
+            leaderboards = load_leaderboards()
+        snapshot = save_snapshot(leaderboards)
+        players = len(snapshot.boards.get('all', []))
+        self.stdout.write(self.style.SUCCESS(f"Saved leaderboard snapshot {snapshot.id} ({players} players)"))
@@ -0,0 +1,229 @@
+"""
+Request metrics collected by api.middleware.RequestMetricsMiddleware and
+served in the Prometheus text format at /metrics.
+
+Each worker process keeps its own counters and histograms. With
+``REQUEST_METRICS_DIR`` set, workers also save them to ``<pid>.json`` in
+that directory (at most every ``FLUSH_INTERVAL`` seconds) and /metrics adds
+up the files of all workers, so any worker can answer a scrape. Empty the
+directory when deploying, as with any multi-process Prometheus setup.
+
+DB queries and time are recorded by an execute wrapper added to every
+database connection when it is created. It adds to the stats of the
+current request, found through a context variable, which sync_to_async
+carries over into the threads the async views run their queries in.
+"""
+import contextvars
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+FLUSH_INTERVAL = 1.0
+
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+COUNTERS = {
+    'wordlas_requests_total': "Requests by view, method and status.",
+    'wordlas_profiled_requests_total': "Requests sampled into cProfile dumps.",
+}
+HISTOGRAMS = {
+    'wordlas_request_duration_seconds': ("Wall time of requests.", DURATION_BUCKETS),
+    'wordlas_request_db_queries': ("Database queries per request.", QUERY_BUCKETS),
+    'wordlas_request_db_seconds': ("Time spent in database queries per request.", DURATION_BUCKETS),
+    'wordlas_request_template_seconds': ("Template render time per request.", DURATION_BUCKETS),
+}
+
+
+def enabled():
+    return getattr(settings, 'REQUEST_METRICS', False)
+
+
+def metrics_dir():
+    return getattr(settings, 'REQUEST_METRICS_DIR', '')
+
+
+class RequestStats:
+    __slots__ = ('queries', 'db_time', 'template_time')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+
+
+current_request = contextvars.ContextVar('current_request', default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    stats = current_request.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - start
+
+
+def add_query_recorder(sender, connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def install_query_recorder():
+    connection_created.connect(add_query_recorder, dispatch_uid='api.metrics.record_query')
+    for connection in connections.all(initialized_only=True):
+        add_query_recorder(None, connection)
+
+
+class Registry:
+    """
+    Counters and histograms keyed by (name, labels), labels being a sorted
+    tuple of (label, value) pairs. Histograms hold per-bucket counts (the
+    last bucket is +Inf), then the sum of the observed values.
+    """
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def inc(self, name, labels, amount=1):
+        key = self.key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name, labels, value):
+        buckets = HISTOGRAMS[name][1]
+        key = self.key(name, labels)
+        with self._lock:
+            values = self.histograms.get(key)
+            if values is None:
+                values = self.histograms[key] = [0] * (len(buckets) + 1) + [0.0]
+            values[bisect_left(buckets, value)] += 1
+            values[-1] += value
+
+    def snapshot(self):
+        """
+        Copies of (counters, histograms) that later updates do not change.
+        """
+        with self._lock:
+            return dict(self.counters), {key: list(values) for key, values in self.histograms.items()}
+
+    def dump(self):
+        with self._lock:
+            return {
+                'counters': [[name, list(labels), value] for (name, labels), value in self.counters.items()],
+                'histograms': [[name, list(labels), list(values)] for (name, labels), values in self.histograms.items()],
+            }
+
+    def merge(self, data):
+        with self._lock:
+            for name, labels, value in data['counters']:
+                key = (name, tuple(map(tuple, labels)))
+                self.counters[key] = self.counters.get(key, 0) + value
+            for name, labels, values in data['histograms']:
+                key = (name, tuple(map(tuple, labels)))
+                current = self.histograms.get(key)
+                self.histograms[key] = values if current is None else [a + b for a, b in zip(current, values)]
+
+
+def _labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (
+        (label, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for label, value in pairs
+    )
+    return '{' + ','.join(f'{label}="{value}"' for label, value in escaped) + '}'
+
+
+def render(registry):
+    """
+    The registry in the Prometheus text exposition format.
+    """
+    counters, histograms = registry.snapshot()
+    lines = []
+    for name, help_text in COUNTERS.items():
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+        for (metric, labels), value in sorted(counters.items()):
+            if metric == name:
+                lines.append(f'{name}{_labels(labels)} {value}')
+    for name, (help_text, buckets) in HISTOGRAMS.items():
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+        for (metric, labels), values in sorted(histograms.items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, count in zip([*map(str, buckets), '+Inf'], values[:-1]):
+                cumulative += count
+                lines.append(f'{name}_bucket{_labels(labels, [("le", bound)])} {cumulative}')
+            lines.append(f'{name}_sum{_labels(labels)} {values[-1]}')
+            lines.append(f'{name}_count{_labels(labels)} {cumulative}')
+    return '\n'.join(lines) + '\n'
+
+
+_registry = Registry()
+_saved_at = 0.0
+
+
+def get_registry():
+    return _registry
+
+
+def record_request(view, method, status, duration, stats):
+    _registry.inc('wordlas_requests_total', {'view': view, 'method': method, 'status': str(status)})
+    labels = {'view': view}
+    _registry.observe('wordlas_request_duration_seconds', labels, duration)
+    _registry.observe('wordlas_request_db_queries', labels, stats.queries)
+    _registry.observe('wordlas_request_db_seconds', labels, stats.db_time)
+    _registry.observe('wordlas_request_template_seconds', labels, stats.template_time)
+    save(force=False)
+
+
+def save(force=True):
+    """
+    Saves this worker's metrics to REQUEST_METRICS_DIR, if set.
+    """
+    global _saved_at  # pylint: disable=global-statement
+    directory = metrics_dir()
+    if not directory or (not force and time.monotonic() - _saved_at < FLUSH_INTERVAL):
+        return
+    _saved_at = time.monotonic()
+    os.makedirs(directory, exist_ok=True)
+    with tempfile.NamedTemporaryFile('w', dir=directory, suffix='.tmp', delete=False) as output:
+        json.dump(_registry.dump(), output)
+    os.replace(output.name, os.path.join(directory, f'{os.getpid()}.json'))
+
+
+def collect():
+    """
+    The metrics of all workers saving to REQUEST_METRICS_DIR, or of this
+    worker when it is not set.
+    """
+    directory = metrics_dir()
+    if not directory:
+        return _registry
+    save()
+    registry = Registry()
+    for path in glob.glob(os.path.join(directory, '*.json')):
+        try:
+            with open(path, encoding='utf-8') as data:
+                registry.merge(json.load(data))
+        except (OSError, ValueError):
+            continue
+    return registry
@@ -0,0 +1,132 @@
+"""
+Opt-in request instrumentation, enabled with ``REQUEST_METRICS``.
+
+RequestMetricsMiddleware records, per view, the wall time of each request,
+its number of database queries and their total time, and the time spent
+rendering templates (see api.metrics). A ``REQUEST_METRICS_PROFILE_RATE``
+share of requests is also run under cProfile and dumped to
+``REQUEST_METRICS_PROFILE_DIR``, one ``.prof`` file per request. Only one
+request per worker is profiled at a time; for async views the profile
+covers the event loop thread, not the threads queries run in.
+"""
+import cProfile
+import os
+import random
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.template.backends.django import Template
+
+from api import metrics
+
+_profile_lock = threading.Lock()
+
+
+def profile_rate():
+    return getattr(settings, 'REQUEST_METRICS_PROFILE_RATE', 0)
+
+
+def profile_dir():
+    return getattr(settings, 'REQUEST_METRICS_PROFILE_DIR', 'profiles')
+
+
+def install_template_timer():
+    """
+    Wraps Django template rendering to add its duration to the current request.
+    """
+    render = Template.render
+    if getattr(render, 'timed', False):
+        return
+
+    def timed_render(self, context=None, request=None):
+        stats = metrics.current_request.get()
+        if stats is None:
+            return render(self, context, request)
+        start = time.perf_counter()
+        try:
+            return render(self, context, request)
+        finally:
+            stats.template_time += time.perf_counter() - start
+
+    timed_render.timed = True
+    Template.render = timed_render
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match is not None else 'unmatched'
+
+
+class RequestMetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not metrics.enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        metrics.install_query_recorder()
+        install_template_timer()
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        stats = metrics.RequestStats()
+        token = metrics.current_request.set(stats)
+        profiler = self.start_profile()
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            duration = time.perf_counter() - start
+            metrics.current_request.reset(token)
+            self.stop_profile(profiler, request)
+        metrics.record_request(view_name(request), request.method, response.status_code, duration, stats)
+        return response
+
+    async def __acall__(self, request):
+        stats = metrics.RequestStats()
+        token = metrics.current_request.set(stats)
+        profiler = self.start_profile()
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            duration = time.perf_counter() - start
+            metrics.current_request.reset(token)
+            self.stop_profile(profiler, request)
+        metrics.record_request(view_name(request), request.method, response.status_code, duration, stats)
+        return response
+
+    @staticmethod
+    def start_profile():
+        if random.random() >= profile_rate() or not _profile_lock.acquire(blocking=False):
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is active in this interpreter
+            _profile_lock.release()
+            return None
+        return profiler
+
+    @staticmethod
+    def stop_profile(profiler, request):
+        if profiler is None:
+            return
+        try:
+            profiler.disable()
+            view = view_name(request)
+            directory = profile_dir()
+            os.makedirs(directory, exist_ok=True)
+            profiler.dump_stats(os.path.join(directory, f'{time.time():.6f}-{os.getpid()}-{view}.prof'))
+        finally:
+            _profile_lock.release()
+        metrics.get_registry().inc('wordlas_profiled_requests_total', {'view': view})
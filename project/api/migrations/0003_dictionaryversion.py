@@ -0,0 +1,25 @@
+# Generated by Django 5.1.6 on 2026-10-17 01:11
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_remove_guessresultpattern_pattern_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DictionaryVersion',
+            fields=[
+                ('id', models.PositiveSmallIntegerField(db_column='version_id', default=1, primary_key=True, serialize=False)),
+                ('stamp', models.UUIDField(default=uuid.uuid4)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'dictionary_versions',
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.1.6 on 2026-10-17 01:40
+
+import itertools
+
+import django.core.validators
+from django.db import migrations, models
+
+
+def seed_patterns(apps, schema_editor):
+    """
+    Seeds all 3^5 feedback patterns. Rows are enumerated in base-3 order
+    (N=0, Y=1, G=2, first letter most significant), so pattern_id is the
+    pattern code from api.scoring plus one.
+    """
+    GuessResultPattern = apps.get_model('api', 'GuessResultPattern')
+    GuessResultPattern.objects.bulk_create(
+        GuessResultPattern(id=code + 1, pattern=''.join(letters))
+        for code, letters in enumerate(itertools.product('NYG', repeat=5))
+    )
+
+
+def unseed_patterns(apps, schema_editor):
+    apps.get_model('api', 'GuessResultPattern').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_dictionaryversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='guessresultpattern',
+            name='pattern',
+            field=models.CharField(default='', max_length=5, unique=True, validators=[django.core.validators.MinLengthValidator(5)]),
+            preserve_default=False,
+        ),
+        migrations.RunPython(seed_patterns, unseed_patterns),
+    ]
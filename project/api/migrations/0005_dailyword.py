@@ -0,0 +1,25 @@
+# Generated by Django 5.1.6 on 2026-10-17 01:16
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_guessresultpattern_pattern'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyWord',
+            fields=[
+                ('date', models.DateField(primary_key=True, serialize=False)),
+                ('word_text', models.CharField(max_length=5, validators=[django.core.validators.MinLengthValidator(5)])),
+                ('complexity', models.PositiveSmallIntegerField()),
+            ],
+            options={
+                'db_table': 'daily_words',
+            },
+        ),
+    ]
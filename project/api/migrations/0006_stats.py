@@ -0,0 +1,51 @@
+# Generated by Django 5.1.6 on 2026-10-17 01:20
+
+import api.models
+import django.contrib.postgres.fields
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_dailyword'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GlobalStats',
+            fields=[
+                ('shard', models.PositiveSmallIntegerField(db_column='shard_id', primary_key=True, serialize=False)),
+                ('games_played', models.PositiveBigIntegerField(default=0)),
+                ('games_won', models.PositiveBigIntegerField(default=0)),
+                ('guess_distribution', django.contrib.postgres.fields.ArrayField(base_field=models.PositiveBigIntegerField(), default=api.models.empty_guess_distribution, size=6)),
+            ],
+            options={
+                'db_table': 'global_stats',
+            },
+        ),
+        migrations.CreateModel(
+            name='PlayerStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('games_played', models.PositiveIntegerField(default=0)),
+                ('games_won', models.PositiveIntegerField(default=0)),
+                ('current_streak', models.PositiveIntegerField(default=0)),
+                ('max_streak', models.PositiveIntegerField(default=0)),
+                ('guess_distribution', django.contrib.postgres.fields.ArrayField(base_field=models.PositiveIntegerField(), default=api.models.empty_guess_distribution, size=6)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'player_stats',
+            },
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='player',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='games', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
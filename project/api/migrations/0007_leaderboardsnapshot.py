@@ -0,0 +1,50 @@
+# Generated by Django 5.1.6 on 2026-10-17 01:21
+
+from django.db import migrations, models
+
+# Sends the game id on the game_finished channel when a game gets its
+# ended_at, so workers can update their in-memory leaderboards.
+NOTIFY_GAME_FINISHED = """
+CREATE FUNCTION notify_game_finished() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.ended_at IS NOT NULL THEN
+        RETURN NULL;
+    END IF;
+    PERFORM pg_notify('game_finished', NEW.game_id::text);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER game_finished_notify
+AFTER INSERT OR UPDATE OF ended_at ON game_sessions
+FOR EACH ROW WHEN (NEW.ended_at IS NOT NULL)
+EXECUTE FUNCTION notify_game_finished();
+"""
+
+DROP_NOTIFY_GAME_FINISHED = """
+DROP TRIGGER IF EXISTS game_finished_notify ON game_sessions;
+DROP FUNCTION IF EXISTS notify_game_finished();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardSnapshot',
+            fields=[
+                ('id', models.AutoField(db_column='snapshot_id', primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('high_water', models.DateTimeField(blank=True, null=True)),
+                ('boards', models.JSONField()),
+            ],
+            options={
+                'db_table': 'leaderboard_snapshots',
+            },
+        ),
+        migrations.RunSQL(NOTIFY_GAME_FINISHED, DROP_NOTIFY_GAME_FINISHED),
+    ]
@@ -0,0 +1,167 @@
+import datetime
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+# The DDL and date helpers below are frozen copies of api.partitions as of
+# this migration, so later changes to that module do not change what it does.
+
+GAME_COLUMNS = 'game_id, word_to_guess, created_at, ended_at, player_id'
+GUESS_COLUMNS = 'guess_id, guessed_word, created_at, attempt_number, game_id, result_pattern_id'
+
+GAME_TABLE = """
+CREATE TABLE game_sessions (
+    game_id uuid NOT NULL,
+    word_to_guess varchar(5) NOT NULL,
+    created_at timestamp with time zone NOT NULL,
+    ended_at timestamp with time zone NULL,
+    player_id integer NULL
+){partitioning};
+"""
+
+GUESS_TABLE = """
+CREATE TABLE game_guesses (
+    guess_id uuid NOT NULL,
+    guessed_word varchar(100) NOT NULL,
+    created_at timestamp with time zone NOT NULL,
+    attempt_number integer NOT NULL CONSTRAINT game_guesses_attempt_number_check CHECK (attempt_number >= 0),
+    game_id uuid NOT NULL,
+    result_pattern_id integer NOT NULL
+){partitioning};
+"""
+
+DEFAULT_PARTITIONS = """
+CREATE TABLE game_sessions_default PARTITION OF game_sessions DEFAULT;
+CREATE TABLE game_guesses_default PARTITION OF game_guesses DEFAULT;
+CREATE UNIQUE INDEX game_guesses_default_game_attempt_uniq ON game_guesses_default (game_id, attempt_number);
+"""
+
+# Constraint and index names are the ones Django generated in 0001/0006.
+GAME_CONSTRAINTS = """
+ALTER TABLE game_sessions ADD CONSTRAINT game_sessions_pkey PRIMARY KEY ({game_key});
+CREATE INDEX game_sessions_player_id_e3f784d8 ON game_sessions (player_id);
+ALTER TABLE game_sessions ADD CONSTRAINT game_sessions_player_id_e3f784d8_fk_auth_user_id
+    FOREIGN KEY (player_id) REFERENCES auth_user (id) DEFERRABLE INITIALLY DEFERRED;
+CREATE TRIGGER game_finished_notify
+AFTER INSERT OR UPDATE OF ended_at ON game_sessions
+FOR EACH ROW WHEN (NEW.ended_at IS NOT NULL)
+EXECUTE FUNCTION notify_game_finished();
+"""
+
+GUESS_CONSTRAINTS = """
+ALTER TABLE game_guesses ADD CONSTRAINT game_guesses_pkey PRIMARY KEY ({guess_key});
+CREATE INDEX game_guesses_game_id_46b67ed1 ON game_guesses (game_id);
+CREATE INDEX game_guesses_result_pattern_id_36262392 ON game_guesses (result_pattern_id);
+ALTER TABLE game_guesses ADD CONSTRAINT game_guesses_result_pattern_id_36262392_fk_guess_pat
+    FOREIGN KEY (result_pattern_id) REFERENCES guess_patterns (pattern_id) DEFERRABLE INITIALLY DEFERRED;
+"""
+
+UNPARTITIONED_GUESS_CONSTRAINTS = """
+ALTER TABLE game_guesses ADD CONSTRAINT game_guesses_game_id_attempt_number_96737453_uniq
+    UNIQUE (game_id, attempt_number);
+ALTER TABLE game_guesses ADD CONSTRAINT game_guesses_game_id_46b67ed1_fk_game_sessions_game_id
+    FOREIGN KEY (game_id) REFERENCES game_sessions (game_id) DEFERRABLE INITIALLY DEFERRED;
+"""
+
+
+def month_start(value):
+    return datetime.date(value.year, value.month, 1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def create_month_partitions(cursor, first, last):
+    """
+    Creates the month partitions of both (new, empty) tables from first
+    through last, bounded in the project time zone.
+    """
+    tz = timezone.get_current_timezone()
+    for table in ('game_sessions', 'game_guesses'):
+        month = first
+        while month <= last:
+            name = f'{table}_y{month.year}m{month.month:02d}'
+            start = datetime.datetime.combine(month, datetime.time(), tzinfo=tz)
+            end = datetime.datetime.combine(add_months(month, 1), datetime.time(), tzinfo=tz)
+            cursor.execute(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+            cursor.execute(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s)", [start, end])
+            if table == 'game_guesses':
+                # Unique constraints on the parent would have to include created_at
+                cursor.execute(f"CREATE UNIQUE INDEX {name}_game_attempt_uniq ON {name} (game_id, attempt_number)")
+            month = add_months(month, 1)
+
+
+def replace_tables(schema_editor, partitioned):
+    """
+    Recreates game_sessions and game_guesses (partitioned or not) and copies
+    the rows over. Indexes and constraints are added after the copy.
+    """
+    execute = schema_editor.execute
+    execute("ALTER TABLE game_sessions RENAME TO game_sessions_old")
+    execute("ALTER TABLE game_guesses RENAME TO game_guesses_old")
+    partitioning = ' PARTITION BY RANGE (created_at)' if partitioned else ''
+    execute(GAME_TABLE.format(partitioning=partitioning))
+    execute(GUESS_TABLE.format(partitioning=partitioning))
+
+    if partitioned:
+        execute(DEFAULT_PARTITIONS)
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT least((SELECT min(created_at) FROM game_sessions_old), "
+                "(SELECT min(created_at) FROM game_guesses_old))"
+            )
+            oldest = cursor.fetchone()[0]
+            this_month = month_start(timezone.localdate())
+            first = month_start(timezone.localtime(oldest)) if oldest else this_month
+            months_ahead = getattr(settings, 'GAME_PARTITION_MONTHS_AHEAD', 3)
+            create_month_partitions(cursor, min(first, this_month), add_months(this_month, months_ahead))
+
+    execute(f"INSERT INTO game_sessions ({GAME_COLUMNS}) SELECT {GAME_COLUMNS} FROM game_sessions_old")
+    execute(f"INSERT INTO game_guesses ({GUESS_COLUMNS}) SELECT {GUESS_COLUMNS} FROM game_guesses_old")
+    execute("DROP TABLE game_guesses_old")
+    execute("DROP TABLE game_sessions_old")
+
+    execute(GAME_CONSTRAINTS.format(game_key='game_id, created_at' if partitioned else 'game_id'))
+    execute(GUESS_CONSTRAINTS.format(guess_key='guess_id, created_at' if partitioned else 'guess_id'))
+    if not partitioned:
+        execute(UNPARTITIONED_GUESS_CONSTRAINTS)
+
+
+def partition_tables(apps, schema_editor):
+    replace_tables(schema_editor, partitioned=True)
+
+
+def unpartition_tables(apps, schema_editor):
+    replace_tables(schema_editor, partitioned=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_leaderboardsnapshot'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='game',
+            options={},
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                # Partitioned game_sessions has no unique constraint on
+                # game_id alone, so the foreign key is not enforced in the database.
+                migrations.AlterField(
+                    model_name='guess',
+                    name='game',
+                    field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='guesses', to='api.game'),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(partition_tables, unpartition_tables),
+            ],
+        ),
+    ]
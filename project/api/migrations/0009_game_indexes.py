@@ -0,0 +1,65 @@
+# Generated by Django 5.1.6 on 2026-10-17 01:27
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# Frozen here rather than imported from api.partitions, so this migration
+# keeps building the same index whatever that module does later.
+COVERING_GUESS_INDEX = (
+    "CREATE UNIQUE INDEX {partition}_game_attempt_uniq ON {partition} (game_id, attempt_number) "
+    "INCLUDE (result_pattern_id, guessed_word)"
+)
+
+
+def guess_partitions(cursor):
+    cursor.execute(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = 'game_guesses'::regclass"
+    )
+    return [name for name, in cursor.fetchall()]
+
+
+def cover_guess_indexes(apps, schema_editor):
+    """
+    Rebuilds the per-partition (game_id, attempt_number) unique indexes with
+    the columns the API reads, replacing the game_id index dropped here.
+    """
+    with schema_editor.connection.cursor() as cursor:
+        for partition in guess_partitions(cursor):
+            cursor.execute(f"DROP INDEX IF EXISTS {partition}_game_attempt_uniq")
+            cursor.execute(COVERING_GUESS_INDEX.format(partition=partition))
+
+
+def uncover_guess_indexes(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        for partition in guess_partitions(cursor):
+            cursor.execute(f"DROP INDEX IF EXISTS {partition}_game_attempt_uniq")
+            cursor.execute(
+                f"CREATE UNIQUE INDEX {partition}_game_attempt_uniq ON {partition} (game_id, attempt_number)"
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_partition_games'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='guess',
+            name='game',
+            field=models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='guesses', to='api.game'),
+        ),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(condition=models.Q(('ended_at__isnull', True)), fields=['player', 'created_at'], name='game_sessions_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(condition=models.Q(('ended_at__isnull', False)), fields=['ended_at'], name='game_sessions_finished_idx'),
+        ),
+        migrations.RunPython(cover_guess_indexes, uncover_guess_indexes),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-17 01:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_game_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='game',
+            name='hard_mode',
+            field=models.BooleanField(db_default=False, default=False),
+        ),
+    ]
@@ -0,0 +1,121 @@
+from django.db import migrations, models
+
+# Frozen DDL, like 0008/0009: later changes to api.partitions do not change
+# what this migration does.
+
+GUESS_COLUMNS = 'guess_id, guessed_word, created_at, attempt_number, game_id, result_pattern_id'
+
+GUESS_TABLE = """
+CREATE TABLE game_guesses (
+    guess_id uuid NOT NULL,
+    guessed_word varchar(100) NOT NULL,
+    created_at timestamp with time zone NOT NULL,
+    attempt_number integer NOT NULL CONSTRAINT game_guesses_attempt_number_check CHECK (attempt_number >= 0),
+    game_id uuid NOT NULL,
+    result_pattern_id integer NOT NULL{extra_columns}
+) PARTITION BY RANGE ({partition_key});
+"""
+
+GUESS_CONSTRAINTS = """
+ALTER TABLE game_guesses ADD CONSTRAINT game_guesses_pkey PRIMARY KEY (guess_id, {partition_key});
+CREATE INDEX game_guesses_result_pattern_id_36262392 ON game_guesses (result_pattern_id);
+ALTER TABLE game_guesses ADD CONSTRAINT game_guesses_result_pattern_id_36262392_fk_guess_pat
+    FOREIGN KEY (result_pattern_id) REFERENCES guess_patterns (pattern_id) DEFERRABLE INITIALLY DEFERRED;
+"""
+
+# All guesses of a game share its created_at, so unique with it is unique
+# per game, and the constraint can live on the parent table.
+GAME_ATTEMPT_CONSTRAINT = """
+ALTER TABLE game_guesses ADD CONSTRAINT game_guesses_game_attempt_uniq
+    UNIQUE (game_id, attempt_number, game_created_at) INCLUDE (result_pattern_id, guessed_word);
+"""
+
+# The per-partition index of migration 0009
+COVERING_GUESS_INDEX = (
+    "CREATE UNIQUE INDEX {partition}_game_attempt_uniq ON {partition} (game_id, attempt_number) "
+    "INCLUDE (result_pattern_id, guessed_word)"
+)
+
+
+def game_partitions(cursor):
+    """
+    (name, bound) of the partitions of game_sessions, e.g.
+    ('game_sessions_y2025m03', "FOR VALUES FROM (...) TO (...)").
+    """
+    cursor.execute(
+        "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = 'game_sessions'::regclass"
+    )
+    return cursor.fetchall()
+
+
+def replace_guesses(schema_editor, by_game):
+    """
+    Recreates game_guesses partitioned by its game's created_at (by_game) or
+    its own, with a partition per game_sessions partition, and copies the
+    rows over. Indexes and constraints are added after the copy.
+    """
+    execute = schema_editor.execute
+    if by_game:
+        # Guesses of games that are gone (e.g. archived) keep their own time
+        execute(
+            f"CREATE TABLE game_guesses_old AS SELECT {GUESS_COLUMNS}, coalesce("
+            f"(SELECT min(s.created_at) FROM game_sessions s WHERE s.game_id = g.game_id), g.created_at"
+            f") AS game_created_at FROM game_guesses g"
+        )
+    else:
+        execute(f"CREATE TABLE game_guesses_old AS SELECT {GUESS_COLUMNS} FROM game_guesses")
+    execute("DROP TABLE game_guesses")
+
+    partition_key = 'game_created_at' if by_game else 'created_at'
+    execute(GUESS_TABLE.format(
+        extra_columns=',\n    game_created_at timestamp with time zone NOT NULL' if by_game else '',
+        partition_key=partition_key
+    ))
+    with schema_editor.connection.cursor() as cursor:
+        partitions = [
+            (name.replace('game_sessions', 'game_guesses', 1), bound) for name, bound in game_partitions(cursor)
+        ]
+    for name, bound in partitions:
+        execute(f"CREATE TABLE {name} PARTITION OF game_guesses {bound}")
+
+    columns = f'{GUESS_COLUMNS}, game_created_at' if by_game else GUESS_COLUMNS
+    execute(f"INSERT INTO game_guesses ({columns}) SELECT {columns} FROM game_guesses_old")
+    execute("DROP TABLE game_guesses_old")
+
+    execute(GUESS_CONSTRAINTS.format(partition_key=partition_key))
+    if by_game:
+        execute(GAME_ATTEMPT_CONSTRAINT)
+    else:
+        for name, _ in partitions:
+            execute(COVERING_GUESS_INDEX.format(partition=name))
+
+
+def partition_by_game(apps, schema_editor):
+    replace_guesses(schema_editor, by_game=True)
+
+
+def partition_by_guess(apps, schema_editor):
+    replace_guesses(schema_editor, by_game=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_game_hard_mode'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddField(
+                    model_name='guess',
+                    name='game_created_at',
+                    field=models.DateTimeField(),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(partition_by_game, partition_by_guess),
+            ],
+        ),
+    ]
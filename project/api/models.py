@@ -1,8 +1,11 @@
+from django.conf import settings
 from django.db import models
 import uuid
 from django.core.validators import MinLengthValidator
 from django.contrib.postgres.fields import ArrayField
 
+MAX_ATTEMPTS = 6
+
 class Game(models.Model):
     id = models.UUIDField(
         primary_key=True,
@@ -16,10 +19,33 @@ class Game(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
     ended_at = models.DateTimeField(null=True, blank=True)
+    player = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='games'
+    )
+    # Every revealed hint must be used in later guesses (see api.letters)
+    hard_mode = models.BooleanField(default=False, db_default=False)
 
     class Meta:
+        # Partitioned by created_at month, see api.partitions
         db_table = 'game_sessions'
-        ordering = ['-created_at']
+        indexes = [
+            # A player's unfinished games
+            models.Index(
+                fields=['player', 'created_at'],
+                condition=models.Q(ended_at__isnull=True),
+                name='game_sessions_active_idx'
+            ),
+            # Finished games by end time (per-day stats, leaderboard catch-up)
+            models.Index(
+                fields=['ended_at'],
+                condition=models.Q(ended_at__isnull=False),
+                name='game_sessions_finished_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"Game {self.id} - Word: {self.word_to_guess}"
@@ -34,17 +60,19 @@ class GuessResultPattern(models.Model):
         primary_key=True,
         db_column='pattern_id'
     )
+    # One LetterMatch letter per position, e.g. 'GYNNN'. All 3^5 patterns are
+    # seeded by migration 0004, so rows are never created at request time.
     pattern = models.CharField(
         max_length=5,
-        validators=[MinLengthValidator(5)],
-        choices=LetterMatch.choices
-    ),
+        unique=True,
+        validators=[MinLengthValidator(5)]
+    )
 
     class Meta:
         db_table = 'guess_patterns'
 
     def __str__(self):
-        return ''.join(self.pattern)
+        return self.pattern
 
 class Guess(models.Model):
     """
@@ -56,10 +84,15 @@ class Guess(models.Model):
         editable=False,
         db_column='guess_id'
     )
+    # Not enforced by the database: partitioned game_sessions has no unique
+    # constraint on game_id alone. Lookups by game use the covering
+    # (game_id, attempt_number, game_created_at) unique index (see api.partitions).
     game = models.ForeignKey(
         Game,
         on_delete=models.CASCADE,
-        related_name='guesses'
+        related_name='guesses',
+        db_constraint=False,
+        db_index=False
     )
     guessed_word = models.CharField(
         max_length=100,
@@ -72,6 +105,9 @@ class Guess(models.Model):
         related_name='guesses'
     )
     attempt_number = models.PositiveIntegerField()
+    # The game's created_at, which guesses are partitioned by, so that a
+    # game's guesses share one partition (see api.partitions)
+    game_created_at = models.DateTimeField()
 
     class Meta:
         db_table = 'game_guesses'
@@ -81,6 +117,11 @@ class Guess(models.Model):
     def __str__(self):
         return f"Guess {self.attempt_number} for game {self.game_id}: {self.guessed_word}"
 
+    def save(self, *args, **kwargs):
+        if self.game_created_at is None:
+            self.game_created_at = self.game.created_at
+        super().save(*args, **kwargs)
+
 class DictionaryWord(models.Model):
     """
     Represents a word in the Lithuanian dictionary.
@@ -104,4 +145,124 @@ class DictionaryWord(models.Model):
         ]
 
     def __str__(self):
-        return f"{self.word_text} (complexity: {self.complexity})"
\ No newline at end of file
+        return f"{self.word_text} (complexity: {self.complexity})"
+
+def empty_guess_distribution():
+    return [0] * MAX_ATTEMPTS
+
+class PlayerStats(models.Model):
+    """
+    Running totals for one player, updated in place whenever one of their
+    games ends (see api.stats). guess_distribution[i] counts games won in
+    i + 1 attempts.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats'
+    )
+    games_played = models.PositiveIntegerField(default=0)
+    games_won = models.PositiveIntegerField(default=0)
+    current_streak = models.PositiveIntegerField(default=0)
+    max_streak = models.PositiveIntegerField(default=0)
+    guess_distribution = ArrayField(
+        models.PositiveIntegerField(),
+        size=MAX_ATTEMPTS,
+        default=empty_guess_distribution
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'player_stats'
+
+    def __str__(self):
+        return f"Stats for user {self.user_id}: {self.games_won}/{self.games_played} won"
+
+class GlobalStats(models.Model):
+    """
+    Totals over all games, spread over GLOBAL_STATS_SHARDS rows so that games
+    ending at the same time do not queue on one row lock. Read the sum.
+    """
+    shard = models.PositiveSmallIntegerField(
+        primary_key=True,
+        db_column='shard_id'
+    )
+    games_played = models.PositiveBigIntegerField(default=0)
+    games_won = models.PositiveBigIntegerField(default=0)
+    guess_distribution = ArrayField(
+        models.PositiveBigIntegerField(),
+        size=MAX_ATTEMPTS,
+        default=empty_guess_distribution
+    )
+
+    class Meta:
+        db_table = 'global_stats'
+
+    def __str__(self):
+        return f"Global stats shard {self.shard}"
+
+class LeaderboardSnapshot(models.Model):
+    """
+    Compact copy of the in-memory leaderboards (see api.leaderboard), so a
+    worker can start from it instead of replaying every finished game.
+    """
+    id = models.AutoField(
+        primary_key=True,
+        db_column='snapshot_id'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    # ended_at of the newest game included in the snapshot
+    high_water = models.DateTimeField(null=True, blank=True)
+    # {board name: [[player id, attempts, duration in ms], ...]}
+    boards = models.JSONField()
+
+    class Meta:
+        db_table = 'leaderboard_snapshots'
+
+    def __str__(self):
+        return f"Leaderboard snapshot {self.id} ({self.created_at})"
+
+class DailyWord(models.Model):
+    """
+    The word of a calendar day, precomputed by the schedule_daily_words command.
+    """
+    date = models.DateField(primary_key=True)
+    word_text = models.CharField(
+        max_length=5,
+        validators=[MinLengthValidator(5)]
+    )
+    complexity = models.PositiveSmallIntegerField()
+
+    class Meta:
+        db_table = 'daily_words'
+
+    def __str__(self):
+        return f"{self.date}: {self.word_text}"
+
+class DictionaryVersion(models.Model):
+    """
+    Single-row stamp that changes whenever the dictionary does, so workers
+    know when their in-memory dictionary index is stale.
+    """
+    id = models.PositiveSmallIntegerField(
+        primary_key=True,
+        default=1,
+        db_column='version_id'
+    )
+    stamp = models.UUIDField(default=uuid.uuid4)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'dictionary_versions'
+
+    def __str__(self):
+        return f"Dictionary version {self.stamp}"
+
+    @classmethod
+    def current(cls):
+        return cls.objects.filter(id=1).values_list('stamp', flat=True).first()
+
+    @classmethod
+    def bump(cls):
+        cls.objects.update_or_create(id=1, defaults={'stamp': uuid.uuid4()})
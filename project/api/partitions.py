@@ -0,0 +1,166 @@
+"""
+Monthly range partitions of ``game_sessions`` and ``game_guesses``.
+
+Games are partitioned by their ``created_at`` (migration 0008) and guesses
+by their game's, ``game_created_at`` (migration 0011), so a game and its
+guesses share a month: one partition per calendar month named
+``<table>_y2025m03``, plus a DEFAULT partition that catches rows no month
+partition covers yet. Primary keys include the partition column, as
+Postgres requires for partitioned tables, and so does the unique
+``(game_id, attempt_number, game_created_at)`` constraint of guesses, which
+is unique per game all the same. Lookups by game pass its created_at too,
+so that only its partition is read. That index also covers ``result_pattern_id`` and
+``guessed_word``, so a game's guesses in attempt order are read with an
+index-only scan.
+
+``create_partitions`` adds the partitions of the coming months ahead of
+time (rows already in the DEFAULT partition for such a month are moved
+into it). ``archive_partitions`` exports month partitions older than the
+retention period to gzipped CSV files, then detaches and drops them, so the
+tables only ever hold the recent months.
+"""
+import datetime
+import gzip
+import os
+import re
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from api.models import Game, Guess
+
+PARTITIONED_TABLES = (Game._meta.db_table, Guess._meta.db_table)
+
+# The column each table is partitioned by
+PARTITION_KEYS = {Game._meta.db_table: 'created_at', Guess._meta.db_table: 'game_created_at'}
+
+_MONTH_SUFFIX = re.compile(r'_y(\d{4})m(\d{2})$')
+
+
+def months_ahead():
+    return getattr(settings, 'GAME_PARTITION_MONTHS_AHEAD', 3)
+
+
+def retention_months():
+    return getattr(settings, 'GAME_RETENTION_MONTHS', 12)
+
+
+def month_start(value):
+    return datetime.date(value.year, value.month, 1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table, month):
+    return f'{table}_y{month.year}m{month.month:02d}'
+
+
+def month_bounds(month):
+    """
+    Partition bounds of `month` as timestamps in the project time zone.
+    """
+    tz = timezone.get_current_timezone()
+    start = datetime.datetime.combine(month, datetime.time(), tzinfo=tz)
+    end = datetime.datetime.combine(add_months(month, 1), datetime.time(), tzinfo=tz)
+    return start, end
+
+
+def existing_partitions(cursor, table):
+    """
+    Returns {month: partition name} of the month partitions of `table`.
+    """
+    cursor.execute(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = %s::regclass",
+        [table]
+    )
+    partitions = {}
+    for name, in cursor.fetchall():
+        match = _MONTH_SUFFIX.search(name)
+        if match and name == partition_name(table, datetime.date(int(match[1]), int(match[2]), 1)):
+            partitions[datetime.date(int(match[1]), int(match[2]), 1)] = name
+    return partitions
+
+
+def create_partition(cursor, table, month):
+    """
+    Creates the partition of `table` for `month`. Rows of that month already
+    in the DEFAULT partition are moved into it before it is attached.
+    """
+    name = partition_name(table, month)
+    key = PARTITION_KEYS[table]
+    start, end = month_bounds(month)
+    cursor.execute(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+    cursor.execute(
+        f"WITH moved AS (DELETE FROM {table}_default WHERE {key} >= %s AND {key} < %s RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved",
+        [start, end]
+    )
+    cursor.execute(
+        f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s)",
+        [start, end]
+    )
+    return name
+
+
+def create_partitions(first=None, last=None):
+    """
+    Creates the missing month partitions from `first` (default: this month)
+    through `last` (default: months_ahead() months later). Returns the names
+    of the new partitions.
+    """
+    first = month_start(first or timezone.localdate())
+    last = month_start(last or add_months(first, months_ahead()))
+    created = []
+    with transaction.atomic(), connection.cursor() as cursor:
+        for table in PARTITIONED_TABLES:
+            existing = existing_partitions(cursor, table)
+            month = first
+            while month <= last:
+                if month not in existing:
+                    created.append(create_partition(cursor, table, month))
+                month = add_months(month, 1)
+    return created
+
+
+def archive_partition(table, month, directory):
+    """
+    Writes the rows of one month partition to <directory>/<partition>.csv.gz,
+    then detaches and drops the partition. Returns the file path.
+    """
+    name = partition_name(table, month)
+    path = os.path.join(directory, f'{name}.csv.gz')
+    with transaction.atomic(), connection.cursor() as cursor:
+        # Block writes to the partition while it is exported and detached
+        cursor.execute(f"LOCK TABLE {name} IN SHARE MODE")
+        with open(path, 'wb') as raw:
+            with gzip.GzipFile(fileobj=raw, mode='wb') as output:
+                with cursor.copy(f"COPY {name} TO STDOUT WITH (FORMAT csv, HEADER)") as copy:
+                    for data in copy:
+                        output.write(data)
+            raw.flush()
+            os.fsync(raw.fileno())
+        cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {name}")
+        cursor.execute(f"DROP TABLE {name}")
+    return path
+
+
+def archive_partitions(directory, before=None):
+    """
+    Archives the month partitions older than `before` (default: the
+    retention_months() months before this one). Returns the file paths.
+    """
+    before = month_start(before or add_months(month_start(timezone.localdate()), -retention_months()))
+    os.makedirs(directory, exist_ok=True)
+    with connection.cursor() as cursor:
+        old = [
+            (table, month)
+            for table in PARTITIONED_TABLES
+            for month in sorted(existing_partitions(cursor, table))
+            if month < before
+        ]
+    return [archive_partition(table, month, directory) for table, month in old]
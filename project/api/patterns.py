@@ -0,0 +1,48 @@
+"""
+Per-worker cache of the canonical ``guess_patterns`` rows.
+
+The 243 rows are seeded once by a migration and never change, so each worker
+reads them a single time and afterwards maps a pattern code from
+``api.scoring`` to its primary key without touching the database.
+"""
+import threading
+
+from asgiref.sync import sync_to_async
+
+from api.models import GuessResultPattern
+from api.scoring import PATTERN_COUNT, pattern_from_string
+
+_pattern_ids = None
+_lock = threading.Lock()
+
+
+def load_pattern_ids():
+    ids = {
+        pattern_from_string(pattern): pk
+        for pk, pattern in GuessResultPattern.objects.values_list('id', 'pattern')
+    }
+    if len(ids) != PATTERN_COUNT:
+        raise RuntimeError(f"Expected {PATTERN_COUNT} guess patterns, found {len(ids)}; run migrations")
+    return ids
+
+
+def get_pattern_ids():
+    """
+    Returns the pattern code -> GuessResultPattern pk mapping.
+    """
+    global _pattern_ids  # pylint: disable=global-statement
+    if _pattern_ids is None:
+        with _lock:
+            if _pattern_ids is None:
+                _pattern_ids = load_pattern_ids()
+    return _pattern_ids
+
+
+async def aget_pattern_ids():
+    if _pattern_ids is not None:
+        return _pattern_ids
+    return await sync_to_async(get_pattern_ids)()
+
+
+def pattern_id(code):
+    return get_pattern_ids()[code]
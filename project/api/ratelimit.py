@@ -0,0 +1,210 @@
+"""
+Per-client rate limits for the API views, applied with ``rate_limit``.
+
+``RATE_LIMITS`` maps a limit's name to a rate such as ``'30/m'``: each
+client may make 30 requests a minute, in bursts of up to 30. On limits
+keyed by user a client is the logged-in user, else the anonymous session,
+if there is one. Otherwise, and on limits keyed by IP, it is the IP address.
+
+Behind proxies that append the address they were connected from to the
+``RATE_LIMIT_IP_HEADER`` request header (X-Forwarded-For), the address is
+the one the outermost of ``RATE_LIMIT_TRUSTED_PROXIES`` proxies saw: the
+entry that many from the right. Entries left of it come from the client and
+are ignored. Without the header, or with fewer entries than proxies, it is
+REMOTE_ADDR. Requests over the limit get a 429 with Retry-After.
+
+``RATE_LIMIT_BACKEND`` picks where the counts live:
+
+* ``local``: a token bucket per client in each worker, at most
+  ``RATE_LIMIT_MAX_CLIENTS`` of them, least recently seen dropped first. No
+  I/O, but each worker admits the full rate;
+* ``django``: a count per client and window of the period in the
+  ``RATE_LIMIT_CACHE`` cache, shared by the workers when the cache is
+  (e.g. Redis or memcached). Counts use add() and incr(), which such caches
+  apply atomically. Fixed windows let a client make up to twice the rate
+  across a window boundary.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache, wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+@lru_cache(maxsize=None)
+def parse_rate(rate):
+    """
+    '30/m' -> (30, 60): the requests allowed per period in seconds.
+    """
+    count, _, period = rate.partition('/')
+    if period not in PERIODS or not count.isdigit() or int(count) < 1:
+        raise ValueError(f"Invalid rate {rate!r}, expected e.g. '30/m'")
+    return int(count), PERIODS[period]
+
+
+class LocalBuckets:
+    """
+    Token buckets of `count` tokens that refill over `period` seconds,
+    stored as (tokens, monotonic time they were counted at).
+    """
+    def __init__(self, max_clients=100000):
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def take(self, key, count, period, now=None):
+        """
+        Takes a token from key's bucket. Returns 0 if there was one, else
+        the seconds until there is.
+        """
+        now = time.monotonic() if now is None else now
+        refill = count / period
+        with self._lock:
+            tokens, counted_at = self._buckets.pop(key, (count, now))
+            tokens = min(count, tokens + (now - counted_at) * refill)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / refill
+            self._buckets[key] = (tokens - 1 if tokens >= 1 else tokens, now)
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        return wait
+
+    async def atake(self, key, count, period):
+        return self.take(key, count, period)
+
+
+class CacheWindows:
+    """
+    Request counts under 'ratelimit:<key>:<window>' in a Django cache.
+    """
+    def __init__(self, alias='ratelimit'):
+        self.cache = caches[alias]
+
+    @staticmethod
+    def window(key, period, now):
+        window = int(now // period)
+        return f'ratelimit:{key}:{window}', (window + 1) * period - now
+
+    def take(self, key, count, period, now=None):
+        cache_key, remaining = self.window(key, period, time.time() if now is None else now)
+        self.cache.add(cache_key, 0, period + 1)
+        try:
+            used = self.cache.incr(cache_key)
+        except ValueError:  # evicted since add()
+            self.cache.set(cache_key, 1, period + 1)
+            used = 1
+        return 0.0 if used <= count else remaining
+
+    async def atake(self, key, count, period):
+        cache_key, remaining = self.window(key, period, time.time())
+        await self.cache.aadd(cache_key, 0, period + 1)
+        try:
+            used = await self.cache.aincr(cache_key)
+        except ValueError:
+            await self.cache.aset(cache_key, 1, period + 1)
+            used = 1
+        return 0.0 if used <= count else remaining
+
+
+def create_limiter():
+    if getattr(settings, 'RATE_LIMIT_BACKEND', 'local') == 'django':
+        return CacheWindows(getattr(settings, 'RATE_LIMIT_CACHE', 'ratelimit'))
+    return LocalBuckets(getattr(settings, 'RATE_LIMIT_MAX_CLIENTS', 100000))
+
+
+_limiter = None
+_lock = threading.Lock()
+
+
+def get_limiter():
+    global _limiter  # pylint: disable=global-statement
+    if _limiter is None:
+        with _lock:
+            if _limiter is None:
+                _limiter = create_limiter()
+    return _limiter
+
+
+def reset_rate_limits():
+    global _limiter  # pylint: disable=global-statement
+    with _lock:
+        _limiter = None
+
+
+def client_ip(request):
+    header = getattr(settings, 'RATE_LIMIT_IP_HEADER', '')
+    proxies = getattr(settings, 'RATE_LIMIT_TRUSTED_PROXIES', 1)
+    forwarded = [address.strip() for address in request.META.get(header, '').split(',')] if header else []
+    forwarded = [address for address in forwarded if address]
+    if len(forwarded) >= proxies > 0:
+        return forwarded[-proxies]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def limit_for(request, name, methods):
+    """
+    The (count, period) of the named limit for this request, or None.
+    """
+    if not getattr(settings, 'RATE_LIMIT', False) or (methods and request.method not in methods):
+        return None
+    rate = getattr(settings, 'RATE_LIMITS', {}).get(name)
+    return parse_rate(rate) if rate else None
+
+
+def too_many_requests(wait):
+    response = HttpResponse("Too many requests", status=429)
+    response['Retry-After'] = str(max(math.ceil(wait), 1))
+    return response
+
+
+def rate_limit(name, key='ip', methods=None):
+    """
+    Limits a view (sync or async) to the rate RATE_LIMITS[name] per client.
+    key is 'ip', or 'user' to count logged-in users by user and anonymous
+    ones by session instead, at the cost of loading the user (which views
+    that use it anyway get cached). methods, e.g. ('POST',), limits only
+    those methods.
+    """
+    def client(user, request):
+        if key == 'user':
+            if user.is_authenticated:
+                return f'{name}:user:{user.pk}'
+            # The session was loaded with the user, so a key the session
+            # store does not know has been dropped by now
+            session_key = request.session.session_key if hasattr(request, 'session') else None
+            if session_key:
+                return f'{name}:session:{session_key}'
+        return f'{name}:ip:{client_ip(request)}'
+
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def limited(request, *args, **kwargs):
+                limit = limit_for(request, name, methods)
+                if limit is not None:
+                    user = await request.auser() if key == 'user' else None
+                    wait = await get_limiter().atake(client(user, request), *limit)
+                    if wait:
+                        return too_many_requests(wait)
+                return await view(request, *args, **kwargs)
+        else:
+            @wraps(view)
+            def limited(request, *args, **kwargs):
+                limit = limit_for(request, name, methods)
+                if limit is not None:
+                    user = request.user if key == 'user' else None
+                    wait = get_limiter().take(client(user, request), *limit)
+                    if wait:
+                        return too_many_requests(wait)
+                return view(request, *args, **kwargs)
+        return limited
+    return decorator
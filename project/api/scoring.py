@@ -0,0 +1,158 @@
+"""
+Server-side guess scoring.
+
+A guess is scored against the target the same way ``colorWordHints`` in
+``word-grid.js`` does it: greens first, then yellows left to right while the
+target still has unmatched copies of the letter. The result is encoded as a
+base-3 integer with the first letter as the most significant digit
+(NONE=0, YELLOW=1, GREEN=2), so every 5-letter pattern is one of 243 codes.
+
+For solver and analytics work ``PatternTable`` precomputes the pattern of
+every (guess, target) pair of a word list with NumPy, after which scoring is
+a table lookup.
+"""
+import numpy as np
+
+from api.models import GuessResultPattern
+from api.validation import ALPHABET, WORD_LENGTH, normalize_word
+
+LETTER_CODES = {letter: code for code, letter in enumerate(ALPHABET)}
+
+NONE, YELLOW, GREEN = 0, 1, 2
+PATTERN_COUNT = 3 ** WORD_LENGTH
+WINNING_PATTERN = PATTERN_COUNT - 1
+
+_MATCH_LETTERS = {
+    NONE: GuessResultPattern.LetterMatch.NONE,
+    YELLOW: GuessResultPattern.LetterMatch.YELLOW,
+    GREEN: GuessResultPattern.LetterMatch.GREEN,
+}
+_MATCH_DIGITS = {letter: digit for digit, letter in _MATCH_LETTERS.items()}
+_PLACE_VALUES = np.array([3 ** (WORD_LENGTH - 1 - i) for i in range(WORD_LENGTH)], dtype=np.uint8)
+
+
+def encode_pattern(digits):
+    code = 0
+    for digit in digits:
+        code = code * 3 + digit
+    return code
+
+
+def decode_pattern(code):
+    digits = []
+    for _ in range(WORD_LENGTH):
+        code, digit = divmod(code, 3)
+        digits.append(digit)
+    return tuple(reversed(digits))
+
+
+def pattern_to_string(code):
+    """
+    Returns the pattern as GuessResultPattern.LetterMatch letters, e.g. 'GYNNN'.
+    """
+    return ''.join(_MATCH_LETTERS[digit] for digit in decode_pattern(code))
+
+
+def pattern_from_string(pattern):
+    return encode_pattern(_MATCH_DIGITS[letter] for letter in pattern.upper())
+
+
+def score(guess, target):
+    """
+    Returns the pattern code of guess scored against target.
+    """
+    guess, target = normalize_word(guess), normalize_word(target)
+    if len(guess) != WORD_LENGTH or len(target) != WORD_LENGTH:
+        raise ValueError(f"Words must be {WORD_LENGTH} letters long")
+
+    digits = [NONE] * WORD_LENGTH
+    unmatched = {}
+    for i, (guess_letter, target_letter) in enumerate(zip(guess, target)):
+        if guess_letter == target_letter:
+            digits[i] = GREEN
+        else:
+            unmatched[target_letter] = unmatched.get(target_letter, 0) + 1
+
+    for i, guess_letter in enumerate(guess):
+        if digits[i] != GREEN and unmatched.get(guess_letter, 0) > 0:
+            digits[i] = YELLOW
+            unmatched[guess_letter] -= 1
+
+    return encode_pattern(digits)
+
+
+def encode_words(words):
+    """
+    Returns an (N, WORD_LENGTH) uint8 array of alphabet positions.
+    """
+    codes = np.empty((len(words), WORD_LENGTH), dtype=np.uint8)
+    for row, word in enumerate(words):
+        word = normalize_word(word)
+        if len(word) != WORD_LENGTH:
+            raise ValueError(f"'{word}' is not {WORD_LENGTH} letters long")
+        try:
+            codes[row] = [LETTER_CODES[letter] for letter in word]
+        except KeyError as error:
+            raise ValueError(f"'{word}' contains a non-Lithuanian letter") from error
+    return codes
+
+
+def score_many(guesses, targets):
+    """
+    Vectorized score() over encoded words: returns a (len(guesses), len(targets))
+    uint8 array of pattern codes.
+    """
+    guesses = guesses[:, None, :]
+    targets = targets[None, :, :]
+    green = guesses == targets
+    codes = np.zeros((guesses.shape[0], targets.shape[1]), dtype=np.uint8)
+
+    for i in range(WORD_LENGTH):
+        letter = guesses[:, :, i]
+        # Copies of this letter in the target that are not already green ...
+        available = ((targets == letter[:, :, None]) & ~green).sum(axis=2)
+        # ... minus those already claimed as yellow by earlier guess letters
+        claimed = ((guesses[:, :, :i] == letter[:, :, None]) & ~green[:, :, :i]).sum(axis=2)
+        yellow = ~green[:, :, i] & (available > claimed)
+        codes += _PLACE_VALUES[i] * (GREEN * green[:, :, i] + YELLOW * yellow).astype(np.uint8)
+
+    return codes
+
+
+def build_pattern_matrix(words, batch_size=512):
+    """
+    Returns the N x N uint8 matrix whose [i, j] entry is score(words[i], words[j]).
+
+    Guesses are scored in batches to bound the size of the intermediate arrays;
+    the result itself takes N * N bytes.
+    """
+    encoded = encode_words(words)
+    matrix = np.empty((len(encoded), len(encoded)), dtype=np.uint8)
+    for start in range(0, len(encoded), batch_size):
+        matrix[start:start + batch_size] = score_many(encoded[start:start + batch_size], encoded)
+    return matrix
+
+
+class PatternTable:
+    """
+    Precomputed feedback table over a fixed word list.
+    """
+
+    def __init__(self, words, batch_size=512):
+        self.words = tuple(normalize_word(word) for word in words)
+        self.positions = {word: position for position, word in enumerate(self.words)}
+        self.matrix = build_pattern_matrix(self.words, batch_size)
+
+    def __len__(self):
+        return len(self.words)
+
+    def score(self, guess, target):
+        """
+        Looks the pattern up in the table, falling back to score() for words
+        outside of it.
+        """
+        row = self.positions.get(normalize_word(guess))
+        column = self.positions.get(normalize_word(target))
+        if row is None or column is None:
+            return score(guess, target)
+        return int(self.matrix[row, column])
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from api.dictionary import invalidate_dictionary
+from api.models import DictionaryVersion, DictionaryWord
+
+
+@receiver(post_save, sender=DictionaryWord)
+@receiver(post_delete, sender=DictionaryWord)
+def dictionary_changed(sender, **kwargs):
+    DictionaryVersion.bump()
+    invalidate_dictionary()
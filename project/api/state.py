@@ -0,0 +1,185 @@
+"""
+Per-game state cache for the guess API.
+
+A game's state is its target word, the number of attempts so far, when it
+ended, for hard-mode games the words guessed so far, and when it was
+created (stored on its guesses, see api.partitions). It is written
+through when a game starts and after every stored guess, so scoring a guess
+normally needs neither the game row nor its last attempt number from the
+database. Misses are loaded from the database.
+
+``GAME_STATE_BACKEND`` picks where states live:
+
+* ``local``: an LRU of at most ``GAME_STATE_MAX_GAMES`` games per worker,
+  entries expiring ``GAME_STATE_TTL`` seconds after they were written;
+* ``django``: the Django cache ``GAME_STATE_CACHE``, which can be shared by
+  all workers (e.g. Redis or memcached);
+* ``none``: no caching.
+
+A local cache only sees the guesses of its own worker. A stale attempt
+count shows up as a unique (game_id, attempt_number) conflict, after which
+the guess API drops the entries and retries from the database. Likewise,
+guesses are only stored while their game has not ended in the database, so
+a game ended through PUT /api/game/ on another worker takes no more
+guesses: the guess API drops the stale entries and answers 409.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+class GameState:
+    """
+    guesses: the words guessed so far, only kept for hard-mode games
+    """
+    __slots__ = ('word_to_guess', 'attempts', 'ended_at', 'hard_mode', 'guesses', 'created_at')
+
+    def __init__(self, word_to_guess, attempts=0, ended_at=None, hard_mode=False, guesses=(), created_at=None):
+        self.word_to_guess = word_to_guess
+        self.attempts = attempts
+        self.ended_at = ended_at
+        self.hard_mode = hard_mode
+        self.guesses = tuple(guesses)
+        self.created_at = created_at
+
+    def __eq__(self, other):
+        return isinstance(other, GameState) and self.as_tuple() == other.as_tuple()
+
+    def __repr__(self):
+        return (
+            f"GameState({self.word_to_guess!r}, {self.attempts}, {self.ended_at!r}, "
+            f"{self.hard_mode}, {self.guesses!r}, {self.created_at!r})"
+        )
+
+    def as_tuple(self):
+        return self.word_to_guess, self.attempts, self.ended_at, self.hard_mode, self.guesses, self.created_at
+
+
+class LocalStateCache:
+    def __init__(self, max_games=100000, ttl=3600):
+        self.max_games = max_games
+        self.ttl = ttl
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._states)
+
+    def get_many(self, game_ids):
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for game_id in game_ids:
+                entry = self._states.get(game_id)
+                if entry is None:
+                    continue
+                if entry[0] <= now:
+                    del self._states[game_id]
+                    continue
+                self._states.move_to_end(game_id)
+                found[game_id] = entry[1]
+        return found
+
+    def set_many(self, states):
+        expires = time.monotonic() + self.ttl
+        with self._lock:
+            for game_id, state in states.items():
+                self._states[game_id] = (expires, state)
+                self._states.move_to_end(game_id)
+            while len(self._states) > self.max_games:
+                self._states.popitem(last=False)
+
+    def delete_many(self, game_ids):
+        with self._lock:
+            for game_id in game_ids:
+                self._states.pop(game_id, None)
+
+    async def aget_many(self, game_ids):
+        return self.get_many(game_ids)
+
+    async def aset_many(self, states):
+        self.set_many(states)
+
+    async def adelete_many(self, game_ids):
+        self.delete_many(game_ids)
+
+
+class DjangoStateCache:
+    """
+    States stored as tuples under 'game-state:<id>' in a Django cache.
+    Tuples of another length, stored by an older version, are misses.
+    """
+    def __init__(self, alias='game_state', ttl=3600):
+        self.cache = caches[alias]
+        self.ttl = ttl
+
+    @staticmethod
+    def key(game_id):
+        return f'game-state:{game_id}'
+
+    def _decode(self, game_ids, values):
+        return {
+            game_id: GameState(*values[self.key(game_id)])
+            for game_id in game_ids
+            if len(values.get(self.key(game_id), ())) == len(GameState.__slots__)
+        }
+
+    def get_many(self, game_ids):
+        return self._decode(game_ids, self.cache.get_many([self.key(game_id) for game_id in game_ids]))
+
+    def set_many(self, states):
+        self.cache.set_many(
+            {self.key(game_id): state.as_tuple() for game_id, state in states.items()}, timeout=self.ttl
+        )
+
+    def delete_many(self, game_ids):
+        self.cache.delete_many([self.key(game_id) for game_id in game_ids])
+
+    async def aget_many(self, game_ids):
+        return self._decode(game_ids, await self.cache.aget_many([self.key(game_id) for game_id in game_ids]))
+
+    async def aset_many(self, states):
+        await self.cache.aset_many(
+            {self.key(game_id): state.as_tuple() for game_id, state in states.items()}, timeout=self.ttl
+        )
+
+    async def adelete_many(self, game_ids):
+        await self.cache.adelete_many([self.key(game_id) for game_id in game_ids])
+
+
+def create_state_cache():
+    backend = getattr(settings, 'GAME_STATE_BACKEND', 'local')
+    ttl = getattr(settings, 'GAME_STATE_TTL', 3600)
+    if backend == 'local':
+        return LocalStateCache(getattr(settings, 'GAME_STATE_MAX_GAMES', 100000), ttl)
+    if backend == 'django':
+        return DjangoStateCache(getattr(settings, 'GAME_STATE_CACHE', 'game_state'), ttl)
+    return None
+
+
+_state_cache = None
+_state_cache_ready = False
+_lock = threading.Lock()
+
+
+def get_state_cache():
+    """
+    The configured cache, or None when states are not cached.
+    """
+    global _state_cache, _state_cache_ready  # pylint: disable=global-statement
+    if not _state_cache_ready:
+        with _lock:
+            if not _state_cache_ready:
+                _state_cache = create_state_cache()
+                _state_cache_ready = True
+    return _state_cache
+
+
+def reset_state_cache():
+    global _state_cache, _state_cache_ready  # pylint: disable=global-statement
+    with _lock:
+        _state_cache = None
+        _state_cache_ready = False
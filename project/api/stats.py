@@ -0,0 +1,180 @@
+"""
+Player and global statistics.
+
+Stats are updated incrementally when a game ends: one upsert per player and
+one per global shard, adding the game to the running totals in place, so
+nothing ever has to COUNT/GROUP BY over ``game_guesses``. Callers pass only
+games whose ``ended_at`` they have just set, so each game is counted once.
+``rebuild_stats`` recomputes everything from history in chunks.
+"""
+import random
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Exists, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from api.models import MAX_ATTEMPTS, Game, GlobalStats, Guess, PlayerStats
+from api.patterns import pattern_id
+from api.scoring import WINNING_PATTERN
+
+
+def global_shards():
+    return getattr(settings, 'GLOBAL_STATS_SHARDS', 16)
+
+
+def distribution_of(won, attempts):
+    distribution = [0] * MAX_ATTEMPTS
+    if won and 1 <= attempts <= MAX_ATTEMPTS:
+        distribution[attempts - 1] = 1
+    return distribution
+
+
+def last_attempt():
+    """
+    The highest attempt_number of a game's guesses (0 without guesses).
+
+    A correlated subquery rather than an aggregate over a join: partitioned
+    game_sessions has no primary key on game_id alone, so Postgres cannot
+    GROUP BY game_id while selecting the other columns. Matching the game's
+    created_at too reads only the guess partition of the game.
+    """
+    attempts = Guess.objects.filter(
+        game=OuterRef('pk'), game_created_at=OuterRef('created_at')
+    ).order_by('-attempt_number').values('attempt_number')[:1]
+    return Coalesce(Subquery(attempts), 0)
+
+
+def game_results(queryset):
+    """
+    Annotates games with their number of attempts and whether they were won.
+    """
+    winning = Guess.objects.filter(
+        game=OuterRef('pk'), game_created_at=OuterRef('created_at'), result_pattern_id=pattern_id(WINNING_PATTERN)
+    )
+    return queryset.annotate(attempts=last_attempt(), won=Exists(winning))
+
+
+# Element-wise sum of two guess distributions
+_ADD_DISTRIBUTIONS = (
+    "(SELECT array_agg(a + b ORDER BY i) "
+    "FROM unnest({table}.guess_distribution, EXCLUDED.guess_distribution) WITH ORDINALITY AS t(a, b, i))"
+)
+
+
+def add_player_result(cursor, user_id, won, attempts):
+    table = PlayerStats._meta.db_table
+    cursor.execute(
+        f"INSERT INTO {table} "
+        f"(user_id, games_played, games_won, current_streak, max_streak, guess_distribution, updated_at) "
+        f"VALUES (%s, 1, %s, %s, %s, %s, now()) "
+        f"ON CONFLICT (user_id) DO UPDATE SET "
+        f"games_played = {table}.games_played + 1, "
+        f"games_won = {table}.games_won + EXCLUDED.games_won, "
+        f"current_streak = CASE WHEN EXCLUDED.games_won = 1 THEN {table}.current_streak + 1 ELSE 0 END, "
+        f"max_streak = GREATEST({table}.max_streak, "
+        f"CASE WHEN EXCLUDED.games_won = 1 THEN {table}.current_streak + 1 ELSE 0 END), "
+        f"guess_distribution = {_ADD_DISTRIBUTIONS.format(table=table)}, "
+        f"updated_at = now()",
+        [user_id, int(won), int(won), int(won), distribution_of(won, attempts)]
+    )
+
+
+def add_global_results(cursor, played, won, distribution):
+    table = GlobalStats._meta.db_table
+    cursor.execute(
+        f"INSERT INTO {table} (shard_id, games_played, games_won, guess_distribution) "
+        f"VALUES (%s, %s, %s, %s) "
+        f"ON CONFLICT (shard_id) DO UPDATE SET "
+        f"games_played = {table}.games_played + EXCLUDED.games_played, "
+        f"games_won = {table}.games_won + EXCLUDED.games_won, "
+        f"guess_distribution = {_ADD_DISTRIBUTIONS.format(table=table)}",
+        [random.randrange(global_shards()), played, won, distribution]
+    )
+
+
+def record_finished_games(game_ids):
+    """
+    Adds games that have just ended to the player and global stats.
+    """
+    if not game_ids:
+        return
+    results = list(
+        game_results(Game.objects.filter(id__in=game_ids))
+        .order_by('ended_at')
+        .values_list('player_id', 'won', 'attempts')
+    )
+    if not results:
+        return
+
+    distribution = [0] * MAX_ATTEMPTS
+    with connection.cursor() as cursor:
+        for player_id, won, attempts in results:
+            if player_id is not None:
+                add_player_result(cursor, player_id, won, attempts)
+            distribution = [a + b for a, b in zip(distribution, distribution_of(won, attempts))]
+        add_global_results(cursor, len(results), sum(won for _, won, _ in results), distribution)
+
+
+def global_stats():
+    totals = GlobalStats.objects.aggregate(games_played=Sum('games_played'), games_won=Sum('games_won'))
+    distribution = [0] * MAX_ATTEMPTS
+    for shard in GlobalStats.objects.values_list('guess_distribution', flat=True):
+        distribution = [a + b for a, b in zip(distribution, shard)]
+    return {
+        'games_played': totals['games_played'] or 0,
+        'games_won': totals['games_won'] or 0,
+        'guess_distribution': distribution,
+    }
+
+
+def player_stats(user_id):
+    stats = PlayerStats.objects.filter(user_id=user_id).first() or PlayerStats(user_id=user_id)
+    return {
+        'games_played': stats.games_played,
+        'games_won': stats.games_won,
+        'current_streak': stats.current_streak,
+        'max_streak': stats.max_streak,
+        'guess_distribution': stats.guess_distribution,
+    }
+
+
+def rebuild_stats(chunk_size=5000):
+    """
+    Recomputes all stats from finished games, reading them in chunks of
+    `chunk_size` in ended_at order (keyset pagination). Only the running
+    totals of each player are kept in memory.
+    """
+    players = {}
+    played = won_total = 0
+    distribution = [0] * MAX_ATTEMPTS
+    finished = game_results(Game.objects.filter(ended_at__isnull=False)).order_by('ended_at', 'id')
+    last = None
+    while True:
+        chunk = finished
+        if last is not None:
+            chunk = chunk.filter(Q(ended_at__gt=last[0]) | Q(ended_at=last[0], id__gt=last[1]))
+        rows = list(chunk.values_list('ended_at', 'id', 'player_id', 'won', 'attempts')[:chunk_size])
+        if not rows:
+            break
+        for ended_at, game_id, player_id, won, attempts in rows:
+            game_distribution = distribution_of(won, attempts)
+            played += 1
+            won_total += int(won)
+            distribution = [a + b for a, b in zip(distribution, game_distribution)]
+            if player_id is not None:
+                stats = players.get(player_id)
+                if stats is None:
+                    stats = players[player_id] = PlayerStats(user_id=player_id)
+                stats.games_played += 1
+                stats.games_won += int(won)
+                stats.current_streak = stats.current_streak + 1 if won else 0
+                stats.max_streak = max(stats.max_streak, stats.current_streak)
+                stats.guess_distribution = [a + b for a, b in zip(stats.guess_distribution, game_distribution)]
+            last = (ended_at, game_id)
+
+    PlayerStats.objects.all().delete()
+    GlobalStats.objects.all().delete()
+    PlayerStats.objects.bulk_create(players.values(), batch_size=chunk_size)
+    GlobalStats.objects.create(shard=0, games_played=played, games_won=won_total, guess_distribution=distribution)
+    return played, len(players)
@@ -1,14 +1,54 @@
-from django.test import TestCase, Client
+import numpy as np
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, OperationalError, connection, connections, transaction
+from django.test import AsyncClient, SimpleTestCase, TestCase, TransactionTestCase, Client, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from api.models import Game
+from django.utils import timezone
+from api.complexity import complexity_levels, difficulty, split_scores
+from api.daily import generate_schedule, invalidate_daily_words, schedule_daily_words, word_for_day
+from api.dictionary import DictionaryIndex, get_dictionary
+from api.hints import expected_information, filter_candidates, rank_guesses, reset_hints
+from api.letters import Constraints, LetterIndex
+from api.metrics import Registry
+from api.leaderboard import Leaderboard, Leaderboards, load_leaderboards, reset_leaderboards, save_snapshot
+from api.models import (
+    DailyWord, DictionaryWord, Game, GlobalStats, Guess, GuessResultPattern, LeaderboardSnapshot, PlayerStats
+)
+from api.partitions import archive_partitions, create_partitions
+from api.patterns import get_pattern_ids, pattern_id
+from api.ratelimit import CacheWindows, LocalBuckets, client_ip, parse_rate, reset_rate_limits
+from api.scoring import (
+    WINNING_PATTERN, PatternTable, build_pattern_matrix, encode_words, decode_pattern, pattern_from_string, pattern_to_string, score
+)
+from api.state import DjangoStateCache, GameState, LocalStateCache, get_state_cache, reset_state_cache
+from api.stats import game_results, global_stats, last_attempt, player_stats
+from api.validation import is_valid_word, validate_words
+from api.views import finish_game
+from api.writebehind import AttemptTaken, WriteBehindBuffer
 import uuid
 import json
 import datetime
+import gzip
+import io
+import os
+import random
+import tempfile
+import collections
+import copy
+import math
+import time
+from unittest import mock
 
 
+@override_settings(DICTIONARY_VERSION_CHECK_INTERVAL=0)
 class GameTestCase(TestCase):
     def setUp(self):
         self.client = Client()
+        DictionaryWord.objects.create(word_text='tempo', complexity=1)
         self.game = Game.objects.create(word_to_guess='tempo')
         self.game_url = reverse('handle_game_operations')
 
@@ -17,6 +57,7 @@ class GameTestCase(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(Game.objects.count(), 2)
         self.assertEqual(Game.objects.latest('created_at').word_to_guess, 'tempo')
+        self.assertEqual(response.json()['id'], str(Game.objects.latest('created_at').id))
 
     def test_update_game(self):
         # Create a game instance to update
@@ -51,6 +92,1422 @@ class GameTestCase(TestCase):
         )
         self.assertEqual(response.status_code, 400)
 
+    def test_update_game_invalid_payloads(self):
+        for body in ['{not json', '[]', json.dumps({'id': 'not-a-uuid', 'isfinished': True}),
+                     json.dumps({'id': 42, 'isfinished': True})]:
+            with self.subTest(body=body):
+                response = self.client.put(self.game_url, data=body, content_type='application/json')
+                self.assertEqual(response.status_code, 400)
+
+    def test_create_game_invalid_payloads(self):
+        for body in ['{not json', '[]', '"daily"']:
+            with self.subTest(body=body):
+                response = self.client.post(self.game_url, data=body, content_type='application/json')
+                self.assertEqual(response.status_code, 400)
+
+    def test_create_game_empty_dictionary(self):
+        DictionaryWord.objects.all().delete()
+        response = self.client.post(self.game_url)
+        self.assertEqual(response.status_code, 503)
+
     def test_invalid_method(self):
         response = self.client.get(self.game_url)
         self.assertEqual(response.status_code, 404)
+
+    async def test_async_create_and_finish_game(self):
+        client = AsyncClient()
+        response = await client.post(self.game_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(await Game.objects.acount(), 2)
+
+        game = await Game.objects.filter(ended_at__isnull=True).alatest('created_at')
+        response = await client.put(
+            self.game_url,
+            data=json.dumps({'id': str(game.id), 'isfinished': True}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        await game.arefresh_from_db()
+        self.assertIsNotNone(game.ended_at)
+
+
+
+@override_settings(DICTIONARY_VERSION_CHECK_INTERVAL=0)
+class GuessTestCase(TestCase):
+    def setUp(self):
+        self.client = Client()
+        for word in ['LABAS', 'DIENA', 'NAMAS', 'MEILĖ', 'TEMPO']:
+            DictionaryWord.objects.create(word_text=word, complexity=1)
+        self.game = Game.objects.create(word_to_guess='NAMAS')
+        self.other_game = Game.objects.create(word_to_guess='MEILĖ')
+        self.guess_url = reverse('handle_guess_operations')
+
+    def post_guesses(self, data):
+        return self.client.post(self.guess_url, data=json.dumps(data), content_type='application/json')
+
+    def test_single_guess(self):
+        response = self.post_guesses({'id': str(self.game.id), 'guess': 'diena'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['guesses'], [
+            {'id': str(self.game.id), 'attempt': 1, 'pattern': 'NNNYY', 'finished': False}
+        ])
+        guess = self.game.guesses.get()
+        self.assertEqual(guess.guessed_word, 'DIENA')
+        self.assertEqual(guess.result_pattern.pattern, 'NNNYY')
+
+    def test_batch_of_guesses_for_several_games(self):
+        response = self.post_guesses({'guesses': [
+            {'id': str(self.game.id), 'guess': 'LABAS'},
+            {'id': str(self.other_game.id), 'guess': 'TEMPO'},
+            {'id': str(self.game.id), 'guess': 'NAMAS'},
+        ]})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['guesses']
+        self.assertEqual([result['attempt'] for result in results], [1, 1, 2])
+        self.assertEqual(results[2], {'id': str(self.game.id), 'attempt': 2, 'pattern': 'GGGGG', 'finished': True})
+        self.assertEqual(Guess.objects.count(), 3)
+
+        self.game.refresh_from_db()
+        self.assertIsNotNone(self.game.ended_at)
+        self.other_game.refresh_from_db()
+        self.assertIsNone(self.other_game.ended_at)
+
+    def test_attempts_continue_from_stored_guesses(self):
+        self.post_guesses({'id': str(self.game.id), 'guess': 'LABAS'})
+        response = self.post_guesses({'id': str(self.game.id), 'guess': 'DIENA'})
+        self.assertEqual(response.json()['guesses'][0]['attempt'], 2)
+
+    def test_game_ends_after_max_attempts(self):
+        response = self.post_guesses({'guesses': [{'id': str(self.game.id), 'guess': 'LABAS'}] * 6})
+        self.assertTrue(response.json()['guesses'][-1]['finished'])
+        response = self.post_guesses({'id': str(self.game.id), 'guess': 'LABAS'})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(self.game.guesses.count(), 6)
+
+    def test_rejects_words_outside_the_dictionary(self):
+        response = self.post_guesses({'guesses': [
+            {'id': str(self.game.id), 'guess': 'LABAS'},
+            {'id': str(self.game.id), 'guess': 'ABCDE'},
+        ]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Guess.objects.count(), 0)
+
+    def test_rejects_non_lithuanian_letters(self):
+        response = self.post_guesses({'id': str(self.game.id), 'guess': 'WORLD'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('WORLD', response.content.decode())
+
+    def test_invalid_payloads(self):
+        self.assertEqual(self.post_guesses({'guesses': []}).status_code, 400)
+        self.assertEqual(self.post_guesses({'id': str(self.game.id)}).status_code, 400)
+        self.assertEqual(self.post_guesses({'id': 'not-a-uuid', 'guess': 'LABAS'}).status_code, 400)
+        self.assertEqual(self.post_guesses({'id': str(uuid.uuid4()), 'guess': 'LABAS'}).status_code, 404)
+        self.assertEqual(self.client.get(self.guess_url).status_code, 404)
+        for body in ['{not json', '[]', '"LABAS"']:
+            response = self.client.post(self.guess_url, data=body, content_type='application/json')
+            self.assertEqual(response.status_code, 400)
+
+    @override_settings(MAX_GUESSES_PER_REQUEST=3)
+    def test_limits_guesses_per_request(self):
+        games = [self.game, self.other_game, Game.objects.create(word_to_guess='LABAS'),
+                 Game.objects.create(word_to_guess='LABAS')]
+        response = self.post_guesses({'guesses': [{'id': str(game.id), 'guess': 'DIENA'} for game in games]})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('At most 3 guesses', response.content.decode())
+        self.assertEqual(Guess.objects.count(), 0)
+
+    def test_limits_guesses_per_game(self):
+        response = self.post_guesses({'guesses': [{'id': str(self.game.id), 'guess': 'LABAS'}] * 7})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Guess.objects.count(), 0)
+
+
+@override_settings(DICTIONARY_VERSION_CHECK_INTERVAL=0, GAME_WRITE_BEHIND=True)
+class WriteBehindTestCase(TestCase):
+    def setUp(self):
+        self.client = Client()
+        reset_state_cache()
+        self.addCleanup(reset_state_cache)
+        DictionaryWord.objects.create(word_text='LABAS', complexity=1)
+        DictionaryWord.objects.create(word_text='NAMAS', complexity=1)
+        self.buffer = WriteBehindBuffer(max_events=100)
+        patcher = mock.patch('api.writebehind._buffer', self.buffer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def post_json(self, url, data):
+        return self.client.post(url, data=json.dumps(data), content_type='application/json')
+
+    def test_game_lifecycle_is_buffered_until_flush(self):
+        game_id = self.client.post(reverse('handle_game_operations')).json()['id']
+        target = self.buffer.pending_games([game_id])[game_id].word_to_guess
+        wrong = 'NAMAS' if target == 'LABAS' else 'LABAS'
+        response = self.post_json(reverse('handle_guess_operations'), {'guesses': [
+            {'id': game_id, 'guess': wrong},
+            {'id': game_id, 'guess': target},
+        ]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([result['attempt'] for result in response.json()['guesses']], [1, 2])
+        self.assertFalse(Game.objects.filter(id=game_id).exists())
+
+        self.buffer.flush()
+        game = Game.objects.get(id=game_id)
+        self.assertEqual(len(self.buffer), 0)
+        self.assertEqual(game.guesses.count(), 2)
+        self.assertIsNotNone(game.ended_at)
+
+    def test_attempts_combine_stored_and_queued_guesses(self):
+        game = Game.objects.create(word_to_guess='TEMPO')
+        url = reverse('handle_guess_operations')
+        self.post_json(url, {'id': str(game.id), 'guess': 'LABAS'})
+        self.buffer.flush()
+
+        self.post_json(url, {'id': str(game.id), 'guess': 'LABAS'})
+        response = self.post_json(url, {'id': str(game.id), 'guess': 'NAMAS'})
+        self.assertEqual(response.json()['guesses'][0]['attempt'], 3)
+        self.buffer.flush()
+        self.assertEqual(list(game.guesses.values_list('attempt_number', flat=True)), [1, 2, 3])
+
+    def test_game_end_uses_single_update(self):
+        games = [Game.objects.create(word_to_guess='LABAS') for _ in range(3)]
+        for game in games:
+            self.client.put(
+                reverse('handle_game_operations'),
+                data=json.dumps({'id': str(game.id), 'isfinished': True}),
+                content_type='application/json'
+            )
+        self.assertFalse(Game.objects.filter(ended_at__isnull=False).exists())
+        with CaptureQueriesContext(connection) as queries:
+            self.buffer.flush()
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('game_sessions', updates[0])
+        self.assertEqual(Game.objects.filter(ended_at__isnull=False).count(), 3)
+
+    def test_full_buffer_is_flushed_by_the_request(self):
+        self.buffer.max_events = 2
+        for _ in range(3):
+            self.client.post(reverse('handle_game_operations'))
+        self.assertEqual(Game.objects.count(), 2)
+        self.assertEqual(len(self.buffer), 1)
+
+    def test_batch_larger_than_the_buffer(self):
+        self.buffer.max_events = 2
+        game = Game.objects.create(word_to_guess='TEMPO')
+        response = self.post_json(reverse('handle_guess_operations'), {'guesses': [
+            {'id': str(game.id), 'guess': 'LABAS'}
+        ] * 3})
+        self.assertEqual(response.status_code, 200)
+        self.buffer.flush()
+        self.assertEqual(game.guesses.count(), 3)
+
+    def test_failing_events_are_dropped(self):
+        valid = Game(word_to_guess='LABAS')
+        self.buffer.add_game(valid)
+        self.buffer.add_game(Game(word_to_guess='PER ILGAS'))
+        with self.assertLogs('api.writebehind', 'ERROR'):
+            self.buffer.flush()
+        self.assertEqual(len(self.buffer), 0)
+        self.assertEqual(list(Game.objects.values_list('id', flat=True)), [valid.id])
+
+    def test_taken_attempts_are_retried(self):
+        game = Game.objects.create(word_to_guess='TEMPO')
+        url = reverse('handle_guess_operations')
+        self.post_json(url, {'id': str(game.id), 'guess': 'LABAS'})
+        # A concurrent request read the state before the first guess was queued
+        stale = GameState('TEMPO', created_at=game.created_at)
+        get_state_cache().set_many({str(game.id): stale})
+        with self.assertRaises(AttemptTaken):
+            self.buffer.add_guesses([Guess(game=game, guessed_word='NAMAS', result_pattern_id=pattern_id(0),
+                                           attempt_number=1, game_created_at=game.created_at)])
+
+        response = self.post_json(url, {'id': str(game.id), 'guess': 'NAMAS'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['guesses'][0]['attempt'], 2)
+        self.buffer.flush()
+        self.assertEqual(list(game.guesses.values_list('attempt_number', flat=True)), [1, 2])
+
+    def test_guesses_whose_attempt_is_stored_are_reported(self):
+        game = Game.objects.create(word_to_guess='TEMPO')
+        Guess.objects.create(game=game, guessed_word='LABAS', result_pattern_id=pattern_id(0), attempt_number=1)
+        get_state_cache().set_many({str(game.id): GameState('TEMPO', created_at=game.created_at)})
+        self.buffer.add_guesses([Guess(game=game, guessed_word='NAMAS', result_pattern_id=pattern_id(0),
+                                       attempt_number=1, game_created_at=game.created_at)])
+        with self.assertLogs('api.writebehind', 'WARNING'):
+            self.buffer.flush()
+        self.assertEqual(list(game.guesses.values_list('guessed_word', flat=True)), ['LABAS'])
+        self.assertEqual(get_state_cache().get_many([str(game.id)]), {})
+
+    def test_flushing_again_reports_nothing(self):
+        game = Game.objects.create(word_to_guess='TEMPO')
+        guess = Guess(game=game, guessed_word='NAMAS', result_pattern_id=pattern_id(0),
+                      attempt_number=1, game_created_at=game.created_at)
+        self.buffer.add_guesses([guess])
+        rows = list(self.buffer._guesses)  # pylint: disable=protected-access
+        self.buffer.flush()
+        self.assertEqual(WriteBehindBuffer._write({}, rows, {}), set())  # pylint: disable=protected-access
+
+    def test_failed_flush_is_requeued(self):
+        game = Game(word_to_guess='LABAS')
+        self.buffer.add_game(game)
+        with mock.patch.object(WriteBehindBuffer, '_write', side_effect=OperationalError), \
+                self.assertLogs('api.writebehind', 'ERROR'), self.assertRaises(OperationalError):
+            self.buffer.flush()
+        self.buffer.add_game(Game(word_to_guess='NAMAS'))
+        self.assertEqual(len(self.buffer), 2)
+        self.buffer.flush()
+        self.assertEqual(len(self.buffer), 0)
+        self.assertEqual(Game.objects.count(), 2)
+
+    def test_end_game_rejects_invalid_ids(self):
+        with self.assertRaises(ValueError):
+            self.buffer.end_game('not-a-uuid', timezone.now())
+        self.assertEqual(len(self.buffer), 0)
+
+class DictionaryIndexTestCase(TestCase):
+    def setUp(self):
+        self.index = DictionaryIndex([
+            ('labas', 1), ('diena', 2), ('namas', 2), ('meilė', 3), ('žąsis', 5),
+        ])
+
+    def test_membership_is_case_insensitive(self):
+        self.assertIn('LABAS', self.index)
+        self.assertIn('Meilė', self.index)
+        self.assertNotIn('tempo', self.index)
+
+    def test_random_word_within_band(self):
+        for _ in range(20):
+            self.assertIn(self.index.random_word(2, 3), ['diena', 'namas', 'meilė'])
+        self.assertEqual(self.index.random_word(5), 'žąsis')
+        self.assertIsNone(self.index.random_word(6))
+        self.assertIsNone(self.index.random_word(4, 4))
+
+
+@override_settings(DICTIONARY_VERSION_CHECK_INTERVAL=0)
+class DictionaryLoaderTestCase(TestCase):
+    def test_reloads_when_dictionary_changes(self):
+        DictionaryWord.objects.create(word_text='labas', complexity=1)
+        index = get_dictionary()
+        self.assertIn('labas', index)
+        self.assertIs(get_dictionary(), index)
+
+        DictionaryWord.objects.create(word_text='diena', complexity=1)
+        self.assertIn('diena', get_dictionary())
+
+    def test_skips_words_of_other_lengths(self):
+        DictionaryWord.objects.create(word_text='labas', complexity=1)
+        DictionaryWord.objects.create(word_text='ąžuolas', complexity=1)
+        self.assertEqual(len(get_dictionary()), 1)
+
+    def test_reuses_index_between_version_checks(self):
+        DictionaryWord.objects.create(word_text='labas', complexity=1)
+        index = get_dictionary()
+        with override_settings(DICTIONARY_VERSION_CHECK_INTERVAL=60):
+            with self.assertNumQueries(0):
+                self.assertIs(get_dictionary(), index)
+
+
+class ScoringTestCase(SimpleTestCase):
+    def test_pattern_encoding(self):
+        self.assertEqual(pattern_from_string('NNNNN'), 0)
+        self.assertEqual(pattern_from_string('GGGGG'), WINNING_PATTERN)
+        self.assertEqual(pattern_to_string(pattern_from_string('GYNYG')), 'GYNYG')
+        self.assertEqual(decode_pattern(pattern_from_string('YNNNG')), (1, 0, 0, 0, 2))
+
+    def test_score(self):
+        self.assertEqual(pattern_to_string(score('labas', 'LABAS')), 'GGGGG')
+        self.assertEqual(pattern_to_string(score('DIENA', 'NAMAS')), 'NNNYY')
+        self.assertEqual(pattern_to_string(score('ŽĄSIS', 'ŠALIS')), 'NNNGG')
+
+    def test_score_repeated_letters(self):
+        # Only one A is left for a yellow once the green A is matched
+        self.assertEqual(pattern_to_string(score('AAAAB', 'BAAAC')), 'NGGGY')
+        self.assertEqual(pattern_to_string(score('KATĖS', 'TALKA')), 'YGYNN')
+        self.assertEqual(pattern_to_string(score('TALKA', 'KATĖS')), 'YGNYN')
+
+    def test_score_decomposed_letters(self):
+        self.assertEqual(score('MEILE\u0307', 'meilė'), WINNING_PATTERN)
+
+    def test_pattern_matrix_matches_score(self):
+        words = ['LABAS', 'DIENA', 'NAMAS', 'MEILĖ', 'ŽĄSIS', 'ŠALIS', 'TALKA', 'KATĖS', 'AAAAB', 'BAAAC']
+        matrix = build_pattern_matrix(words, batch_size=3)
+        expected = np.array([[score(guess, target) for target in words] for guess in words])
+        np.testing.assert_array_equal(matrix, expected)
+
+    def test_pattern_table_lookup(self):
+        table = PatternTable(['LABAS', 'DIENA', 'NAMAS'])
+        self.assertEqual(table.score('diena', 'namas'), score('DIENA', 'NAMAS'))
+        self.assertEqual(table.score('MEILĖ', 'namas'), score('MEILĖ', 'NAMAS'))
+
+
+class GuessResultPatternTestCase(TestCase):
+    def test_all_patterns_seeded(self):
+        self.assertEqual(GuessResultPattern.objects.count(), 243)
+
+    def test_pattern_id_matches_row(self):
+        get_pattern_ids()
+        with self.assertNumQueries(0):
+            pk = pattern_id(pattern_from_string('GYNNG'))
+        self.assertEqual(GuessResultPattern.objects.get(pk=pk).pattern, 'GYNNG')
+        self.assertEqual(str(GuessResultPattern.objects.get(id=pattern_id(WINNING_PATTERN))), 'GGGGG')
+
+
+class DailyWordTestCase(TestCase):
+    def setUp(self):
+        invalidate_daily_words()
+        self.addCleanup(invalidate_daily_words)
+        for index, word in enumerate(['LABAS', 'DIENA', 'NAMAS', 'MEILĖ', 'DUONA', 'KATĖS']):
+            DictionaryWord.objects.create(word_text=word, complexity=1 if index < 4 else 3)
+
+    def test_generate_schedule_is_stratified_without_repeats(self):
+        strata = {1: ['A', 'B', 'C', 'D', 'E', 'F'], 2: ['G', 'H', 'I']}
+        schedule = generate_schedule(strata, 9, window=9, rng=random.Random(1))
+        self.assertEqual(sorted(word for word, _ in schedule), sorted(strata[1] + strata[2]))
+        # Complexity 2 gets every third day rather than a random share
+        self.assertEqual([complexity for _, complexity in schedule[:3]].count(2), 1)
+        self.assertEqual([complexity for _, complexity in schedule[3:6]].count(2), 1)
+
+    def test_generate_schedule_avoids_recent_words(self):
+        schedule = generate_schedule({1: ['A', 'B', 'C']}, 2, recent=['A'], window=3, rng=random.Random(1))
+        self.assertEqual(sorted(word for word, _ in schedule), ['B', 'C'])
+        schedule = generate_schedule({1: ['A', 'B']}, 3, window=5, rng=random.Random(1))
+        self.assertEqual(schedule[2], schedule[0])
+
+    def test_schedule_keeps_existing_days(self):
+        start = datetime.date(2025, 3, 1)
+        DailyWord.objects.create(date=start, word_text='LABAS', complexity=1)
+        self.assertEqual(schedule_daily_words(start=start, days=6, window=6), 5)
+        words = list(DailyWord.objects.order_by('date').values_list('word_text', flat=True))
+        self.assertEqual(words[0], 'LABAS')
+        self.assertEqual(len(set(words)), 6)
+        self.assertEqual(schedule_daily_words(start=start, days=6, window=6), 0)
+
+    @override_settings(DAILY_WORD_DAYS_AHEAD=10)
+    def test_word_for_day_is_scheduled_once_and_cached(self):
+        day = datetime.date(2025, 3, 1)
+        word = word_for_day(day)
+        self.assertEqual(DailyWord.objects.count(), 10)
+        with self.assertNumQueries(0):
+            self.assertEqual(word_for_day(day), word)
+            word_for_day(day + datetime.timedelta(days=9))
+
+    def test_daily_game_uses_word_of_the_day(self):
+        url = reverse('handle_game_operations')
+        ids = [
+            self.client.post(url, data=json.dumps({'daily': True}), content_type='application/json').json()['id']
+            for _ in range(2)
+        ]
+        words = set(Game.objects.filter(id__in=ids).values_list('word_to_guess', flat=True))
+        self.assertEqual(words, {word_for_day()})
+
+
+class ImportWordsTestCase(TestCase):
+    def import_words(self, content, *args):
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', suffix='.txt', delete=False) as word_file:
+            word_file.write(content)
+        self.addCleanup(os.remove, word_file.name)
+        out = io.StringIO()
+        call_command('import_words', word_file.name, *args, stdout=out)
+        return out.getvalue()
+
+    def test_imports_valid_unique_words(self):
+        self.import_words("labas\nLABAS\nmeile\u0307\nhello!\nper ilgas\n# comment\n\ndiena\n", '--dedupe-window', '1')
+        self.assertEqual(
+            dict(DictionaryWord.objects.values_list('word_text', 'complexity')),
+            {'LABAS': 0, 'MEILĖ': 0, 'DIENA': 0}
+        )
+
+    def test_merge_keeps_complexity_unless_the_file_has_one(self):
+        DictionaryWord.objects.create(word_text='LABAS', complexity=4)
+        DictionaryWord.objects.create(word_text='DIENA', complexity=4)
+        self.import_words("labas\ndiena\t2\nnamas\t3\nžąsis\n", '--complexity', '1')
+        self.assertEqual(
+            dict(DictionaryWord.objects.values_list('word_text', 'complexity')),
+            {'LABAS': 4, 'DIENA': 2, 'NAMAS': 3, 'ŽĄSIS': 1}
+        )
+
+    def test_rejects_complexities_the_column_cannot_hold(self):
+        output = self.import_words("labas\t32767\ndiena\t32768\nnamas\t99999999999\nmedis\t\u00b2\nkalba\t-1\n")
+        self.assertIn('4 rejected', output)
+        self.assertEqual(dict(DictionaryWord.objects.values_list('word_text', 'complexity')), {'LABAS': 32767})
+        with self.assertRaises(CommandError):
+            self.import_words("labas\n", '--complexity', '40000')
+
+    @override_settings(DICTIONARY_VERSION_CHECK_INTERVAL=0)
+    def test_import_bumps_dictionary_version(self):
+        self.assertNotIn('LABAS', get_dictionary())
+        self.import_words("labas\n")
+        self.assertIn('LABAS', get_dictionary())
+
+
+class ComplexityTestCase(TestCase):
+    words = ['LABAS', 'NAMAS', 'KALBA', 'SALAS', 'TALKA', 'ŽĄSIS', 'ŠUNYS', 'GĖLĖS', 'ĮŽŪLŲ', 'MEDIS']
+
+    def test_harder_words_rank_higher(self):
+        levels = dict(zip(self.words, complexity_levels(difficulty(self.words)).tolist()))
+        self.assertLess(levels['LABAS'], levels['ĮŽŪLŲ'])
+        self.assertLess(levels['NAMAS'], levels['GĖLĖS'])
+        self.assertEqual(sorted(levels.values()), list(range(1, 11)))
+
+    def test_split_scores_match_across_workers(self):
+        encoded = encode_words(self.words)
+        np.testing.assert_allclose(split_scores(encoded, encoded, workers=2), split_scores(encoded, encoded))
+
+    def test_split_scores_count_matching_candidates(self):
+        encoded = encode_words(['LABAS', 'NAMAS', 'MEDIS'])
+        # Probing with TEDIS, LABAS and NAMAS share the pattern NNNNG
+        np.testing.assert_allclose(split_scores(encoded, encode_words(['TEDIS'])), [2 / 3, 2 / 3, 1 / 3])
+
+    def test_command_scores_only_unscored_words(self):
+        for word in self.words:
+            DictionaryWord.objects.create(word_text=word, complexity=0 if word != 'LABAS' else 7)
+        call_command('score_complexity', '--workers', '1', stdout=io.StringIO())
+        complexities = dict(DictionaryWord.objects.values_list('word_text', 'complexity'))
+        self.assertEqual(complexities['LABAS'], 7)
+        self.assertNotIn(0, complexities.values())
+
+        call_command('score_complexity', '--workers', '1', '--words', 'labas', stdout=io.StringIO())
+        self.assertNotEqual(DictionaryWord.objects.get(word_text='LABAS').complexity, 7)
+
+
+class ValidationTestCase(SimpleTestCase):
+    def test_is_valid_word(self):
+        self.assertTrue(is_valid_word('žąsis'))
+        self.assertTrue(is_valid_word('MEILE\u0307'))
+        self.assertFalse(is_valid_word('WORLD'))
+        self.assertFalse(is_valid_word('LABAS\n'))
+        self.assertFalse(is_valid_word('ĄŽUOLAS'))
+        self.assertTrue(is_valid_word('ĄŽUOLAS', length=None))
+        self.assertFalse(is_valid_word('', length=None))
+
+    def test_validate_words(self):
+        self.assertEqual(
+            validate_words(['labas', 'test5', 'meile\u0307', 'Ωmega']),
+            (['LABAS', 'MEILĖ'], ['TEST5', 'ΩMEGA'])
+        )
+
+
+@override_settings(DICTIONARY_VERSION_CHECK_INTERVAL=0)
+class StatsTestCase(TestCase):
+    def setUp(self):
+        for word in ['LABAS', 'NAMAS']:
+            DictionaryWord.objects.create(word_text=word, complexity=1)
+        self.user = User.objects.create_user('player', password='secret-password')
+        self.client.force_login(self.user)
+
+    def play(self, guesses, target='NAMAS'):
+        game = Game.objects.create(word_to_guess=target, player=self.user)
+        self.play_more(game, guesses)
+        return game
+
+    def play_more(self, game, guesses):
+        return self.client.post(
+            reverse('handle_guess_operations'),
+            data=json.dumps({'guesses': [{'id': str(game.id), 'guess': guess} for guess in guesses]}),
+            content_type='application/json'
+        )
+
+    def finish(self, game):
+        return self.client.put(
+            reverse('handle_game_operations'),
+            data=json.dumps({'id': str(game.id), 'isfinished': True}),
+            content_type='application/json'
+        )
+
+    def test_new_games_belong_to_the_player(self):
+        game_id = self.client.post(reverse('handle_game_operations')).json()['id']
+        self.assertEqual(Game.objects.get(id=game_id).player, self.user)
+
+    def test_stats_are_updated_when_games_end(self):
+        self.play(['NAMAS'])
+        self.play(['LABAS', 'NAMAS'])
+        self.finish(self.play(['LABAS']))
+        self.play(['LABAS', 'NAMAS'])
+
+        self.assertEqual(player_stats(self.user.id), {
+            'games_played': 4,
+            'games_won': 3,
+            'current_streak': 1,
+            'max_streak': 2,
+            'guess_distribution': [1, 2, 0, 0, 0, 0],
+        })
+        self.assertEqual(global_stats(), {
+            'games_played': 4, 'games_won': 3, 'guess_distribution': [1, 2, 0, 0, 0, 0]
+        })
+
+    def test_game_is_counted_once(self):
+        game = self.play(['NAMAS'])
+        self.finish(game)
+        self.finish(game)
+        self.assertEqual(player_stats(self.user.id)['games_played'], 1)
+
+    def test_game_ended_elsewhere_is_not_ended_again_by_a_guess(self):
+        game = self.play(['LABAS'])
+        # Ended through PUT on another worker, whose state cache this one does not share
+        ended_at = timezone.now() - datetime.timedelta(minutes=1)
+        finish_game(game.id, ended_at)
+        self.assertEqual(self.play_more(game, ['NAMAS']).status_code, 409)
+        self.assertEqual(game.guesses.count(), 1)
+        game.refresh_from_db()
+        self.assertEqual(game.ended_at, ended_at)
+        self.assertEqual(player_stats(self.user.id)['games_played'], 1)
+        self.assertEqual(global_stats()['games_played'], 1)
+
+    def test_stats_endpoint(self):
+        self.play(['NAMAS'])
+        data = self.client.get(reverse('handle_stats')).json()
+        self.assertEqual(data['global']['games_won'], 1)
+        self.assertEqual(data['player']['current_streak'], 1)
+
+    def test_rebuild_matches_incremental_stats(self):
+        Game.objects.create(word_to_guess='LABAS')
+        self.finish(Game.objects.create(word_to_guess='LABAS'))
+        for guesses in (['NAMAS'], ['LABAS'], ['LABAS', 'NAMAS'], ['NAMAS']):
+            game = self.play(guesses)
+            if not game.guesses.filter(guessed_word='NAMAS').exists():
+                self.finish(game)
+        incremental = (player_stats(self.user.id), global_stats())
+
+        PlayerStats.objects.all().delete()
+        GlobalStats.objects.all().delete()
+        call_command('rebuild_stats', '--chunk-size', '2', stdout=io.StringIO())
+        self.assertEqual((player_stats(self.user.id), global_stats()), incremental)
+        self.assertEqual(incremental[1]['games_played'], 5)
+
+    def test_write_behind_flush_updates_stats(self):
+        buffer = WriteBehindBuffer()
+        with mock.patch('api.writebehind._buffer', buffer), override_settings(GAME_WRITE_BEHIND=True):
+            game = self.play(['LABAS', 'NAMAS'])
+            self.finish(game)
+            self.assertEqual(global_stats()['games_played'], 0)
+            buffer.flush()
+        self.assertEqual(player_stats(self.user.id)['guess_distribution'], [0, 1, 0, 0, 0, 0])
+        self.assertEqual(global_stats()['games_played'], 1)
+
+
+class LeaderboardTestCase(SimpleTestCase):
+    def test_best_result_per_player(self):
+        board = Leaderboard()
+        self.assertTrue(board.add(1, 4, 30000))
+        self.assertTrue(board.add(2, 3, 90000))
+        self.assertTrue(board.add(3, 3, 20000))
+        self.assertFalse(board.add(1, 5, 1000))
+        self.assertTrue(board.add(1, 3, 50000))
+
+        self.assertEqual(len(board), 3)
+        self.assertEqual([entry['player_id'] for entry in board.top(10)], [3, 1, 2])
+        self.assertEqual(board.rank(1), 2)
+        self.assertIsNone(board.rank(4))
+
+    def test_around(self):
+        board = Leaderboard([(player_id, 1 + player_id, 0) for player_id in range(10)])
+        self.assertEqual([entry['rank'] for entry in board.around(5, 2)], [4, 5, 6, 7, 8])
+        self.assertEqual([entry['rank'] for entry in board.around(0, 2)], [1, 2, 3])
+        self.assertEqual(Leaderboard(board.dump()).dump(), board.dump())
+
+
+@override_settings(DICTIONARY_VERSION_CHECK_INTERVAL=0, LEADERBOARD_LISTEN=False, LEADERBOARD_REFRESH_INTERVAL=0)
+class LeaderboardsTestCase(TestCase):
+    def setUp(self):
+        reset_leaderboards()
+        for word in ['LABAS', 'NAMAS']:
+            DictionaryWord.objects.create(word_text=word, complexity=1)
+        self.users = [User.objects.create_user(f'player{i}', password='secret-password') for i in range(3)]
+
+    def tearDown(self):
+        reset_leaderboards()
+
+    def play(self, user, guesses, seconds):
+        game = Game.objects.create(word_to_guess='NAMAS', player=user)
+        Game.objects.filter(id=game.id).update(created_at=game.created_at - datetime.timedelta(seconds=seconds))
+        client = Client()
+        client.force_login(user)
+        client.post(
+            reverse('handle_guess_operations'),
+            data=json.dumps({'guesses': [{'id': str(game.id), 'guess': guess} for guess in guesses]}),
+            content_type='application/json'
+        )
+        return client
+
+    def test_fewest_attempts_then_fastest(self):
+        self.play(self.users[0], ['LABAS', 'NAMAS'], 10)
+        self.play(self.users[1], ['NAMAS'], 60)
+        client = self.play(self.users[2], ['LABAS', 'NAMAS'], 5)
+        self.play(self.users[2], ['LABAS'], 1)
+
+        data = client.get(reverse('handle_leaderboard'), {'period': 'weekly'}).json()
+        self.assertEqual([entry['username'] for entry in data['top']], ['player1', 'player2', 'player0'])
+        self.assertEqual([entry['attempts'] for entry in data['top']], [1, 2, 2])
+        self.assertEqual(data['rank'], 2)
+        self.assertEqual(len(data['around']), 3)
+
+    def test_invalid_period(self):
+        self.assertEqual(self.client.get(reverse('handle_leaderboard'), {'period': 'yearly'}).status_code, 400)
+
+    def test_snapshot_and_catch_up(self):
+        self.play(self.users[0], ['LABAS', 'NAMAS'], 10)
+        save_snapshot(load_leaderboards())
+        self.assertEqual(len(LeaderboardSnapshot.objects.get().boards['all']), 1)
+
+        self.play(self.users[1], ['NAMAS'], 10)
+        leaderboards = load_leaderboards()
+        self.assertEqual([entry['player_id'] for entry in leaderboards.standings('all')['top']],
+                         [self.users[1].id, self.users[0].id])
+
+    def test_old_boards_are_pruned(self):
+        leaderboards = Leaderboards()
+        now = timezone.now()
+        leaderboards.add_game(1, 3, now - datetime.timedelta(days=30, seconds=5), now - datetime.timedelta(days=30))
+        leaderboards.add_game(1, 4, now - datetime.timedelta(seconds=5), now)
+        leaderboards.prune(now)
+        self.assertEqual(len(leaderboards.boards), 3)
+        self.assertEqual(leaderboards.standings('all', 1)['rank'], 1)
+        self.assertEqual(leaderboards.standings('daily', 1)['top'][0]['attempts'], 4)
+
+
+class GameFinishedNotifyTestCase(TransactionTestCase):
+    serialized_rollback = True
+
+    def test_notifies_when_a_game_ends(self):
+        listener = connection.Database.connect(**connection.get_connection_params())
+        listener.autocommit = True
+        try:
+            listener.execute("LISTEN game_finished")
+            game = Game.objects.create(word_to_guess='NAMAS')
+            Game.objects.filter(id=game.id).update(ended_at=timezone.now())
+            Game.objects.filter(id=game.id).update(ended_at=timezone.now())
+            payloads = [notify.payload for notify in listener.notifies(timeout=1)]
+        finally:
+            listener.close()
+        self.assertEqual(payloads, [str(game.id)])
+
+
+class PartitionTestCase(TestCase):
+    def partition_of(self, game):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT tableoid::regclass::text FROM game_sessions WHERE game_id = %s", [game.id])
+            return cursor.fetchone()[0]
+
+    def old_game(self, created_at):
+        game = Game.objects.create(word_to_guess='NAMAS')
+        Game.objects.filter(id=game.id).update(created_at=created_at)
+        game.refresh_from_db()
+        Guess.objects.create(game=game, guessed_word='LABAS', result_pattern_id=pattern_id(0), attempt_number=1)
+        Guess.objects.filter(game=game).update(created_at=created_at)
+        return game
+
+    def guess_partition_of(self, game):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT tableoid::regclass::text FROM game_guesses WHERE game_id = %s", [game.id])
+            return cursor.fetchone()[0]
+
+    def test_new_games_go_to_the_month_partition(self):
+        game = Game.objects.create(word_to_guess='NAMAS')
+        self.assertEqual(self.partition_of(game), f'game_sessions_y{game.created_at:%Y}m{game.created_at:%m}')
+
+    def test_new_partitions_match_the_migrated_indexes(self):
+        create_partitions(datetime.date(2019, 5, 1), datetime.date(2019, 5, 1))
+        definitions = {}
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT tablename, regexp_replace(indexdef, 'INDEX \\S+ ON \\S+', 'INDEX ON') FROM pg_indexes "
+                "WHERE tablename IN ('game_guesses_default', 'game_guesses_y2019m05')"
+            )
+            for table, definition in cursor.fetchall():
+                definitions.setdefault(table, set()).add(definition)
+        self.assertEqual(definitions['game_guesses_default'], definitions['game_guesses_y2019m05'])
+        self.assertIn(
+            'CREATE UNIQUE INDEX ON USING btree (game_id, attempt_number, game_created_at) '
+            'INCLUDE (result_pattern_id, guessed_word)',
+            definitions['game_guesses_default']
+        )
+
+    def test_guesses_share_the_partition_of_their_game(self):
+        game = self.old_game(datetime.datetime(2019, 5, 20, tzinfo=datetime.timezone.utc))
+        create_partitions(datetime.date(2019, 5, 1), datetime.date(2019, 5, 1))
+        self.assertEqual(self.guess_partition_of(game), 'game_guesses_y2019m05')
+
+        # Guessed months after the game started, the attempt is still taken
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Guess.objects.create(game=game, guessed_word='NAMAS', result_pattern_id=pattern_id(0), attempt_number=1)
+
+    def test_create_partitions_moves_rows_out_of_default(self):
+        game = self.old_game(datetime.datetime(2019, 5, 20, tzinfo=datetime.timezone.utc))
+        self.assertEqual(self.partition_of(game), 'game_sessions_default')
+
+        created = create_partitions(datetime.date(2019, 5, 1), datetime.date(2019, 6, 1))
+        self.assertEqual(created, [
+            'game_sessions_y2019m05', 'game_sessions_y2019m06', 'game_guesses_y2019m05', 'game_guesses_y2019m06'
+        ])
+        self.assertEqual(self.partition_of(game), 'game_sessions_y2019m05')
+        self.assertEqual(create_partitions(datetime.date(2019, 5, 1), datetime.date(2019, 6, 1)), [])
+
+    def test_archive_partitions(self):
+        game = self.old_game(datetime.datetime(2019, 5, 20, tzinfo=datetime.timezone.utc))
+        create_partitions(datetime.date(2019, 5, 1), datetime.date(2019, 5, 1))
+
+        with tempfile.TemporaryDirectory() as directory:
+            paths = archive_partitions(directory, before=datetime.date(2019, 6, 1))
+            self.assertEqual(
+                [os.path.basename(path) for path in paths],
+                ['game_sessions_y2019m05.csv.gz', 'game_guesses_y2019m05.csv.gz']
+            )
+            with gzip.open(paths[0], 'rt') as archived:
+                lines = archived.read().splitlines()
+        self.assertTrue(lines[0].startswith('game_id,'))
+        self.assertIn(str(game.id), lines[1])
+        self.assertFalse(Game.objects.filter(id=game.id).exists())
+        self.assertFalse(Guess.objects.filter(game_id=game.id).exists())
+        self.assertTrue(Game.objects.filter(id=self.old_game(timezone.now()).id).exists())
+
+
+def plan_nodes(plan):
+    """
+    (node type, index name) of every node of a JSON EXPLAIN plan.
+    """
+    nodes = [(plan['Node Type'], plan.get('Index Name'))]
+    for child in plan.get('Plans', []):
+        nodes.extend(plan_nodes(child))
+    return nodes
+
+
+def parent_index(cursor, name):
+    """
+    The partitioned index a partition's index belongs to, or the index
+    itself (e.g. the per-partition guess indexes).
+    """
+    cursor.execute(
+        "SELECT p.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE c.relname = %s",
+        [name]
+    )
+    row = cursor.fetchone()
+    return row[0] if row else name
+
+
+@override_settings(DICTIONARY_VERSION_CHECK_INTERVAL=0)
+class QueryPlanTestCase(TestCase):
+    """
+    Core API flows against Postgres: how many queries they run, and that the
+    queries behind them are answered from the intended indexes. Sequential
+    scans are disabled, as the test tables are too small for the planner to
+    prefer an index on its own; a query no index can serve still shows a
+    Seq Scan.
+    """
+    def setUp(self):
+        for word in ['LABAS', 'NAMAS']:
+            DictionaryWord.objects.create(word_text=word, complexity=1)
+        self.user = User.objects.create_user('player', password='secret-password')
+        self.games = [Game.objects.create(word_to_guess='NAMAS', player=self.user) for _ in range(3)]
+        reset_state_cache()
+        get_dictionary()
+        get_pattern_ids()
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def plan(self, queryset):
+        nodes = plan_nodes(json.loads(queryset.explain(format='json'))[0]['Plan'])
+        with connection.cursor() as cursor:
+            indexes = {parent_index(cursor, index) for _, index in nodes if index}
+        return {node for node, _ in nodes}, indexes
+
+    def guess(self, games, word):
+        return self.client.post(
+            reverse('handle_guess_operations'),
+            data=json.dumps({'guesses': [{'id': str(game.id), 'guess': word} for game in games]}),
+            content_type='application/json'
+        )
+
+    def test_create_game_queries(self):
+        # dictionary version check, insert
+        with self.assertNumQueries(2):
+            self.client.post(reverse('handle_game_operations'))
+
+    def test_guess_queries_do_not_grow_with_games(self):
+        # version check, games with their attempts, savepoint, bulk insert, release
+        with self.assertNumQueries(5):
+            self.guess(self.games[:1], 'LABAS')
+        with self.assertNumQueries(5):
+            self.guess(self.games, 'LABAS')
+        # All three game states are cached now, so no game query, but one
+        # update ending the won games, their results, one stats upsert per
+        # finished game of a player and one global stats upsert
+        with self.assertNumQueries(10):
+            response = self.guess(self.games, 'NAMAS')
+        self.assertTrue(all(result['finished'] for result in response.json()['guesses']))
+
+    def test_finish_game_queries(self):
+        # savepoint, update, results, player stats, global stats, release
+        with self.assertNumQueries(6):
+            self.client.put(
+                reverse('handle_game_operations'),
+                data=json.dumps({'id': str(self.games[0].id), 'isfinished': True}),
+                content_type='application/json'
+            )
+
+    def test_game_lookup_plan(self):
+        nodes, indexes = self.plan(
+            Game.objects.filter(id__in=[game.id for game in self.games]).annotate(attempts=last_attempt())
+        )
+        self.assertNotIn('Seq Scan', nodes)
+        self.assertIn('Index Only Scan', nodes)
+        self.assertIn('game_sessions_pkey', indexes)
+        self.assertTrue(any(index.endswith('_game_attempt_uniq') for index in indexes))
+
+    def test_guesses_of_a_game_plan(self):
+        nodes, indexes = self.plan(
+            Guess.objects.filter(game=self.games[0]).values_list('attempt_number', 'guessed_word', 'result_pattern_id')
+        )
+        self.assertNotIn('Seq Scan', nodes)
+        self.assertNotIn('Sort', nodes)
+        self.assertIn('Index Only Scan', nodes)
+
+    def test_game_results_plan(self):
+        nodes, _ = self.plan(game_results(Game.objects.filter(id=self.games[0].id)))
+        self.assertNotIn('Seq Scan', nodes)
+
+    def test_active_games_plan(self):
+        nodes, indexes = self.plan(
+            Game.objects.filter(player=self.user, ended_at__isnull=True).order_by('-created_at')
+        )
+        self.assertNotIn('Seq Scan', nodes)
+        self.assertEqual(indexes, {'game_sessions_active_idx'})
+
+    def test_finished_games_per_day_plan(self):
+        today = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        nodes, indexes = self.plan(
+            Game.objects.filter(ended_at__gte=today, ended_at__lt=today + datetime.timedelta(days=1))
+        )
+        self.assertNotIn('Seq Scan', nodes)
+        self.assertEqual(indexes, {'game_sessions_finished_idx'})
+
+
+
+@override_settings(DICTIONARY_VERSION_CHECK_INTERVAL=0, REQUEST_METRICS=True, REQUEST_METRICS_DIR='')
+class RequestMetricsTestCase(TestCase):
+    def setUp(self):
+        DictionaryWord.objects.create(word_text='NAMAS', complexity=1)
+        get_dictionary()
+        self.registry = Registry()
+        patcher = mock.patch('api.metrics._registry', self.registry)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_records_view_time_and_queries(self):
+        self.client.post(reverse('handle_game_operations'))
+        self.client.get(reverse('user_login'))
+
+        text = self.client.get(reverse('handle_metrics')).content.decode()
+        self.assertIn(
+            'wordlas_requests_total{method="POST",status="200",view="handle_game_operations"} 1', text
+        )
+        # dictionary version check and the insert
+        self.assertEqual(self.registry.histograms[('wordlas_request_db_queries', (('view', 'handle_game_operations'),))][-1], 2)
+        self.assertIn('wordlas_request_duration_seconds_count{view="handle_game_operations"} 1', text)
+        template_time = self.registry.histograms[('wordlas_request_template_seconds', (('view', 'user_login'),))][-1]
+        self.assertGreater(template_time, 0)
+
+    def test_profiles_sampled_requests(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(REQUEST_METRICS_PROFILE_RATE=1, REQUEST_METRICS_PROFILE_DIR=directory):
+                self.client.get(reverse('handle_stats'))
+            self.assertEqual(len([name for name in os.listdir(directory) if name.endswith('.prof')]), 1)
+        self.assertEqual(self.registry.counters[('wordlas_profiled_requests_total', (('view', 'handle_stats'),))], 1)
+
+    def test_workers_are_added_up(self):
+        other = Registry()
+        other.inc('wordlas_requests_total', {'view': 'handle_stats', 'method': 'GET', 'status': '200'}, 2)
+        with tempfile.TemporaryDirectory() as directory, override_settings(REQUEST_METRICS_DIR=directory):
+            with open(os.path.join(directory, '1.json'), 'w', encoding='utf-8') as data:
+                json.dump(other.dump(), data)
+            self.client.get(reverse('handle_stats'))
+            text = self.client.get(reverse('handle_metrics')).content.decode()
+        self.assertIn('wordlas_requests_total{method="GET",status="200",view="handle_stats"} 3', text)
+
+    def test_snapshot_is_not_changed_by_later_updates(self):
+        labels = {'view': 'handle_stats'}
+        self.registry.observe('wordlas_request_db_queries', labels, 1)
+        counters, histograms = self.registry.snapshot()
+        self.registry.inc('wordlas_profiled_requests_total', labels)
+        self.registry.observe('wordlas_request_db_queries', labels, 1)
+        self.assertEqual(counters, {})
+        self.assertEqual(histograms[('wordlas_request_db_queries', (('view', 'handle_stats'),))][-1], 1)
+
+    def test_disabled(self):
+        with override_settings(REQUEST_METRICS=False):
+            self.assertEqual(Client().get(reverse('handle_metrics')).status_code, 404)
+
+
+class LocalStateCacheTestCase(SimpleTestCase):
+    def test_least_recently_used_games_are_evicted(self):
+        cache = LocalStateCache(max_games=2)
+        cache.set_many({'a': GameState('NAMAS'), 'b': GameState('LABAS')})
+        cache.get_many(['a'])
+        cache.set_many({'c': GameState('DIENA')})
+        self.assertEqual(set(cache.get_many(['a', 'b', 'c'])), {'a', 'c'})
+
+    def test_entries_expire(self):
+        cache = LocalStateCache(ttl=10)
+        with mock.patch('api.state.time.monotonic', return_value=100):
+            cache.set_many({'a': GameState('NAMAS', 2)})
+        with mock.patch('api.state.time.monotonic', return_value=109):
+            self.assertEqual(cache.get_many(['a']), {'a': GameState('NAMAS', 2)})
+        with mock.patch('api.state.time.monotonic', return_value=110):
+            self.assertEqual(cache.get_many(['a']), {})
+        self.assertEqual(len(cache), 0)
+
+
+@override_settings(DICTIONARY_VERSION_CHECK_INTERVAL=0)
+class GameStateTestCase(TestCase):
+    def setUp(self):
+        reset_state_cache()
+        self.addCleanup(reset_state_cache)
+        for word in ['LABAS', 'NAMAS']:
+            DictionaryWord.objects.create(word_text=word, complexity=1)
+        get_dictionary()
+        get_pattern_ids()
+
+    def new_game(self):
+        with mock.patch.object(DictionaryIndex, 'random_word', return_value='NAMAS'):
+            return self.client.post(reverse('handle_game_operations')).json()['id']
+
+    def guess(self, game_id, word='LABAS'):
+        return self.client.post(
+            reverse('handle_guess_operations'),
+            data=json.dumps({'id': game_id, 'guess': word}),
+            content_type='application/json'
+        )
+
+    def test_guesses_skip_the_game_query(self):
+        game_id = self.new_game()
+        # version check, savepoint, insert, release
+        with self.assertNumQueries(4):
+            self.assertEqual(self.guess(game_id).json()['guesses'][0]['attempt'], 1)
+        self.assertEqual(get_state_cache().get_many([game_id])[game_id].attempts, 1)
+
+    def test_games_ended_on_another_worker_take_no_guesses(self):
+        game_id = self.new_game()
+        self.guess(game_id)
+        # Ended through PUT on another worker, whose state cache this one does not share
+        finish_game(game_id, timezone.now())
+
+        self.assertEqual(self.guess(game_id).status_code, 409)
+        self.assertEqual(Guess.objects.filter(game_id=game_id).count(), 1)
+        self.assertEqual(get_state_cache().get_many([game_id]), {})
+
+    def test_stale_attempts_are_reloaded(self):
+        game_id = self.new_game()
+        self.guess(game_id)
+        # Another worker stored attempt 2
+        Guess.objects.create(game_id=game_id, guessed_word='LABAS', result_pattern_id=pattern_id(0), attempt_number=2)
+
+        response = self.guess(game_id)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['guesses'][0]['attempt'], 3)
+        self.assertEqual(get_state_cache().get_many([game_id])[game_id].attempts, 3)
+
+    def test_finished_games_are_cached_as_finished(self):
+        game = Game.objects.create(word_to_guess='NAMAS')
+        self.assertTrue(self.guess(str(game.id), 'NAMAS').json()['guesses'][0]['finished'])
+        self.assertIsNotNone(get_state_cache().get_many([str(game.id)])[str(game.id)].ended_at)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.guess(str(game.id)).status_code, 409)
+
+    def test_finishing_a_game_drops_its_state(self):
+        game_id = self.new_game()
+        self.client.put(
+            reverse('handle_game_operations'),
+            data=json.dumps({'id': game_id.upper(), 'isfinished': True}),
+            content_type='application/json'
+        )
+        self.assertEqual(get_state_cache().get_many([game_id]), {})
+        self.assertEqual(self.guess(game_id).status_code, 409)
+
+    @override_settings(GAME_STATE_BACKEND='django')
+    def test_django_cache_backend(self):
+        reset_state_cache()
+        self.assertIsInstance(get_state_cache(), DjangoStateCache)
+        game_id = self.new_game()
+        self.guess(game_id)
+        self.assertEqual(get_state_cache().get_many([game_id])[game_id].attempts, 1)
+        self.assertEqual(self.guess(game_id).json()['guesses'][0]['attempt'], 2)
+
+    @override_settings(GAME_STATE_BACKEND='django')
+    def test_django_cache_ignores_states_of_older_versions(self):
+        reset_state_cache()
+        game_id = self.new_game()
+        get_state_cache().cache.set(DjangoStateCache.key(game_id), ('LABAS', 0, None, False, ()))
+        self.assertEqual(get_state_cache().get_many([game_id]), {})
+        self.assertEqual(self.guess(game_id).json()['guesses'][0]['attempt'], 1)
+
+
+@override_settings(DICTIONARY_VERSION_CHECK_INTERVAL=0, HINT_SUGGESTIONS=3)
+class HintTestCase(TestCase):
+    WORDS = ['LABAS', 'NAMAS', 'TEMPO', 'RANKA', 'SODAS', 'MEDIS', 'LAPAS', 'KASOS', 'DARBO', 'ŠAKĖS']
+
+    def setUp(self):
+        reset_hints()
+        cache.clear()
+        self.addCleanup(reset_hints)
+        self.addCleanup(cache.clear)
+        reset_state_cache()
+        self.addCleanup(reset_state_cache)
+        for word in self.WORDS:
+            DictionaryWord.objects.create(word_text=word, complexity=1)
+        get_dictionary()
+        get_pattern_ids()
+
+    def guess(self, game, word):
+        response = self.client.post(
+            reverse('handle_guess_operations'),
+            data=json.dumps({'id': str(game.id), 'guess': word}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def hint(self, game):
+        response = self.client.get(reverse('handle_hint'), {'id': str(game.id)})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def remaining(self, guesses, target):
+        return [
+            word for word in self.WORDS
+            if all(score(guess, word) == score(guess, target) for guess in guesses)
+        ]
+
+    def test_expected_information_matches_pattern_counts(self):
+        encoded = encode_words(self.WORDS)
+        expected = []
+        for guess in self.WORDS:
+            counts = collections.Counter(score(guess, target) for target in self.WORDS)
+            expected.append(-sum(n / len(self.WORDS) * math.log2(n / len(self.WORDS)) for n in counts.values()))
+        np.testing.assert_allclose(expected_information(encoded, encoded, batch_size=3), expected)
+
+    def test_candidates_follow_the_feedback(self):
+        game = Game.objects.create(word_to_guess='LAPAS')
+        self.assertEqual(self.hint(game)['candidates'], len(self.WORDS))
+        self.guess(game, 'NAMAS')
+        hint = self.hint(game)
+        self.assertEqual(hint['attempts'], 1)
+        self.assertEqual(hint['candidates'], len(self.remaining(['NAMAS'], 'LAPAS')))
+        self.assertEqual(len(hint['suggestions']), 3)
+
+        self.guess(game, 'SODAS')
+        self.assertEqual(self.remaining(['NAMAS', 'SODAS'], 'LAPAS'), ['LABAS', 'LAPAS'])
+        # Guessing either candidate splits them as well as any other word
+        best = self.hint(game)['suggestions'][0]
+        self.assertEqual(best['bits'], 1.0)
+        self.assertIn(best['word'], {'LABAS', 'LAPAS'})
+
+        self.guess(game, 'LABAS')
+        self.assertEqual(self.hint(game)['suggestions'], [{'word': 'LAPAS', 'bits': 0.0}])
+
+    def test_only_new_guesses_are_filtered(self):
+        game = Game.objects.create(word_to_guess='LAPAS')
+        self.guess(game, 'TEMPO')
+        self.hint(game)
+        self.guess(game, 'MEDIS')
+        with mock.patch('api.hints.filter_candidates', wraps=filter_candidates) as filtered:
+            incremental = self.hint(game)
+        self.assertEqual(filtered.call_count, 1)
+        reset_hints()
+        self.assertEqual(self.hint(game), incremental)
+        self.assertEqual(incremental['candidates'], len(self.remaining(['TEMPO', 'MEDIS'], 'LAPAS')))
+
+    def test_first_guesses_are_ranked_once_per_dictionary(self):
+        games = [Game.objects.create(word_to_guess='LAPAS') for _ in range(2)]
+        with mock.patch('api.hints.rank_guesses', wraps=rank_guesses) as ranked:
+            first = self.hint(games[0])
+            self.assertEqual(self.hint(games[1]), {**first, 'id': str(games[1].id)})
+            self.assertEqual(ranked.call_count, 1)
+            # Other workers take the ranking from the cache
+            reset_hints()
+            self.hint(games[0])
+            self.assertEqual(ranked.call_count, 1)
+
+    def test_unknown_and_finished_games(self):
+        self.assertEqual(self.client.get(reverse('handle_hint'), {'id': str(uuid.uuid4())}).status_code, 404)
+        self.assertEqual(self.client.get(reverse('handle_hint'), {'id': 'nope'}).status_code, 400)
+        game = Game.objects.create(word_to_guess='LAPAS', ended_at=timezone.now())
+        self.assertEqual(self.client.get(reverse('handle_hint'), {'id': str(game.id)}).status_code, 409)
+
+
+class LetterIndexTestCase(SimpleTestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        letters = 'AĄBEĖKLMNOSŠT'
+        self.words = sorted({''.join(rng.choice(letters) for _ in range(5)) for _ in range(400)})
+        self.index = LetterIndex(self.words)
+        self.rng = rng
+
+    def test_feedback_constraints_match_consistent_words(self):
+        for _ in range(50):
+            target = self.rng.choice(self.words)
+            guesses = self.rng.sample(self.words, 2)
+            constraints = Constraints()
+            for guess in guesses:
+                constraints.add_feedback(guess, score(guess, target))
+            consistent = [
+                word for word in self.words
+                if all(score(guess, word) == score(guess, target) for guess in guesses)
+            ]
+            self.assertEqual(self.index.matching_words(self.index.match(constraints)), consistent)
+
+    def test_pattern_query(self):
+        # Š in position 1 and no E
+        bits = self.index.match(Constraints(greens={0: 'Š'}, max_counts={'E': 0}))
+        expected = [word for word in self.words if word[0] == 'Š' and 'E' not in word]
+        self.assertEqual(self.index.matching_words(bits), expected)
+        self.assertEqual(bits.bit_count(), len(expected))
+        self.assertEqual(self.index.matching_words(bits, limit=2), expected[:2])
+
+    def test_hard_mode_keeps_greens_and_revealed_letters(self):
+        constraints = Constraints().add_feedback('LABAS', pattern_from_string('GNNYN')).hard_mode()
+        self.assertEqual(constraints.describe(), 'L in position 1, A')
+        bits = self.index.match(constraints)
+        for word in self.words:
+            allowed = word[0] == 'L' and word.count('A') >= 1
+            self.assertEqual(self.index.contains(bits, word), allowed, word)
+        self.assertFalse(self.index.contains(bits, 'XXXXX'))
+
+    def test_allows_agrees_with_the_index(self):
+        for _ in range(50):
+            target = self.rng.choice(self.words)
+            constraints = Constraints()
+            for guess in self.rng.sample(self.words, 2):
+                constraints.add_feedback(guess, score(guess, target))
+            for check in (constraints, constraints.hard_mode()):
+                bits = self.index.match(check)
+                for word in self.words:
+                    self.assertEqual(check.allows(word), self.index.contains(bits, word), word)
+        self.assertFalse(Constraints(greens={0: 'L'}).allows('LAB'))
+
+
+@override_settings(DICTIONARY_VERSION_CHECK_INTERVAL=0)
+class HardModeTestCase(TestCase):
+    def setUp(self):
+        reset_state_cache()
+        self.addCleanup(reset_state_cache)
+        for word in ['LAPAS', 'LABAS', 'NAMAS', 'SODAS', 'TEMPO']:
+            DictionaryWord.objects.create(word_text=word, complexity=1)
+        get_dictionary()
+        get_pattern_ids()
+
+    def new_game(self, hard=True):
+        with mock.patch.object(DictionaryIndex, 'random_word', return_value='LAPAS'):
+            response = self.client.post(
+                reverse('handle_game_operations'), data=json.dumps({'hard': hard}), content_type='application/json'
+            )
+        return response.json()['id']
+
+    def guess(self, game_id, word):
+        return self.client.post(
+            reverse('handle_guess_operations'),
+            data=json.dumps({'id': game_id, 'guess': word}),
+            content_type='application/json'
+        )
+
+    def test_revealed_hints_must_be_used(self):
+        game_id = self.new_game()
+        self.assertTrue(Game.objects.get(id=game_id).hard_mode)
+        # L, A, A and S are green
+        self.assertEqual(self.guess(game_id, 'LABAS').status_code, 200)
+        response = self.guess(game_id, 'NAMAS')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('L in position 1', response.content.decode())
+        self.assertEqual(self.guess(game_id, 'LAPAS').status_code, 200)
+
+    def test_hints_are_reloaded_from_the_database(self):
+        game_id = self.new_game()
+        self.guess(game_id, 'TEMPO')
+        reset_state_cache()
+        # P was revealed (yellow), so a guess without it is rejected
+        self.assertEqual(self.guess(game_id, 'NAMAS').status_code, 400)
+        self.assertEqual(self.guess(game_id, 'LAPAS').status_code, 200)
+
+    def test_batch_guesses_see_earlier_hints(self):
+        game_id = self.new_game()
+        response = self.client.post(
+            reverse('handle_guess_operations'),
+            data=json.dumps({'guesses': [{'id': game_id, 'guess': 'TEMPO'}, {'id': game_id, 'guess': 'NAMAS'}]}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Guess.objects.filter(game_id=game_id).exists())
+
+    def test_normal_games_accept_any_word(self):
+        game_id = self.new_game(hard=False)
+        self.guess(game_id, 'LABAS')
+        self.assertEqual(self.guess(game_id, 'TEMPO').status_code, 200)
+
+
+class ConnectionPoolTestCase(SimpleTestCase):
+    def pooled_connection(self):
+        """
+        A connection to the test database from a one-connection pool of its own.
+        """
+        settings_dict = copy.deepcopy(connection.settings_dict)
+        settings_dict['CONN_MAX_AGE'] = 0
+        settings_dict['CONN_HEALTH_CHECKS'] = True
+        settings_dict['OPTIONS']['pool'] = {'min_size': 1, 'max_size': 1, 'timeout': 0.5}
+        return type(connections['default'])(settings_dict, alias='pool_test')
+
+    def backend_pid(self, pooled):
+        with pooled.cursor() as cursor:
+            cursor.execute("SELECT pg_backend_pid()")
+            return cursor.fetchone()[0]
+
+    def test_exhausted_pool_times_out_until_a_connection_is_returned(self):
+        first, second = self.pooled_connection(), self.pooled_connection()
+        self.addCleanup(first.close_pool)
+        first.ensure_connection()
+
+        start = time.monotonic()
+        with self.assertRaises(OperationalError):
+            second.ensure_connection()
+        self.assertGreaterEqual(time.monotonic() - start, 0.5)
+        self.assertEqual(first.pool.get_stats()['requests_errors'], 1)
+
+        first.close()
+        self.assertIsInstance(self.backend_pid(second), int)
+        second.close()
+
+    def test_broken_connections_are_replaced(self):
+        pooled = self.pooled_connection()
+        self.addCleanup(pooled.close_pool)
+        pid = self.backend_pid(pooled)
+        pooled.close()
+
+        with connection.Database.connect(**connection.get_connection_params()) as other:
+            other.execute("SELECT pg_terminate_backend(%s)", [pid])
+        self.assertNotEqual(self.backend_pid(pooled), pid)
+        pooled.close()
+
+
+class PoolStatsTestCase(TestCase):
+    def test_pool_stats(self):
+        response = self.client.get(reverse('handle_pool'))
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['max_size'], connection.settings_dict['OPTIONS']['pool']['max_size'])
+        self.assertIn('pool_available', data['stats'])
+
+    def test_no_pool(self):
+        with mock.patch.object(type(connections['default']), 'pool', None):
+            response = self.client.get(reverse('handle_pool'))
+        self.assertEqual(response.status_code, 404)
+
+
+class RateLimitTestCase(SimpleTestCase):
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate('30/m'), (30, 60))
+        self.assertEqual(parse_rate('5/s'), (5, 1))
+        for rate in ['30', '0/m', 'x/m', '30/w']:
+            with self.assertRaises(ValueError):
+                parse_rate(rate)
+
+    def test_local_buckets(self):
+        buckets = LocalBuckets()
+        self.assertEqual([buckets.take('a', 3, 60, now=0) for _ in range(3)], [0, 0, 0])
+        self.assertAlmostEqual(buckets.take('a', 3, 60, now=0), 20)
+        self.assertEqual(buckets.take('b', 3, 60, now=0), 0)
+        # One token back every 20 seconds, up to 3
+        self.assertEqual(buckets.take('a', 3, 60, now=20), 0)
+        self.assertAlmostEqual(buckets.take('a', 3, 60, now=25), 15)
+        # and no more than 3 after a long pause
+        self.assertEqual([buckets.take('a', 3, 60, now=1000) > 0 for _ in range(4)], [False, False, False, True])
+
+    def test_local_buckets_drop_least_recent_clients(self):
+        buckets = LocalBuckets(max_clients=2)
+        for key in ['a', 'b', 'a', 'c']:
+            buckets.take(key, 1, 60, now=0)
+        self.assertEqual(len(buckets), 2)
+        self.assertGreater(buckets.take('a', 1, 60, now=0), 0)
+        self.assertEqual(buckets.take('b', 1, 60, now=0), 0)
+
+    def test_cache_windows(self):
+        windows = CacheWindows('ratelimit')
+        windows.cache.clear()
+        self.assertEqual([windows.take('a', 2, 60, now=125) for _ in range(2)], [0, 0])
+        self.assertEqual(windows.take('a', 2, 60, now=130), 50)
+        self.assertEqual(windows.take('a', 2, 60, now=180), 0)
+
+
+@override_settings(
+    DICTIONARY_VERSION_CHECK_INTERVAL=0, RATE_LIMIT=True, RATE_LIMITS={'game': '2/m', 'guess': '1/m', 'hint': '1/m'}
+)
+class RateLimitedViewsTestCase(TestCase):
+    def setUp(self):
+        reset_rate_limits()
+        self.addCleanup(reset_rate_limits)
+        DictionaryWord.objects.create(word_text='tempo', complexity=1)
+        self.game_url = reverse('handle_game_operations')
+
+    def test_game_creation_is_limited(self):
+        self.assertEqual([self.client.post(self.game_url).status_code for _ in range(2)], [200, 200])
+        response = self.client.post(self.game_url)
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(1 <= int(response['Retry-After']) <= 30)
+        self.assertEqual(Game.objects.count(), 2)
+        # Only creating games is limited
+        game_id = Game.objects.first().id
+        body = json.dumps({'id': str(game_id), 'isfinished': True})
+        self.assertEqual(self.client.put(self.game_url, body, content_type='application/json').status_code, 200)
+
+    def test_clients_are_counted_separately(self):
+        for _ in range(2):
+            self.client.post(self.game_url)
+        self.assertEqual(self.client.post(self.game_url, REMOTE_ADDR='10.0.0.2').status_code, 200)
+        User.objects.create_user('pirmas', password='slaptas')
+        self.client.login(username='pirmas', password='slaptas')
+        self.assertEqual(self.client.post(self.game_url).status_code, 200)
+
+    @override_settings(RATE_LIMIT_IP_HEADER='HTTP_X_FORWARDED_FOR')
+    def test_forwarded_address(self):
+        # The proxy appended 10.0.0.1, whatever the client sent before it
+        for sent in ('10.0.0.3', '10.0.0.4'):
+            self.client.post(self.game_url, HTTP_X_FORWARDED_FOR=f'{sent}, 10.0.0.1')
+        self.assertEqual(self.client.post(self.game_url, HTTP_X_FORWARDED_FOR='10.0.0.1').status_code, 429)
+        self.assertEqual(self.client.post(self.game_url, HTTP_X_FORWARDED_FOR='10.0.0.3').status_code, 200)
+
+    @override_settings(RATE_LIMIT_IP_HEADER='HTTP_X_FORWARDED_FOR', RATE_LIMIT_TRUSTED_PROXIES=2)
+    def test_forwarded_address_behind_several_proxies(self):
+        factory = RequestFactory()
+        request = factory.get('/', HTTP_X_FORWARDED_FOR='10.0.0.3, 10.0.0.5, 10.0.0.9')
+        self.assertEqual(client_ip(request), '10.0.0.5')
+        self.assertEqual(client_ip(factory.get('/', HTTP_X_FORWARDED_FOR='10.0.0.9')), '127.0.0.1')
+        self.assertEqual(client_ip(factory.get('/')), '127.0.0.1')
+        with override_settings(RATE_LIMIT_TRUSTED_PROXIES=0):
+            self.assertEqual(client_ip(request), '127.0.0.1')
+
+    def test_anonymous_sessions_are_counted_separately(self):
+        for _ in range(2):
+            self.client.post(self.game_url)
+        session = self.client.session
+        session['seen'] = True
+        session.save()
+        self.assertEqual([self.client.post(self.game_url).status_code for _ in range(3)], [200, 200, 429])
+        # An unknown session key counts as the address
+        self.client.cookies[settings.SESSION_COOKIE_NAME] = 'x' * 32
+        self.assertEqual(self.client.post(self.game_url).status_code, 429)
+
+    def test_guesses_and_hints_are_limited(self):
+        body = json.dumps({'id': str(uuid.uuid4()), 'guess': 'tempo'})
+        self.client.post(reverse('handle_guess_operations'), body, content_type='application/json')
+        response = self.client.post(reverse('handle_guess_operations'), body, content_type='application/json')
+        self.assertEqual(response.status_code, 429)
+        self.client.get(reverse('handle_hint'))
+        self.assertEqual(self.client.get(reverse('handle_hint')).status_code, 429)
+
+    @override_settings(RATE_LIMIT_BACKEND='django')
+    def test_django_cache_backend(self):
+        cache_backend = CacheWindows('ratelimit').cache
+        cache_backend.clear()
+        self.addCleanup(cache_backend.clear)
+        self.assertEqual([self.client.post(self.game_url).status_code for _ in range(3)], [200, 200, 429])
+
+    @override_settings(RATE_LIMIT=False)
+    def test_disabled(self):
+        self.assertEqual({self.client.post(self.game_url).status_code for _ in range(3)}, {200})
@@ -3,4 +3,10 @@ from . import views
 
 urlpatterns = [
     path('api/game/', views.handle_game_operations, name='handle_game_operations'),
+    path('api/guess/', views.handle_guess_operations, name='handle_guess_operations'),
+    path('api/hint/', views.handle_hint, name='handle_hint'),
+    path('api/stats/', views.handle_stats, name='handle_stats'),
+    path('api/leaderboard/', views.handle_leaderboard, name='handle_leaderboard'),
+    path('api/pool/', views.handle_pool, name='handle_pool'),
+    path('metrics', views.handle_metrics, name='handle_metrics'),
 ]
\ No newline at end of file
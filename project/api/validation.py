@@ -0,0 +1,41 @@
+"""
+Lithuanian word validation shared by the forms, the guess API and the
+dictionary import.
+
+Words are NFC-normalized before they are uppercased and checked, so a
+decomposed Ė (E + combining dot) or Ų (U + combining ogonek) is the same
+letter as the composed one. A word is valid when every letter is in the
+32-letter alphabet, which is a frozenset superset test.
+"""
+import unicodedata
+
+# A Ą B C Č D E Ę Ė F G H I Į Y J K L M N O P R S Š T U Ų Ū V Z Ž
+ALPHABET = 'AĄBCČDEĘĖFGHIĮYJKLMNOPRSŠTUŲŪVZŽ'
+LETTERS = frozenset(ALPHABET)
+WORD_LENGTH = 5
+
+
+def normalize_word(word):
+    return unicodedata.normalize('NFC', word).upper()
+
+
+def is_valid_word(word, length=WORD_LENGTH, normalized=False):
+    """
+    length: required number of letters, or None for any non-empty word
+    normalized: skip normalization for words that already went through normalize_word()
+    """
+    if not normalized:
+        word = normalize_word(word)
+    if length is None:
+        return bool(word) and LETTERS.issuperset(word)
+    return len(word) == length and LETTERS.issuperset(word)
+
+
+def validate_words(words, length=WORD_LENGTH):
+    """
+    Returns (valid, invalid) lists of normalized words, in input order.
+    """
+    valid, invalid = [], []
+    for word in map(normalize_word, words):
+        (valid if is_valid_word(word, length, normalized=True) else invalid).append(word)
+    return valid, invalid
@@ -1,37 +1,506 @@
 import json
+import uuid
+from collections import Counter
 
-from django.http import HttpResponseBadRequest, Http404, HttpResponse
-from django.shortcuts import render
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connection, transaction
+from django.http import HttpResponseBadRequest, Http404, HttpResponse, JsonResponse
+from django.contrib.auth import get_user_model
 from django.utils import timezone
 
 from django.views.decorators.csrf import csrf_exempt
 
-from api.models import Game
+from api import metrics, writebehind
+from api.daily import aword_for_day
+from api.dictionary import aget_dictionary
+from api.hints import game_hint
+from api.letters import hard_mode_constraints
+from api.leaderboard import PERIODS, get_leaderboards
+from api.models import MAX_ATTEMPTS, Game, Guess
+from api.patterns import aget_pattern_ids
+from api.ratelimit import rate_limit
+from api.scoring import WINNING_PATTERN, pattern_to_string, score
+from api.state import GameState, get_state_cache
+from api.stats import global_stats, last_attempt, player_stats, record_finished_games
+from api.validation import normalize_word, validate_words
+
+
+async def create_game(request):
+    """
+    Starts a game with a random word, or today's word with "daily", in hard
+    mode with "hard".
+    """
+    try:
+        data = json.loads(request.body) if request.content_type == 'application/json' and request.body else {}
+    except ValueError:
+        return HttpResponseBadRequest("Invalid JSON POST /api/game/")
+    if not isinstance(data, dict):
+        return HttpResponseBadRequest("Expected a JSON object POST /api/game/")
+
+    word = await aword_for_day() if data.get("daily") else (await aget_dictionary()).random_word()
+    if word is None:
+        return HttpResponse("Dictionary is empty", status=503)
+    user = await request.auser()
+    player = user if user.is_authenticated else None
+    hard_mode = bool(data.get("hard"))
+    if writebehind.enabled():
+        game = Game(word_to_guess=word, player=player, hard_mode=hard_mode, created_at=timezone.now())
+        await writebehind.enqueue(writebehind.get_buffer().add_game, game)
+    else:
+        game = await Game.objects.acreate(word_to_guess=word, player=player, hard_mode=hard_mode)
+
+    cache = get_state_cache()
+    if cache is not None:
+        await cache.aset_many({str(game.id): GameState(word, hard_mode=hard_mode, created_at=game.created_at)})
+    return JsonResponse({'id': str(game.id)})
+
+
+async def update_game(request):
+    """
+    Ends the game with the given id when "isfinished" is set.
+    """
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        return HttpResponseBadRequest("Invalid JSON PUT /api/game/")
+    if not isinstance(data, dict) or not data.get("id"):
+        return HttpResponseBadRequest("No id provided PUT /api/game/")
+    try:
+        game_id = parse_game_id(data["id"])
+    except ValueError:
+        return HttpResponseBadRequest("Invalid game id")
+
+    if data.get("isfinished"):
+        end = timezone.now()
+        if writebehind.enabled():
+            await writebehind.enqueue(writebehind.get_buffer().end_game, game_id, end)
+        else:
+            await sync_to_async(finish_game)(game_id, end)
+        cache = get_state_cache()
+        if cache is not None:
+            await cache.adelete_many([game_id])
+    return HttpResponse(status=200)
+
+
+# API views are async, so they opt out of ATOMIC_REQUESTS (which Django
+# does not support for async views).
 
-# TODO: switch everything to asynchronous
 # /api/game/
 @csrf_exempt
-def handle_game_operations(request):
+@transaction.non_atomic_requests
+@rate_limit('game', key='user', methods=('POST',))
+async def handle_game_operations(request):
     if request.method == 'POST':
-        word = "tempo" #TODO: change to word from dict
-        game = Game(word_to_guess=word)
-        game.save()
+        return await create_game(request)
+    if request.method == 'PUT':
+        return await update_game(request)
+    raise Http404("/api/game/")
 
-        return HttpResponse(status=200)
 
-    elif request.method == 'PUT':
-        data = json.loads(request.body)
-        if data.get("id"):
-            id = data.get("id")
-        else:
-            return HttpResponseBadRequest("No id provided PUT /api/game/")
+def game_key(game_id):
+    """
+    Canonical string form of a game id, or the id as given when it is not a UUID.
+    """
+    try:
+        return str(uuid.UUID(str(game_id)))
+    except ValueError:
+        return str(game_id)
+
+
+def parse_game_id(value):
+    """
+    Canonical string form of a game id; raises ValueError if it is not a UUID.
+    """
+    if not isinstance(value, str):
+        raise ValueError(f"Invalid game id {value!r}")
+    return str(uuid.UUID(value))
+
+
+def parse_guesses(data):
+    """
+    Accepts either a single {"id": ..., "guess": ...} object or
+    {"guesses": [{"id": ..., "guess": ...}, ...]} and returns a list of
+    (game id, normalized word) pairs in submission order. A request holds
+    at most MAX_GUESSES_PER_REQUEST guesses and MAX_ATTEMPTS per game.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Expected a JSON object")
+    items = data.get("guesses") if "guesses" in data else [data]
+    if not isinstance(items, list) or not items:
+        raise ValueError("No guesses provided")
+    limit = getattr(settings, 'MAX_GUESSES_PER_REQUEST', 100)
+    if len(items) > limit:
+        raise ValueError(f"At most {limit} guesses per request")
 
-        if data.get("isfinished"):
-            end = timezone.now()
+    guesses = []
+    for item in items:
+        if not isinstance(item, dict) or not item.get("id") or not isinstance(item.get("guess"), str):
+            raise ValueError("Each guess needs an id and a guess")
+        guesses.append((parse_game_id(item["id"]), normalize_word(item["guess"])))
+    per_game = Counter(game_id for game_id, _ in guesses)
+    if max(per_game.values()) > MAX_ATTEMPTS:
+        raise ValueError(f"At most {MAX_ATTEMPTS} guesses per game")
+    return guesses
 
-        Game.objects.filter(id=id).update(ended_at=end)
 
-        return HttpResponse(status=200)
+@transaction.atomic
+def finish_game(game_id, ended_at):
+    if Game.objects.filter(id=game_id, ended_at__isnull=True).update(ended_at=ended_at):
+        record_finished_games([game_id])
 
+
+# Inserts guesses unless their game has ended in the database, which a
+# cached state of another worker may not know yet
+INSERT_OPEN_GAME_GUESSES = (
+    "INSERT INTO {guesses} ({columns}) SELECT v.* FROM (VALUES {rows}) AS v({columns}) "
+    "WHERE NOT EXISTS (SELECT 1 FROM {games} g WHERE g.game_id = v.game_id "
+    "AND g.created_at = v.game_created_at AND g.ended_at IS NOT NULL) RETURNING game_id"
+)
+GUESS_COLUMNS = (
+    'guess_id', 'game_id', 'guessed_word', 'created_at', 'result_pattern_id', 'attempt_number', 'game_created_at'
+)
+GUESS_ROW = '(%s::uuid, %s::uuid, %s, %s::timestamptz, %s::integer, %s::integer, %s::timestamptz)'
+
+
+def insert_guesses(cursor, guesses):
+    """
+    Inserts the guesses of games that have not ended; returns the ids of the
+    games whose guesses were inserted.
+    """
+    now = timezone.now()
+    cursor.execute(
+        INSERT_OPEN_GAME_GUESSES.format(
+            guesses=Guess._meta.db_table, games=Game._meta.db_table,
+            columns=', '.join(GUESS_COLUMNS), rows=', '.join([GUESS_ROW] * len(guesses))
+        ),
+        [
+            value
+            for guess in guesses
+            for value in (guess.id, guess.game_id, guess.guessed_word, now, guess.result_pattern_id,
+                          guess.attempt_number, guess.game_created_at)
+        ]
+    )
+    return {str(game_id) for game_id, in cursor.fetchall()}
+
+
+@transaction.atomic
+def store_guesses(guesses, finished_game_ids, ended_at):
+    """
+    Stores the guesses and ends the games they finish. Raises GameFinished,
+    storing nothing, if one of the games has ended in the database since
+    its state was read (e.g. through PUT on another worker), so it is
+    neither guessed on nor counted again.
+    """
+    with connection.cursor() as cursor:
+        inserted = insert_guesses(cursor, guesses)
+        ended = writebehind.update_ended_at(cursor, dict.fromkeys(finished_game_ids, ended_at))
+    closed = ({str(guess.game_id) for guess in guesses} - inserted) | (
+        set(finished_game_ids) - {str(game_id) for game_id in ended}
+    )
+    if closed:
+        raise GameFinished(min(closed))
+    record_finished_games(ended)
+
+
+async def read_guesses(request):
+    """
+    The (game id, word) pairs of a guess request. Raises ValueError, with
+    the message for the response, if they are malformed, not Lithuanian or
+    not in the dictionary.
+    """
+    try:
+        submitted = parse_guesses(json.loads(request.body))
+    except (ValueError, AttributeError) as error:
+        raise ValueError(f"Invalid guesses POST /api/guess/: {error}") from error
+
+    _, invalid = validate_words([word for _, word in submitted])
+    if invalid:
+        raise ValueError(f"Only Lithuanian letters are allowed: {', '.join(invalid)}")
+
+    dictionary = await aget_dictionary()
+    for _, word in submitted:
+        if word not in dictionary:
+            raise ValueError(f"'{word}' is not in the dictionary")
+    return submitted
+
+
+async def save_guesses(guesses, finished_game_ids, ended_at):
+    if writebehind.enabled():
+        buffer = writebehind.get_buffer()
+        await writebehind.enqueue(buffer.add_guesses, guesses, dict.fromkeys(finished_game_ids, ended_at))
     else:
-        raise Http404("/api/game/")
\ No newline at end of file
+        await sync_to_async(store_guesses)(guesses, finished_game_ids, ended_at)
+
+
+async def submit_guesses(submitted, states, cache, retry=False):
+    """
+    Scores and stores the submitted guesses against the given (cached) game
+    states, loading the missing ones. Returns the results and the new
+    states. If the states turn out stale, drops them from the cache and
+    tries once more with all states loaded from the database (retry).
+    Raises what plan_guesses raises, and GuessConflict if the guesses
+    conflict with a concurrent submission.
+    """
+    game_ids = {game_id for game_id, _ in submitted}
+    missing = game_ids if retry else game_ids - states.keys()
+    if missing:
+        states.update(await load_game_states(missing))
+
+    guesses, results, updated, finished = plan_guesses(submitted, states, await aget_pattern_ids())
+    ended_at = timezone.now()
+    for game_id in finished:
+        updated[game_id].ended_at = ended_at
+
+    try:
+        await save_guesses(guesses, finished, ended_at)
+    except GameFinished:
+        # Ended since its state was read: the retry from the database reports it
+        if cache is not None:
+            await cache.adelete_many(game_ids)
+        if retry:
+            raise
+        return await submit_guesses(submitted, states, cache, retry=True)
+    except (IntegrityError, writebehind.AttemptTaken) as error:
+        # A stale cached attempt count, or a concurrent submission:
+        # retry once with the states in the database (and write-behind queue)
+        if cache is not None:
+            await cache.adelete_many(game_ids)
+        if retry or cache is None:
+            raise GuessConflict() from error
+        return await submit_guesses(submitted, states, cache, retry=True)
+    return results, updated
+
+
+# /api/guess/
+@csrf_exempt
+@transaction.non_atomic_requests
+@rate_limit('guess')
+async def handle_guess_operations(request):
+    """
+    Validates, scores and stores one guess or a batch of guesses (possibly
+    for several games) with a single INSERT. Attempt numbers continue from
+    the highest stored attempt of each game.
+    """
+    if request.method != 'POST':
+        raise Http404("/api/guess/")
+
+    try:
+        submitted = await read_guesses(request)
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error))
+
+    cache = get_state_cache()
+    states = await cache.aget_many({game_id for game_id, _ in submitted}) if cache is not None else {}
+    try:
+        results, updated = await submit_guesses(submitted, states, cache)
+    except GameFinished as error:
+        return HttpResponse(f"Game {error} is already finished", status=409)
+    except HardModeViolation as error:
+        return HttpResponseBadRequest(f"Hard mode: {error}")
+    except GuessConflict:
+        return HttpResponse("Guess conflicts with a concurrent submission", status=409)
+
+    if cache is not None:
+        await cache.aset_many(updated)
+    return JsonResponse({'guesses': results})
+
+
+class GameFinished(Exception):
+    pass
+
+
+class HardModeViolation(Exception):
+    pass
+
+
+class GuessConflict(Exception):
+    pass
+
+
+async def load_game_states(game_ids):
+    """
+    States of the given games from the database, merged with events still
+    queued for write-behind.
+    """
+    pending = writebehind.get_buffer().pending_games(game_ids) if writebehind.enabled() else {}
+    states = {
+        str(game_id): GameState(word_to_guess, attempts, ended_at, hard_mode, created_at=created_at)
+        async for game_id, word_to_guess, attempts, ended_at, hard_mode, created_at in Game.objects.filter(id__in=game_ids)
+        .annotate(attempts=last_attempt())
+        .values_list('id', 'word_to_guess', 'attempts', 'ended_at', 'hard_mode', 'created_at')
+    }
+    for game_id, queued in pending.items():
+        state = states.get(game_id)
+        if state is None:
+            if queued.word_to_guess is None:
+                continue
+            state = states[game_id] = GameState(
+                queued.word_to_guess, hard_mode=queued.hard_mode, created_at=queued.created_at
+            )
+        state.attempts = max(state.attempts, queued.attempts)
+        state.ended_at = state.ended_at or queued.ended_at
+
+    hard_mode_ids = [game_id for game_id, state in states.items() if state.hard_mode]
+    if hard_mode_ids:
+        guessed = {game_id: {} for game_id in hard_mode_ids}
+        created = {states[game_id].created_at for game_id in hard_mode_ids}
+        async for game_id, attempt, word in Guess.objects.filter(
+            game_id__in=hard_mode_ids, game_created_at__in=created
+        ).values_list('game_id', 'attempt_number', 'guessed_word'):
+            guessed[str(game_id)][attempt] = word
+        for game_id, queued in pending.items():
+            if game_id in guessed:
+                guessed[game_id].update(queued.guesses)
+        for game_id, words in guessed.items():
+            states[game_id].guesses = tuple(words[attempt] for attempt in sorted(words))
+    return states
+
+
+def plan_guesses(submitted, states, pattern_ids):
+    """
+    Scores the submitted guesses against the game states. Returns the
+    Guess rows, the results for the response, the new states of the games
+    and the ids of the games the guesses finish. Raises Http404 for unknown
+    games, GameFinished for finished ones and HardModeViolation for
+    hard-mode guesses that leave out revealed hints.
+    """
+    updated, finished = {}, set()
+    guesses, results = [], []
+    for game_id, word in submitted:
+        if game_id in finished:
+            raise GameFinished(game_id)
+        state = updated.get(game_id) or states.get(game_id)
+        if state is None:
+            raise Http404(f"Game {game_id} not found")
+        if state.ended_at is not None:
+            raise GameFinished(game_id)
+
+        if state.hard_mode:
+            constraints = hard_mode_constraints(state.guesses, state.word_to_guess)
+            if not constraints.allows(word):
+                raise HardModeViolation(f"'{word}' must use {constraints.describe()}")
+
+        attempt = state.attempts + 1
+        code = score(word, state.word_to_guess)
+        if code == WINNING_PATTERN or attempt >= MAX_ATTEMPTS:
+            finished.add(game_id)
+        updated[game_id] = GameState(
+            state.word_to_guess, attempt, hard_mode=state.hard_mode,
+            guesses=state.guesses + (word,) if state.hard_mode else (), created_at=state.created_at
+        )
+
+        guesses.append(Guess(
+            game_id=game_id,
+            guessed_word=word,
+            result_pattern_id=pattern_ids[code],
+            attempt_number=attempt,
+            game_created_at=state.created_at
+        ))
+        results.append({
+            'id': game_id,
+            'attempt': attempt,
+            'pattern': pattern_to_string(code),
+            'finished': game_id in finished,
+        })
+    return guesses, results, updated, finished
+
+
+
+# /api/hint/?id=<game id>
+@transaction.non_atomic_requests
+@rate_limit('hint')
+async def handle_hint(request):
+    """
+    The number of dictionary words the game's target can still be and the
+    guesses expected to narrow them down the most.
+    """
+    if request.method != 'GET':
+        raise Http404("/api/hint/")
+    if not request.GET.get('id'):
+        return HttpResponseBadRequest("No id provided GET /api/hint/")
+
+    game_id = game_key(request.GET['id'])
+    cache = get_state_cache()
+    state = (await cache.aget_many([game_id])).get(game_id) if cache is not None else None
+    if state is None:
+        try:
+            state = (await load_game_states([game_id])).get(game_id)
+        except ValidationError:
+            return HttpResponseBadRequest("Invalid game id")
+    if state is None:
+        raise Http404(f"Game {game_id} not found")
+    if state.ended_at is not None:
+        return HttpResponse(f"Game {game_id} is already finished", status=409)
+
+    hint = await sync_to_async(game_hint)(game_id, state.word_to_guess, state.created_at)
+    return JsonResponse({'id': game_id, **hint})
+
+
+# /api/stats/
+@transaction.non_atomic_requests
+async def handle_stats(request):
+    if request.method != 'GET':
+        raise Http404("/api/stats/")
+
+    data = {'global': await sync_to_async(global_stats)()}
+    user = await request.auser()
+    if user.is_authenticated:
+        data['player'] = await sync_to_async(player_stats)(user.id)
+    return JsonResponse(data)
+
+
+# /api/leaderboard/?period=daily|weekly|all&limit=10
+@transaction.non_atomic_requests
+async def handle_leaderboard(request):
+    if request.method != 'GET':
+        raise Http404("/api/leaderboard/")
+
+    period = request.GET.get('period', 'daily')
+    if period not in PERIODS:
+        return HttpResponseBadRequest(f"period must be one of {', '.join(PERIODS)}")
+    try:
+        limit = min(max(int(request.GET.get('limit', 10)), 1), 100)
+    except ValueError:
+        return HttpResponseBadRequest("Invalid limit")
+
+    user = await request.auser()
+    leaderboards = await sync_to_async(get_leaderboards)()
+    data = leaderboards.standings(period, user.id if user.is_authenticated else None, limit)
+
+    entries = data['top'] + data.get('around', [])
+    usernames = {
+        player_id: username
+        async for player_id, username in get_user_model().objects
+        .filter(id__in={entry['player_id'] for entry in entries})
+        .values_list('id', 'username')
+    }
+    for entry in entries:
+        entry['username'] = usernames.get(entry['player_id'])
+    return JsonResponse(data)
+
+
+# /metrics (Prometheus text format), only with REQUEST_METRICS
+@transaction.non_atomic_requests
+def handle_metrics(request):
+    if request.method != 'GET' or not metrics.enabled():
+        raise Http404("/metrics")
+    return HttpResponse(
+        metrics.render(metrics.collect()),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
+
+# /api/pool/ (this worker's database connection pool), 404 without a pool
+@transaction.non_atomic_requests
+def handle_pool(request):
+    pool = connection.pool
+    if request.method != 'GET' or pool is None:
+        raise Http404("/api/pool/")
+    return JsonResponse({
+        'min_size': pool.min_size,
+        'max_size': pool.max_size,
+        'timeout': pool.timeout,
+        'stats': pool.get_stats(),
+    })
@@ -0,0 +1,373 @@
+"""
+Optional write-behind buffering of game lifecycle events.
+
+With ``GAME_WRITE_BEHIND`` enabled, game starts, guesses and game ends are
+queued in process and a background thread drains them every
+``GAME_WRITE_BEHIND_INTERVAL`` seconds (the durability window) with one
+multi-row INSERT per table and a single ``UPDATE ... FROM (VALUES ...)`` for
+``ended_at``. At most ``GAME_WRITE_BEHIND_MAX_EVENTS`` events are held; the
+request that fills the buffer flushes it itself. Whatever is left is flushed
+when the process exits.
+
+Until they are flushed, queued games are visible to the guess API through
+``pending_games()``, but only in the worker that queued them: another
+worker would answer 404 for a new game and reuse the attempt numbers of
+queued guesses. Write-behind therefore needs a single worker process,
+which gunicorn.conf.py enforces.
+
+Attempt numbers are checked twice. A guess whose attempt number is already
+queued for its game is refused with ``AttemptTaken``, like the unique
+conflict of a stored guess, so the guess API retries it. One that turns
+out taken by a stored guess when it is flushed is logged and dropped, and
+the cached state of its game is dropped with it.
+
+A flush that fails on a constraint or a bad value (IntegrityError,
+DataError) is retried one event at a time, and the events that still fail
+are logged and dropped. Other failures requeue the whole flush.
+"""
+import atexit
+import logging
+import threading
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DataError, IntegrityError, close_old_connections, connection, transaction
+from django.utils import timezone
+
+from api.models import Game, Guess
+from api.state import get_state_cache
+from api.stats import record_finished_games
+
+logger = logging.getLogger(__name__)
+
+STATEMENT_ROWS = 1000
+
+
+def enabled():
+    return getattr(settings, 'GAME_WRITE_BEHIND', False)
+
+
+class AttemptTaken(Exception):
+    """
+    A guess's attempt number is already queued for its game.
+    """
+
+
+class PendingGame:
+    """
+    guesses: (attempt number, word) of the queued guesses
+    """
+    __slots__ = ('word_to_guess', 'attempts', 'ended_at', 'hard_mode', 'guesses', 'created_at')
+
+    def __init__(self, word_to_guess=None, attempts=0, ended_at=None, hard_mode=False, guesses=(), created_at=None):
+        self.word_to_guess = word_to_guess
+        self.attempts = attempts
+        self.ended_at = ended_at
+        self.hard_mode = hard_mode
+        self.guesses = list(guesses)
+        self.created_at = created_at
+
+
+def insert_rows(cursor, table, columns, rows, suffix=''):
+    """
+    Multi-row INSERT of rows, STATEMENT_ROWS at a time. Returns the rows of
+    a RETURNING suffix, if any.
+    """
+    returned = []
+    for start in range(0, len(rows), STATEMENT_ROWS):
+        chunk = rows[start:start + STATEMENT_ROWS]
+        placeholders = ', '.join(['(' + ', '.join(['%s'] * len(columns)) + ')'] * len(chunk))
+        cursor.execute(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES {placeholders} {suffix}",
+            [value for row in chunk for value in row]
+        )
+        if cursor.description:
+            returned.extend(cursor.fetchall())
+    return returned
+
+
+def dropped_guesses(guesses, inserted):
+    """
+    Logs the queued guesses that were not inserted and are not stored from
+    an earlier flush either, so lost to a stored guess with the same attempt
+    number. Returns the ids of their games.
+    """
+    missing = [guess for guess in guesses if guess[0] not in inserted]
+    if not missing:
+        return set()
+    stored = set(Guess.objects.filter(id__in=[guess[0] for guess in missing]).values_list('id', flat=True))
+    dropped = [guess for guess in missing if guess[0] not in stored]
+    for guess in dropped:
+        logger.warning("Dropping write-behind guess %r: its attempt number is taken", guess)
+    return {guess[1] for guess in dropped}
+
+
+def update_ended_at(cursor, ended):
+    """
+    Sets ended_at of games that have not ended yet; returns their ids.
+    """
+    updated = []
+    rows = list(ended.items())
+    for start in range(0, len(rows), STATEMENT_ROWS):
+        chunk = rows[start:start + STATEMENT_ROWS]
+        placeholders = ', '.join(['(%s::uuid, %s::timestamptz)'] * len(chunk))
+        cursor.execute(
+            f"UPDATE {Game._meta.db_table} AS g SET ended_at = v.ended_at "
+            f"FROM (VALUES {placeholders}) AS v(game_id, ended_at) "
+            f"WHERE g.game_id = v.game_id AND g.ended_at IS NULL RETURNING g.game_id",
+            [value for row in chunk for value in row]
+        )
+        updated.extend(game_id for game_id, in cursor.fetchall())
+    return updated
+
+
+class WriteBehindBuffer:
+    def __init__(self, interval=1.0, max_events=10000):
+        self.interval = interval
+        self.max_events = max_events
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._games = {}
+        self._guesses = []
+        self._ended = {}
+        self._attempts = {}
+
+    def _drain(self):
+        """
+        Empties the buffer and returns what it held, as (games, guesses,
+        ended, attempts). Called with the lock held.
+        """
+        drained = self._games, self._guesses, self._ended, self._attempts
+        self._games, self._guesses, self._ended, self._attempts = {}, [], {}, {}
+        return drained
+
+    def _requeue(self, games, guesses, ended, attempts):
+        """
+        Puts drained events back ahead of those queued since. Called with
+        the lock held.
+        """
+        for game_id, row in games.items():
+            self._games.setdefault(game_id, row)
+        self._guesses[:0] = guesses
+        for game_id, ended_at in ended.items():
+            self._ended.setdefault(game_id, ended_at)
+        for game_id, attempt in attempts.items():
+            self._attempts[game_id] = max(self._attempts.get(game_id, 0), attempt)
+
+    def __len__(self):
+        return len(self._games) + len(self._guesses) + len(self._ended)
+
+    def _full(self, events):
+        """
+        Whether adding events would overflow the buffer. An empty buffer
+        takes any number, so that a batch larger than max_events can still
+        be queued after a flush.
+        """
+        return len(self) > 0 and len(self) + events > self.max_events
+
+    def add_game(self, game):
+        """
+        Queues a new game; returns False if the buffer is full.
+        """
+        with self._lock:
+            if self._full(1):
+                return False
+            self._games[str(game.id)] = (
+                game.word_to_guess, game.created_at or timezone.now(), game.ended_at, game.player_id, game.hard_mode
+            )
+        return True
+
+    def add_guesses(self, guesses, ended=None):
+        """
+        Queues guesses and the end times of the games they finish; returns
+        False if the buffer is full. Raises AttemptTaken, queueing nothing,
+        if an attempt number is taken by a queued guess.
+        """
+        ended = ended or {}
+        with self._lock:
+            taken = {
+                str(guess.game_id) for guess in guesses
+                if guess.attempt_number <= self._attempts.get(str(guess.game_id), 0)
+            }
+            if taken:
+                raise AttemptTaken(', '.join(sorted(taken)))
+            if self._full(len(guesses) + len(ended)):
+                return False
+            now = timezone.now()
+            for guess in guesses:
+                game_id = str(guess.game_id)
+                self._guesses.append((guess.id, game_id, guess.guessed_word, now,
+                                      guess.result_pattern_id, guess.attempt_number, guess.game_created_at))
+                self._attempts[game_id] = max(self._attempts.get(game_id, 0), guess.attempt_number)
+            self._end_games(ended)
+        return True
+
+    def end_game(self, game_id, ended_at):
+        """
+        Queues the end of a game; returns False if the buffer is full.
+        Raises ValueError if game_id is not a UUID.
+        """
+        game_id = str(uuid.UUID(str(game_id)))
+        with self._lock:
+            if self._full(1):
+                return False
+            self._end_games({game_id: ended_at})
+        return True
+
+    def _end_games(self, ended):
+        for game_id, ended_at in ended.items():
+            game_id = str(game_id)
+            if game_id in self._games:
+                word, created_at, _, player_id, hard_mode = self._games[game_id]
+                self._games[game_id] = (word, created_at, ended_at, player_id, hard_mode)
+            else:
+                self._ended[game_id] = ended_at
+
+    def pending_games(self, game_ids):
+        """
+        Returns {game id: PendingGame} for queued state of the given games.
+        Attempt numbers are absolute, so callers combine them with stored
+        attempts using max() and are unaffected by a concurrent flush.
+        """
+        pending = {}
+        with self._lock:
+            for game_id in game_ids:
+                game = self._games.get(game_id)
+                attempts = self._attempts.get(game_id, 0)
+                ended_at = game[2] if game else self._ended.get(game_id)
+                if game or attempts or ended_at:
+                    pending[game_id] = PendingGame(
+                        game[0] if game else None, attempts, ended_at, bool(game and game[4]),
+                        created_at=game[1] if game else None
+                    )
+            for _, game_id, word, _, _, attempt, _ in self._guesses:
+                if game_id in pending:
+                    pending[game_id].guesses.append((attempt, word))
+        return pending
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                games, guesses, ended, attempts = self._drain()
+            if not (games or guesses or ended):
+                return
+            try:
+                try:
+                    dropped = self._write(games, guesses, ended)
+                except (DataError, IntegrityError):
+                    logger.exception("Write-behind flush failed, writing its events one at a time")
+                    dropped = self._write_each(games, guesses, ended)
+            except Exception:
+                logger.exception("Write-behind flush failed, requeueing %d events", len(games) + len(guesses) + len(ended))
+                with self._lock:
+                    self._requeue(games, guesses, ended, attempts)
+                raise
+            cache = get_state_cache()
+            if dropped and cache is not None:
+                cache.delete_many(dropped)
+
+    @staticmethod
+    @transaction.atomic
+    def _write(games, guesses, ended):
+        """
+        Writes the events; returns the ids of the games some of whose guesses
+        were dropped because their attempt number was taken.
+        """
+        finished = []
+        dropped = set()
+        with connection.cursor() as cursor:
+            if games:
+                inserted = insert_rows(
+                    cursor, Game._meta.db_table, ['game_id', 'word_to_guess', 'created_at', 'ended_at', 'player_id', 'hard_mode'],
+                    [(game_id, *row) for game_id, row in games.items()], 'ON CONFLICT DO NOTHING RETURNING game_id, ended_at'
+                )
+                finished.extend(game_id for game_id, ended_at in inserted if ended_at is not None)
+            if guesses:
+                inserted = insert_rows(
+                    cursor, Guess._meta.db_table,
+                    ['guess_id', 'game_id', 'guessed_word', 'created_at', 'result_pattern_id', 'attempt_number',
+                     'game_created_at'],
+                    guesses, 'ON CONFLICT DO NOTHING RETURNING guess_id'
+                )
+                dropped = dropped_guesses(guesses, {guess_id for guess_id, in inserted})
+            if ended:
+                finished.extend(update_ended_at(cursor, ended))
+        record_finished_games(finished)
+        return dropped
+
+    def _write_each(self, games, guesses, ended):
+        """
+        Writes the events one at a time, dropping those that fail with
+        IntegrityError or DataError. Rewriting events that were written
+        already does nothing, so the whole flush can still be requeued if
+        another error stops this halfway. Returns what _write does.
+        """
+        events = (
+            [({game_id: row}, [], {}) for game_id, row in games.items()]
+            + [({}, [guess], {}) for guess in guesses]
+            + [({}, [], {game_id: ended_at}) for game_id, ended_at in ended.items()]
+        )
+        dropped = set()
+        for event in events:
+            try:
+                dropped |= self._write(*event)
+            except (DataError, IntegrityError):
+                logger.exception("Dropping write-behind event %r", event)
+        return dropped
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='game-write-behind', daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+
+    def stop(self):
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:  # already logged, retried on the next tick
+                pass
+            finally:
+                close_old_connections()
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    global _buffer  # pylint: disable=global-statement
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                buffer = WriteBehindBuffer(
+                    getattr(settings, 'GAME_WRITE_BEHIND_INTERVAL', 1.0),
+                    getattr(settings, 'GAME_WRITE_BEHIND_MAX_EVENTS', 10000)
+                )
+                buffer.start()
+                _buffer = buffer
+    return _buffer
+
+
+async def enqueue(add, *args):
+    """
+    Calls one of the buffer's add methods, flushing first whenever the
+    buffer is full. A flush empties the buffer, which then takes any event,
+    so this only loops again if other requests fill it in between.
+    """
+    while not add(*args):
+        await sync_to_async(get_buffer().flush)()
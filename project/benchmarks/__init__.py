@@ -0,0 +1,21 @@
+"""
+Benchmarks for the game API.
+
+Run from the project directory:
+
+    python -m benchmarks                      # all suites
+    python -m benchmarks --suite micro        # no database needed
+    python -m benchmarks --compare old.json   # print the change against an earlier run
+
+Suites:
+
+* micro: scoring, validation and dictionary lookups, in process;
+* client: POST/PUT /api/game/ and guess submission through Django's test
+  client, against a freshly migrated benchmark database;
+* server: the same requests over HTTP against a local gunicorn process in
+  each SERVER_MODE (uvicorn workers for asgi, sync workers for wsgi).
+
+Every benchmark reports ops/s and p50/p90/p99 latency. Results are written as
+JSON (by default to benchmarks/results/<commit>.json) so runs of different
+commits can be compared.
+"""
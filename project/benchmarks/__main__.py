@@ -0,0 +1,116 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+from pathlib import Path
+
+import django
+
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+SUITES = ('micro', 'client', 'server', 'auth')
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description="Benchmarks the game API.")
+    parser.add_argument('--suite', choices=SUITES, action='append', help="Suites to run (default: all)")
+    parser.add_argument('--samples', type=int, default=200, help="Samples per micro-benchmark")
+    parser.add_argument('--rounds', type=int, default=100, help="Rounds of the API flow for the client suite")
+    parser.add_argument('--modes', nargs='+', default=['asgi', 'wsgi'], help="SERVER_MODEs for the server and auth suites")
+    parser.add_argument('--workers', type=int, default=2, help="gunicorn workers")
+    parser.add_argument('--concurrency', type=int, default=8, help="Client threads for the server and auth suites")
+    parser.add_argument('--duration', type=float, default=10.0, help="Seconds of load per server mode")
+    parser.add_argument('--output', help="Results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument('--compare', help="Earlier results file to compare with")
+    return parser.parse_args(argv)
+
+
+def run(options):
+    from django.db import connection  # pylint: disable=import-outside-toplevel
+
+    from benchmarks import auth, client, flows, micro, server  # pylint: disable=import-outside-toplevel
+
+    suites = options.suite or list(SUITES)
+    results = {}
+    if 'micro' in suites:
+        results['micro'] = micro.run(options.samples)
+    if {'client', 'server', 'auth'} & set(suites):
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            words = flows.seed_dictionary()
+            if 'client' in suites:
+                results['client'] = client.run(words, options.rounds)
+            if 'server' in suites:
+                results['server'] = server.run(
+                    words, options.modes, options.workers, options.concurrency, options.duration
+                )
+            if 'auth' in suites:
+                results['auth'] = auth.run(
+                    words, options.modes, options.workers, options.concurrency, options.duration
+                )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+    return results
+
+
+def flatten(results, prefix=''):
+    for name, value in results.items():
+        if 'p50_ms' in value:
+            yield prefix + name, value
+        else:
+            yield from flatten(value, f'{prefix}{name}/')
+
+
+def compare(results, baseline):
+    old = dict(flatten(baseline))
+    print(f"{'benchmark':60} {'p50 ms':>10} {'change':>8} {'ops/s':>12} {'change':>8}")
+    for name, new in flatten(results):
+        before = old.get(name)
+        p50 = ops = ''
+        if before and before['p50_ms'] and before['ops_per_sec']:
+            p50 = f"{(new['p50_ms'] / before['p50_ms'] - 1) * 100:+.1f}%"
+            ops = f"{(new['ops_per_sec'] / before['ops_per_sec'] - 1) * 100:+.1f}%"
+        print(f"{name:60} {new['p50_ms']:>10.4f} {p50:>8} {new['ops_per_sec']:>12.1f} {ops:>8}")
+
+
+def main(argv=None):
+    options = parse_args(sys.argv[1:] if argv is None else argv)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+    django.setup()
+
+    commit = git_commit()
+    report = {
+        'commit': commit,
+        'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'options': vars(options),
+        'results': run(options),
+    }
+
+    output = Path(options.output) if options.output else RESULTS_DIR / f"{commit or 'results'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding='utf-8')
+    print(f"Results written to {output}")
+
+    if options.compare:
+        compare(report['results'], json.loads(Path(options.compare).read_text(encoding='utf-8'))['results'])
+    else:
+        compare(report['results'], {})
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""
+Signup and login throughput over HTTP against a local gunicorn process,
+and how much the password hashing they do slows game requests down: the
+game flow is timed alone, then alongside signups and logins.
+"""
+import http.client
+import re
+import threading
+import time
+import uuid
+from urllib.parse import urlencode
+
+from benchmarks.server import free_port, load, start_server, wait_until_ready
+from benchmarks.timing import summarize
+
+SIGNUP = 'POST / (register)'
+LOGIN = 'POST /login/'
+PASSWORD = 'Benchmark-Password-42'
+
+CSRF_INPUT = re.compile(rb'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+
+class Browser:
+    """
+    A keep-alive connection that keeps the cookies it is sent.
+    """
+    def __init__(self, port):
+        self.conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        self.cookies = {}
+
+    def request(self, method, path, form=None):
+        headers = {'Cookie': '; '.join(f'{name}={value}' for name, value in self.cookies.items())}
+        body = None
+        if form is not None:
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+            body = urlencode(form).encode()
+        self.conn.request(method, path, body=body, headers=headers)
+        response = self.conn.getresponse()
+        for header in response.headers.get_all('Set-Cookie') or []:
+            name, _, value = header.split(';', 1)[0].partition('=')
+            self.cookies[name.strip()] = value
+        return response.status, response.read()
+
+    def submit(self, path, form):
+        """
+        Gets the form page for its CSRF token, then posts the form.
+        """
+        status, content = self.request('GET', path)
+        if status != 200:
+            raise RuntimeError(f"GET {path} returned {status}")
+        form = dict(form, csrfmiddlewaretoken=CSRF_INPUT.search(content).group(1).decode())
+        return self.request('POST', path, form)
+
+    def close(self):
+        self.conn.close()
+
+
+def sign_up_and_log_in(port, durations):
+    """
+    Registers a new user, then logs in as them from a fresh session.
+    Appends the duration of each POST to durations[name].
+    """
+    username = f'bench-{uuid.uuid4().hex[:12]}'
+    steps = [
+        (SIGNUP, '/', {
+            'username': username, 'email': f'{username}@example.com', 'password1': PASSWORD, 'password2': PASSWORD,
+        }),
+        (LOGIN, '/login/', {'username': username, 'password': PASSWORD}),
+    ]
+    for name, path, form in steps:
+        browser = Browser(port)
+        try:
+            start = time.perf_counter()
+            status, content = browser.submit(path, form)
+            durations.setdefault(name, []).append(time.perf_counter() - start)
+        finally:
+            browser.close()
+        if status != 302:
+            raise RuntimeError(f"{name} returned {status}: {content[:200]!r}")
+
+
+def auth_load(port, concurrency, duration):
+    """
+    Signs up and logs in from `concurrency` threads for `duration` seconds.
+    """
+    durations = {}
+    errors = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def worker():
+        own = {}
+        try:
+            while time.monotonic() < deadline:
+                sign_up_and_log_in(port, own)
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            errors.append(error)
+        finally:
+            with lock:
+                for name, values in own.items():
+                    durations.setdefault(name, []).extend(values)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    if errors:
+        raise errors[0]
+    return durations, elapsed
+
+
+def game_summary(durations, elapsed):
+    return summarize([value for values in durations.values() for value in values], elapsed)
+
+
+def run(words, modes=('asgi', 'wsgi'), workers=2, concurrency=8, duration=10.0):
+    results = {}
+    for mode in modes:
+        port = free_port()
+        process = start_server(mode, port, workers)
+        try:
+            wait_until_ready(process, port)
+            load(port, words[0], 2, min(duration, 2.0))  # warm up workers
+            game_alone = game_summary(*load(port, words[0], 2, duration))
+
+            auth = {}
+
+            def sign_ups():
+                auth['durations'], auth['elapsed'] = auth_load(port, concurrency, duration)
+            thread = threading.Thread(target=sign_ups)
+            thread.start()
+            game_during_auth = game_summary(*load(port, words[0], 2, duration))
+            thread.join()
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+        if 'durations' not in auth:
+            raise RuntimeError("auth load failed")
+        results[mode] = {name: summarize(values, auth['elapsed']) for name, values in auth['durations'].items()}
+        results[mode]['game requests alone'] = game_alone
+        results[mode]['game requests during auth load'] = game_during_auth
+    return results
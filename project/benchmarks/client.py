@@ -0,0 +1,26 @@
+"""
+The API flow through Django's test client: the full request/response cycle
+in process, without a server or network.
+"""
+from django.test import Client
+
+from benchmarks.flows import play_round
+from benchmarks.timing import summarize
+
+
+def run(words, rounds=100):
+    client = Client()
+
+    def send(method, path, body):
+        if method == 'POST':
+            response = client.post(path, data=body, content_type='application/json') if body else client.post(path)
+        else:
+            response = client.generic(method, path, data=body, content_type='application/json')
+        return response.status_code, response.content
+
+    play_round(send, words[0], {})  # warm up caches
+    durations = {}
+    for _ in range(rounds):
+        play_round(send, words[0], durations)
+    return {name: summarize(values) for name, values in durations.items()}
+
@@ -0,0 +1,65 @@
+"""
+The API request flow timed by the client and server suites. Each round
+starts BATCH_SIZE + 1 games, makes a single guess in the first, submits one
+batch with a guess for each of the others and finishes them all.
+"""
+import json
+import time
+
+from django.db import connection, transaction
+
+from api.dictionary import invalidate_dictionary
+from api.models import DictionaryVersion, DictionaryWord
+
+from benchmarks.micro import sample_words
+
+CREATE_GAME = 'POST /api/game/'
+GUESS = 'POST /api/guess/'
+GUESS_BATCH = 'POST /api/guess/ (batch of 10)'
+FINISH_GAME = 'PUT /api/game/'
+BATCH_SIZE = 10
+
+
+def seed_dictionary(count=5000):
+    words = sample_words(count)
+    with transaction.atomic():
+        # A queryset delete would send post_delete, and bump the version, per word
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {DictionaryWord._meta.db_table}")
+        DictionaryWord.objects.bulk_create(
+            DictionaryWord(word_text=word, complexity=i % 10 + 1) for i, word in enumerate(words)
+        )
+        DictionaryVersion.bump()
+    invalidate_dictionary()
+    return words
+
+
+def guess_body(game_ids, word):
+    return json.dumps({'guesses': [{'id': game_id, 'guess': word} for game_id in game_ids]})
+
+
+def finish_body(game_id):
+    return json.dumps({'id': game_id, 'isfinished': True})
+
+
+def play_round(send, word, durations):
+    """
+    send(method, path, body) performs a request and returns (status, body).
+    Appends the duration of every request to durations[name].
+    """
+    def timed(name, method, path, body=None):
+        start = time.perf_counter()
+        status, content = send(method, path, body)
+        durations.setdefault(name, []).append(time.perf_counter() - start)
+        if status != 200:
+            raise RuntimeError(f"{name} returned {status}: {content[:200]!r}")
+        return content
+
+    game_ids = [
+        json.loads(timed(CREATE_GAME, 'POST', '/api/game/'))['id']
+        for _ in range(BATCH_SIZE + 1)
+    ]
+    timed(GUESS, 'POST', '/api/guess/', guess_body(game_ids[:1], word))
+    timed(GUESS_BATCH, 'POST', '/api/guess/', guess_body(game_ids[1:], word))
+    for game_id in game_ids:
+        timed(FINISH_GAME, 'PUT', '/api/game/', finish_body(game_id))
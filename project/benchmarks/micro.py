@@ -0,0 +1,45 @@
+"""
+In-process micro-benchmarks of scoring, validation and dictionary lookups.
+"""
+import random
+
+from api.dictionary import DictionaryIndex
+from api.scoring import encode_words, score, score_many
+from api.validation import ALPHABET, WORD_LENGTH, is_valid_word, normalize_word, validate_words
+from main.forms import WordForm
+
+from benchmarks.timing import measure
+
+
+def sample_words(count, seed=0):
+    """
+    `count` distinct random 5-letter words over the Lithuanian alphabet.
+    """
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < count:
+        words.add(''.join(rng.choice(ALPHABET) for _ in range(WORD_LENGTH)))
+    return sorted(words)
+
+
+def run(samples=200, words=5000):
+    dictionary_words = sample_words(words)
+    rng = random.Random(1)
+    index = DictionaryIndex([(word, rng.randint(1, 10)) for word in dictionary_words])
+    encoded = encode_words(dictionary_words)
+    guess, target = dictionary_words[0], dictionary_words[-1]
+    lowercase = [word.lower() for word in dictionary_words[:100]]
+    missing = 'ŽŽŽŽŽ' if 'ŽŽŽŽŽ' not in index else 'ĄĄĄĄĄ'
+
+    return {
+        'scoring.score': measure(lambda: score(guess, target), samples, number=1000),
+        'scoring.score_many[64x{}]'.format(len(encoded)): measure(lambda: score_many(encoded[:64], encoded), samples // 10),
+        'validation.normalize_word': measure(lambda: normalize_word('mėnuo'), samples, number=1000),
+        'validation.is_valid_word': measure(lambda: is_valid_word('MĖNUO', normalized=True), samples, number=1000),
+        'validation.validate_words[100]': measure(lambda: validate_words(lowercase), samples, number=10),
+        'forms.WordForm': measure(lambda: WordForm(data={'word': 'mėnuo'}).is_valid(), samples, number=100),
+        'dictionary.contains_hit': measure(lambda: guess in index, samples, number=1000),
+        'dictionary.contains_miss': measure(lambda: missing in index, samples, number=1000),
+        'dictionary.random_word': measure(index.random_word, samples, number=1000),
+        'dictionary.random_word_band': measure(lambda: index.random_word(3, 5), samples, number=1000),
+    }
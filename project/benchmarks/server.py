@@ -0,0 +1,116 @@
+"""
+The API flow over HTTP against a local gunicorn process started with
+gunicorn.conf.py, from several client threads at once.
+"""
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+from django.db import connection
+
+from benchmarks.flows import play_round
+from benchmarks.timing import summarize
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(mode, port, workers):
+    env = dict(
+        os.environ,
+        SERVER_MODE=mode,
+        GUNICORN_BIND=f'127.0.0.1:{port}',
+        WEB_CONCURRENCY=str(workers),
+        DJANGO_SETTINGS_MODULE='benchmarks.settings',
+        BENCHMARK_DATABASE=connection.settings_dict['NAME'],
+    )
+    return subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py', '--log-level', 'warning'],
+        cwd=PROJECT_DIR, env=env
+    )
+
+
+def wait_until_ready(process, port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with {process.returncode}")
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            conn.request('GET', '/api/stats/')
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("gunicorn did not start in time")
+
+
+def load(port, word, concurrency, duration):
+    """
+    Plays rounds from `concurrency` threads, each with its own keep-alive
+    connection, for `duration` seconds.
+    """
+    durations = {}
+    errors = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def worker():
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        own = {}
+
+        def send(method, path, body):
+            headers = {'Content-Type': 'application/json'} if body else {}
+            conn.request(method, path, body=body.encode() if body else None, headers=headers)
+            response = conn.getresponse()
+            return response.status, response.read()
+
+        try:
+            while time.monotonic() < deadline:
+                play_round(send, word, own)
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            errors.append(error)
+        finally:
+            conn.close()
+            with lock:
+                for name, values in own.items():
+                    durations.setdefault(name, []).extend(values)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    if errors:
+        raise errors[0]
+    return durations, elapsed
+
+
+def run(words, modes=('asgi', 'wsgi'), workers=2, concurrency=8, duration=10.0):
+    results = {}
+    for mode in modes:
+        port = free_port()
+        process = start_server(mode, port, workers)
+        try:
+            wait_until_ready(process, port)
+            load(port, words[0], concurrency, min(duration, 2.0))  # warm up workers
+            durations, elapsed = load(port, words[0], concurrency, duration)
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+        results[mode] = {name: summarize(values, elapsed) for name, values in durations.items()}
+        results[mode]['all requests'] = summarize([value for values in durations.values() for value in values], elapsed)
+    return results
@@ -0,0 +1,17 @@
+"""
+Settings for benchmark runs: the project settings without DEBUG (which
+records every query), against the benchmark database.
+"""
+import os
+
+from project.settings import *  # noqa: F401,F403 pylint: disable=wildcard-import,unused-wildcard-import
+from project.settings import DATABASES
+
+DEBUG = False
+ALLOWED_HOSTS = ['127.0.0.1', 'localhost', 'testserver']
+
+DATABASES['default']['NAME'] = os.environ.get('BENCHMARK_DATABASE', DATABASES['default']['NAME'])
+DATABASES['default']['TEST'] = {'NAME': 'wordlas_benchmark'}
+
+LEADERBOARD_LISTEN = False
+RATE_LIMIT = False
@@ -0,0 +1,45 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from api.models import DictionaryVersion, DictionaryWord
+from benchmarks import client, flows, micro
+from benchmarks.timing import percentile, summarize
+
+
+class TimingTestCase(SimpleTestCase):
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 0.5), 50)
+        self.assertEqual(percentile(values, 0.99), 99)
+        self.assertEqual(percentile([7], 0.99), 7)
+
+    def test_summarize(self):
+        summary = summarize([0.001, 0.002, 0.003, 0.004], elapsed=0.002)
+        self.assertEqual(summary['count'], 4)
+        self.assertEqual(summary['ops_per_sec'], 2000)
+        self.assertAlmostEqual(summary['p50_ms'], 2)
+        self.assertAlmostEqual(summary['max_ms'], 4)
+
+
+class MicroBenchmarkTestCase(SimpleTestCase):
+    def test_run(self):
+        results = micro.run(samples=10, words=200)
+        self.assertIn('scoring.score', results)
+        self.assertTrue(all(result['count'] for result in results.values()))
+
+
+@override_settings(DICTIONARY_VERSION_CHECK_INTERVAL=0)
+class ClientBenchmarkTestCase(TestCase):
+    def test_run(self):
+        results = client.run(flows.seed_dictionary(200), rounds=1)
+        self.assertEqual(results[flows.CREATE_GAME]['count'], flows.BATCH_SIZE + 1)
+        self.assertEqual(results[flows.GUESS_BATCH]['count'], 1)
+        self.assertEqual(results[flows.FINISH_GAME]['count'], flows.BATCH_SIZE + 1)
+
+    def test_seed_dictionary_bumps_the_version_once(self):
+        flows.seed_dictionary(50)
+        with mock.patch.object(DictionaryVersion, 'bump') as bump:
+            words = flows.seed_dictionary(50)
+        bump.assert_called_once_with()
+        self.assertEqual(DictionaryWord.objects.count(), len(words))
@@ -0,0 +1,47 @@
+import math
+import time
+
+
+def percentile(sorted_values, fraction):
+    """
+    Nearest-rank percentile of already sorted values.
+    """
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(fraction * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(durations, elapsed=None):
+    """
+    Summary of per-operation durations in seconds. `elapsed` is the wall
+    time the operations took together, when they ran concurrently.
+    """
+    values = sorted(durations)
+    total = sum(values)
+    elapsed = total if elapsed is None else elapsed
+    return {
+        'count': len(values),
+        'ops_per_sec': len(values) / elapsed if elapsed else None,
+        'mean_ms': total / len(values) * 1000 if values else None,
+        'p50_ms': percentile(values, 0.50) * 1000 if values else None,
+        'p90_ms': percentile(values, 0.90) * 1000 if values else None,
+        'p99_ms': percentile(values, 0.99) * 1000 if values else None,
+        'max_ms': values[-1] * 1000 if values else None,
+    }
+
+
+def measure(operation, samples=200, number=1, warmup=10):
+    """
+    Times `samples` runs of `number` calls of operation() and summarizes the
+    mean time per call of each run.
+    """
+    for _ in range(warmup):
+        operation()
+    durations = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        for _ in range(number):
+            operation()
+        durations.append((time.perf_counter() - start) / number)
+    return summarize(durations)
@@ -0,0 +1,28 @@
+"""
+Gunicorn configuration.
+
+SERVER_MODE=asgi (the default) serves project.asgi through uvicorn workers,
+so an open request waiting on I/O does not hold a whole worker process.
+SERVER_MODE=wsgi falls back to the classic sync workers.
+
+GAME_WRITE_BEHIND=1 runs a single worker: queued game events are only
+visible in the process that queued them (see api.writebehind).
+"""
+import multiprocessing
+import os
+
+SERVER_MODE = os.environ.get('SERVER_MODE', 'asgi')
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+
+if SERVER_MODE == 'asgi':
+    wsgi_app = 'project.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+    workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+else:
+    wsgi_app = 'project.wsgi:application'
+    worker_class = 'sync'
+    workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+
+if os.environ.get('GAME_WRITE_BEHIND', '') == '1':
+    workers = 1
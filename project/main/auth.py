@@ -0,0 +1,98 @@
+"""
+Password hashing off the request path.
+
+Hashing a password takes a few hundred milliseconds of CPU on purpose. Run
+through sync_to_async, as Django's aauthenticate() does, it would hold the
+one thread an ASGI worker runs all its sync code (including every game
+request's queries) in. The login and register views instead hash in a pool
+of ``AUTH_HASHING_WORKERS`` threads per worker, which also bounds how many
+hashes a worker computes at once; further logins queue for a thread.
+
+The pool threads never touch the database: users are looked up and saved
+through sync_to_async as usual.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.hashers import verify_password
+from django.contrib.auth.models import User
+from django.contrib.auth.signals import user_login_failed
+from django.db import transaction
+
+BACKEND = 'django.contrib.auth.backends.ModelBackend'
+
+_executor = None
+_lock = threading.Lock()
+
+
+def get_hashing_executor():
+    global _executor  # pylint: disable=global-statement
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'AUTH_HASHING_WORKERS', 2), thread_name_prefix='auth-hashing'
+                )
+    return _executor
+
+
+async def run_hashing(func, *args):
+    """
+    Runs func(*args) in the hashing pool.
+    """
+    return await asyncio.get_running_loop().run_in_executor(get_hashing_executor(), func, *args)
+
+
+def find_user(username):
+    try:
+        return User._default_manager.get_by_natural_key(username)  # pylint: disable=protected-access
+    except User.DoesNotExist:
+        return None
+
+
+def save_user(user, update_fields=None):
+    with transaction.atomic():
+        user.save(update_fields=update_fields)
+
+
+async def authenticate_user(request, username, password):
+    """
+    What ModelBackend.authenticate() does, with the hashing in the pool.
+    Returns the user, ready for alogin(), or None.
+    """
+    user = await sync_to_async(find_user)(username)
+    if user is None:
+        # Hash anyway, so unknown usernames take as long as wrong passwords
+        await run_hashing(User().set_password, password)
+    else:
+        correct, must_update = await run_hashing(verify_password, password, user.password)
+        if correct and must_update:
+            await run_hashing(user.set_password, password)
+            await sync_to_async(save_user)(user, ['password'])
+        if correct and user.is_active:
+            user.backend = BACKEND
+            return user
+    await user_login_failed.asend(sender=__name__, credentials={'username': username}, request=request)
+    return None
+
+
+async def create_user(form):
+    """
+    Saves a valid UserRegisterForm, hashing the password in the pool. Raises
+    IntegrityError if the username or email was taken since the form was
+    validated.
+    """
+    user = await run_hashing(form.save, False)
+    await sync_to_async(save_user)(user)
+    return user
+
+
+def reset_hashing_executor():
+    global _executor  # pylint: disable=global-statement
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+        _executor = None
@@ -0,0 +1,28 @@
+"""
+Script bundles: the game scripts concatenated in load order and minified
+into one file, built by collectstatic (see main.storage). Pages include
+them with the script_bundle tag.
+"""
+import rjsmin
+
+# Bundle name -> its sources, in the order the page loads them
+BUNDLES = {
+    'js/game.min.js': [
+        'js/theme-toggle.js',
+        'js/word-grid.js',
+        'js/lithuanian-validation.js',
+        'js/main.js',
+    ],
+}
+
+
+def build_bundle(storage, sources):
+    """
+    The minified sources, read from storage, as one script.
+    """
+    parts = []
+    for source in sources:
+        with storage.open(source) as script:
+            parts.append(rjsmin.jsmin(script.read().decode('utf-8')))
+    # ';' keeps a script without a trailing semicolon from running into the next
+    return ';\n'.join(parts) + '\n'
@@ -1,6 +1,15 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
+from django.db.models.functions import Lower
+
+def users_with_email(email):
+    """
+    Users whose email matches case-insensitively, looked up through the
+    unique index on lower(email) (main migration 0001), which leaves out
+    blank emails.
+    """
+    return User.objects.alias(email_lower=Lower('email')).filter(email_lower=email.lower()).exclude(email='')
 
 class UserRegisterForm(UserCreationForm):
     email = forms.EmailField(required=True)
@@ -11,7 +20,7 @@ class UserRegisterForm(UserCreationForm):
 
     def clean_email(self):
         email = self.cleaned_data.get('email')
-        if User.objects.filter(email=email).exists():
+        if users_with_email(email).exists():
             raise forms.ValidationError('Email address already in use.')
         return email
 
@@ -24,13 +33,26 @@ class UserLoginForm(forms.Form):
         widget=forms.PasswordInput(attrs={'class': 'form-control', 'placeholder': 'Password'})
     )
 from django.core.exceptions import ValidationError
-import re
+
+from api.dictionary import get_dictionary
+from api.validation import is_valid_word, normalize_word
+
+class LithuanianWordField(forms.CharField):
+    """
+    CharField that normalizes (NFC, uppercase) before the length validators
+    run, so decomposed letters count as one character
+    """
+    def to_python(self, value):
+        value = super().to_python(value)
+        return normalize_word(value) if value else value
 
 class WordForm(forms.Form):
     """
-    Form for validating words with Lithuanian characters
+    Form for validating words with Lithuanian characters. With hard-mode
+    constraints (api.letters.Constraints), the word must also be a
+    dictionary word that uses every revealed hint.
     """
-    word = forms.CharField(
+    word = LithuanianWordField(
         max_length=5,
         min_length=5,
         widget=forms.TextInput(attrs={
@@ -39,17 +61,23 @@ class WordForm(forms.Form):
         })
     )
 
+    def __init__(self, *args, constraints=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.constraints = constraints
+
     def clean_word(self):
         """
         Custom validation to ensure only valid Lithuanian characters are used
         """
-        word = self.cleaned_data['word'].upper()
+        word = self.cleaned_data['word']
         
-        # Regex pattern for valid Lithuanian characters
-        # Lithuanian alphabet: A Ą B C Č D E Ę Ė F G H I Į Y J K L M N O P R S Š T U Ų Ū V Z Ž
-        lithuanian_pattern = r'^[AĄBCČDEĘĖFGHIĮYJKLMNOPRSŠTUŲŪVZŽ]{5}$'
-        
-        if not re.match(lithuanian_pattern, word):
+        if not is_valid_word(word, normalized=True):
             raise ValidationError('Žodyje gali būti naudojamos tik lietuviškos raidės.')
+
+        if self.constraints:
+            if word not in get_dictionary():
+                raise ValidationError('Tokio žodžio nėra žodyne.')
+            if not self.constraints.allows(word):
+                raise ValidationError('Sunkiuoju režimu reikia panaudoti visas atskleistas raides.')
         
         return word 
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from main.sessions import expire_sessions
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes expired sessions from django_session in batches, each in its own transaction. "
+        "Meant to run periodically (e.g. from cron) in place of clearsessions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help="Rows deleted per batch (default SESSION_EXPIRY_BATCH_SIZE)")
+        parser.add_argument('--max-batches', type=int, default=None, help="Stop after this many batches")
+        parser.add_argument('--pause', type=float, default=0.0, help="Seconds to sleep between batches")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size'] or getattr(settings, 'SESSION_EXPIRY_BATCH_SIZE', 5000)
+        deleted = expire_sessions(batch_size, options['max_batches'], options['pause'])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired sessions"))
@@ -0,0 +1,18 @@
+from django.db import migrations
+
+# A functional index, so clean_email's lower(email) lookup and the
+# uniqueness it checks are one index probe. Blank emails (users created
+# without one, e.g. through createsuperuser) are left out.
+CREATE_INDEX = "CREATE UNIQUE INDEX auth_user_email_lower_uniq ON auth_user (lower(email)) WHERE email <> '';"
+DROP_INDEX = "DROP INDEX auth_user_email_lower_uniq;"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_INDEX, DROP_INDEX),
+    ]
@@ -0,0 +1,44 @@
+"""
+Cached rendering of the pages that only vary by theme.
+
+With PAGE_CACHE on, a page is rendered once per theme with a placeholder in
+place of the CSRF token and kept in the PAGE_CACHE_ALIAS cache. Each request
+gets the cached HTML with its own token filled in.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.shortcuts import render
+from django.template.loader import render_to_string
+
+CSRF_PLACEHOLDER = 'CSRFTOKENPLACEHOLDER'
+
+THEMES = ('light', 'dark')
+
+
+def page_theme(request):
+    """
+    The theme cookie, or 'light' for any value the templates do not know.
+    """
+    theme = request.COOKIES.get('theme')
+    return theme if theme in THEMES else 'light'
+
+
+def render_page(request, template_name, context=None):
+    """
+    Like render(), for pages whose context is the same on every request
+    (e.g. unbound forms).
+    """
+    if not getattr(settings, 'PAGE_CACHE', False):
+        return render(request, template_name, context)
+
+    theme = page_theme(request)
+    cache = caches[getattr(settings, 'PAGE_CACHE_ALIAS', 'default')]
+    key = f'page:{template_name}:{theme}'
+    content = cache.get(key)
+    if content is None:
+        context = {**(context or {}), 'theme': theme, 'csrf_token': CSRF_PLACEHOLDER}
+        content = render_to_string(template_name, context, request)
+        cache.set(key, content, getattr(settings, 'PAGE_CACHE_TIMEOUT', 300))
+    return HttpResponse(content.replace(CSRF_PLACEHOLDER, get_token(request)))
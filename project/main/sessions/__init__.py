@@ -0,0 +1,89 @@
+"""
+Session engines, picked by the SESSION_BACKEND setting:
+
+* ``db`` (main.sessions.db): django_session rows, as Django's db engine;
+* ``cached_db`` (main.sessions.cached_db): the same rows, read through the
+  SESSION_CACHE_ALIAS cache. With several workers that cache must be shared
+  (e.g. Redis or memcached): a worker-local cache keeps serving a session
+  another worker logged out of;
+* ``signed_cookies``: Django's engine keeping the data in the cookie, so no
+  table at all, but sessions cannot be revoked before they expire.
+
+The two table-backed engines skip saves of sessions whose data is what was
+loaded, e.g. after setting a key to the value it had. Saving every request
+(SESSION_SAVE_EVERY_REQUEST) still writes, as it is meant to push back the
+expiry.
+
+Django only deletes expired rows on ``clearsessions``, in one statement.
+``expire_sessions`` deletes them in batches instead, each in its own
+transaction, and can be stopped after a number of batches, so it can run
+often (e.g. from cron) without long locks on the table.
+"""
+import time
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.db import transaction
+from django.utils import timezone
+
+
+class SkipUnchangedMixin:
+    """
+    For SessionBase subclasses. Remembers the serialized data a session was
+    loaded with and skips save() while it is the same.
+    """
+    _loaded_data = None
+
+    def _serialized(self, data):
+        return self.serializer().dumps(data)
+
+    def _unchanged(self, must_create):
+        return (
+            not must_create
+            and not getattr(settings, 'SESSION_SAVE_EVERY_REQUEST', False)
+            and self.session_key is not None
+            and self._loaded_data is not None
+            and self._serialized(self._session) == self._loaded_data
+        )
+
+    def load(self):
+        data = super().load()
+        self._loaded_data = self._serialized(data) if self.session_key is not None else None
+        return data
+
+    async def aload(self):
+        data = await super().aload()
+        self._loaded_data = self._serialized(data) if self.session_key is not None else None
+        return data
+
+    def save(self, must_create=False):
+        if self._unchanged(must_create):
+            return
+        super().save(must_create)
+        self._loaded_data = self._serialized(self._session)
+
+    async def asave(self, must_create=False):
+        if self._unchanged(must_create):
+            return
+        await super().asave(must_create)
+        self._loaded_data = self._serialized(self._session)
+
+
+def expire_sessions(batch_size=5000, max_batches=None, pause=0.0):
+    """
+    Deletes expired django_session rows, batch_size at a time, sleeping
+    pause seconds between batches. Returns the number deleted.
+    """
+    now = timezone.now()
+    deleted = batches = 0
+    while max_batches is None or batches < max_batches:
+        expired = Session.objects.filter(expire_date__lt=now).values('session_key')[:batch_size]
+        with transaction.atomic():
+            count, _ = Session.objects.filter(session_key__in=expired).delete()
+        deleted += count
+        batches += 1
+        if count < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+    return deleted
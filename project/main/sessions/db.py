@@ -0,0 +1,7 @@
+from django.contrib.sessions.backends import db
+
+from main.sessions import SkipUnchangedMixin
+
+
+class SessionStore(SkipUnchangedMixin, db.SessionStore):
+    pass
@@ -0,0 +1,25 @@
+from django.core.files.base import ContentFile
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+from main.bundles import BUNDLES, build_bundle
+
+
+class BundledStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """
+    WhiteNoise's storage (content-hashed names, gzip and brotli copies) that
+    also builds the script bundles from the collected sources.
+    """
+    def post_process(self, *args, **kwargs):
+        # WhiteNoise's override takes *args, **kwargs, passed on to Django's
+        # post_process(paths, dry_run=False, **options)
+        yield from self._post_process_bundles(*args, **kwargs)
+
+    def _post_process_bundles(self, paths, dry_run=False, **options):
+        if not dry_run:
+            paths = dict(paths)
+            for name, sources in BUNDLES.items():
+                if self.exists(name):
+                    self.delete(name)
+                self.save(name, ContentFile(build_bundle(self, sources).encode('utf-8')))
+                paths[name] = (self, name)
+        yield from super().post_process(paths, dry_run=dry_run, **options)
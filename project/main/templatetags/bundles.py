@@ -0,0 +1,18 @@
+from django import template
+from django.conf import settings
+from django.templatetags.static import static
+from django.utils.html import format_html_join
+
+from main.bundles import BUNDLES
+
+register = template.Library()
+
+
+@register.simple_tag
+def script_bundle(name):
+    """
+    A <script> tag for the bundle with STATIC_BUNDLES, otherwise one for
+    each of its sources.
+    """
+    names = [name] if getattr(settings, 'STATIC_BUNDLES', False) else BUNDLES[name]
+    return format_html_join('\n', '<script src="{}"></script>', ((static(script),) for script in names))
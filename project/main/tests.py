@@ -1,5 +1,33 @@
-from django.test import TestCase
-from .forms import WordForm
+import datetime
+import io
+import re
+import shutil
+import tempfile
+import threading
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.hashers import verify_password
+from django.contrib.auth.models import User
+from django.contrib.auth.signals import user_login_failed
+from django.contrib.sessions.models import Session
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.template.loader import render_to_string
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from api.dictionary import get_dictionary
+from api.letters import Constraints
+from api.models import DictionaryWord
+
+from .bundles import BUNDLES
+from .forms import UserRegisterForm, WordForm, users_with_email
+from .sessions import cached_db, db, expire_sessions
 
 # Create your tests here.
 
@@ -48,8 +76,303 @@ class LithuanianCharacterValidationTest(TestCase):
         form = WordForm(data={'word': ''})
         self.assertFalse(form.is_valid())
     
+    def test_decomposed_characters(self):
+        """Test that decomposed Ė and Ų are the same letters as the composed ones"""
+        form = WordForm(data={'word': 'MEILE\u0307'})
+        self.assertTrue(form.is_valid())
+        self.assertEqual(form.cleaned_data['word'], 'MEILĖ')
+
+        form = WordForm(data={'word': 'ŠU\u0328ŪŽĖ'})
+        self.assertTrue(form.is_valid())
+        self.assertEqual(form.cleaned_data['word'], 'ŠŲŪŽĖ')
+
     def test_case_insensitivity(self):
         """Test that lowercase letters are converted to uppercase"""
         form = WordForm(data={'word': 'labas'})
         self.assertTrue(form.is_valid())
         self.assertEqual(form.cleaned_data['word'], 'LABAS')
+
+
+@override_settings(DICTIONARY_VERSION_CHECK_INTERVAL=0)
+class HardModeWordFormTest(TestCase):
+    """Hard-mode constraints checked against the dictionary's letter index"""
+    def setUp(self):
+        for word in ['LAPAS', 'NAMAS', 'ŠAKĖS']:
+            DictionaryWord.objects.create(word_text=word, complexity=1)
+        get_dictionary()
+        self.constraints = Constraints(greens={1: 'A'}, min_counts={'S': 1, 'A': 2})
+
+    def test_words_using_the_hints_are_valid(self):
+        self.assertTrue(WordForm(data={'word': 'lapas'}, constraints=self.constraints).is_valid())
+        self.assertTrue(WordForm(data={'word': 'NAMAS'}, constraints=self.constraints).is_valid())
+
+    def test_words_leaving_out_hints_are_invalid(self):
+        form = WordForm(data={'word': 'ŠAKĖS'}, constraints=self.constraints)
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.errors['word'], ['Sunkiuoju režimu reikia panaudoti visas atskleistas raides.'])
+
+    def test_words_outside_the_dictionary_are_invalid(self):
+        self.assertTrue(self.constraints.allows('SASAS'))
+        form = WordForm(data={'word': 'SASAS'}, constraints=self.constraints)
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.errors['word'], ['Tokio žodžio nėra žodyne.'])
+
+
+@override_settings(
+    STORAGES={
+        'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        'staticfiles': {'BACKEND': 'main.storage.BundledStaticFilesStorage'},
+    },
+    STATIC_BUNDLES=True,
+    WHITENOISE_USE_FINDERS=False,
+    WHITENOISE_AUTOREFRESH=False,
+)
+class StaticFilesTest(TestCase):
+    """Production static files: collected, hashed, precompressed and bundled"""
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.static_root = override_settings(STATIC_ROOT=tempfile.mkdtemp())
+        cls.static_root.enable()
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(settings.STATIC_ROOT)
+        cls.static_root.disable()
+        super().tearDownClass()
+
+    def setUp(self):
+        # WhiteNoise indexes STATIC_ROOT when the middleware is created
+        self.client = Client()
+
+    def get(self, url, encoding):
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING=encoding)
+        self.assertEqual(response.status_code, 200)
+        # Reading the file through the client's wrapper also closes it
+        b''.join(response.streaming_content)
+        return response
+
+    def test_hashed_files_are_precompressed_and_immutable(self):
+        url = staticfiles_storage.url('js/game.min.js')
+        self.assertRegex(url, r'^/static/js/game\.min\.[0-9a-f]{12}\.js$')
+        for encoding, expected in [('br, gzip', 'br'), ('gzip', 'gzip'), ('', None)]:
+            response = self.get(url, encoding)
+            self.assertEqual(response.get('Content-Encoding'), expected)
+            self.assertIn('immutable', response['Cache-Control'])
+            self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+    def test_unhashed_files_are_not_immutable(self):
+        response = self.get('/static/js/game.min.js', 'gzip')
+        self.assertNotIn('immutable', response['Cache-Control'])
+
+    def test_bundle_is_minified_sources(self):
+        with staticfiles_storage.open('js/game.min.js') as bundle:
+            size = len(bundle.read())
+        sources = sum(staticfiles_storage.size(source) for source in BUNDLES['js/game.min.js'])
+        self.assertLess(size, sources)
+
+    def test_index_loads_the_bundle(self):
+        content = self.client.get(reverse('index')).content.decode()
+        self.assertIn(staticfiles_storage.url('js/game.min.js'), content)
+        self.assertIn(staticfiles_storage.url('css/styles.css'), content)
+        self.assertNotIn('js/main.js', content)
+
+
+@override_settings(PAGE_CACHE=True, PAGE_CACHE_ALIAS='default')
+class PageCacheTest(TestCase):
+    """Pages rendered once per theme, with a CSRF token per request"""
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def csrf_token(self, response):
+        return re.search(r'name="csrfmiddlewaretoken" value="([^"]+)"', response.content.decode()).group(1)
+
+    def test_pages_are_rendered_once_per_theme(self):
+        with mock.patch('main.pages.render_to_string', wraps=render_to_string) as rendered:
+            for theme in ['light', 'light', 'dark', 'unknown', 'dark']:
+                self.client.cookies['theme'] = theme
+                response = self.client.get(reverse('index'))
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual('data-theme="dark"' in response.content.decode(), theme == 'dark')
+        self.assertEqual(rendered.call_count, 2)
+
+    def test_each_request_gets_a_valid_csrf_token(self):
+        first, second = Client(enforce_csrf_checks=True), Client(enforce_csrf_checks=True)
+        first_token = self.csrf_token(first.get(reverse('user_login')))
+        second_token = self.csrf_token(second.get(reverse('user_login')))
+        self.assertNotEqual(first_token, second_token)
+
+        response = second.post(
+            reverse('user_login'), {'username': 'nobody', 'password': 'secret', 'csrfmiddlewaretoken': second_token}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Invalid username or password')
+
+    def test_bound_forms_are_not_cached(self):
+        self.client.get(reverse('register'))
+        self.assertContains(self.client.post(reverse('register'), {'username': 'nobody'}), 'errorlist')
+        self.assertNotContains(self.client.get(reverse('register')), 'errorlist')
+
+
+class UserEmailTest(TestCase):
+    """Emails unique regardless of case, through the lower(email) index"""
+    def setUp(self):
+        User.objects.create_user('pirmas', 'Vardas@Example.com', 'slaptas-žodis-1')
+
+    def form(self, email):
+        return UserRegisterForm({
+            'username': 'antras', 'email': email, 'password1': 'Kitas-Slaptazodis-7', 'password2': 'Kitas-Slaptazodis-7'
+        })
+
+    def test_email_check_ignores_case(self):
+        form = self.form('vardas@example.COM')
+        self.assertFalse(form.is_valid())
+        self.assertIn('email', form.errors)
+        self.assertTrue(self.form('kitas@example.com').is_valid())
+
+    def test_lookup_uses_the_index(self):
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            plan = users_with_email('vardas@example.com').explain()
+        self.assertIn('auth_user_email_lower_uniq', plan)
+
+    def test_index_rejects_emails_differing_in_case(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            User.objects.create_user('antras', 'VARDAS@example.com')
+        User.objects.create_user('be-pasto-1')
+        User.objects.create_user('be-pasto-2')
+
+
+class PooledHashingTest(TestCase):
+    """Login and registration hash passwords in main.auth's pool"""
+    password = 'Kitas-Slaptazodis-7'
+
+    def setUp(self):
+        self.threads = []
+
+    def record_thread(self, func):
+        def recorded(*args):
+            self.threads.append(threading.current_thread().name)
+            return func(*args)
+        return recorded
+
+    def register(self, username, email):
+        return self.client.post(reverse('register'), {
+            'username': username, 'email': email, 'password1': self.password, 'password2': self.password
+        })
+
+    def test_register(self):
+        with mock.patch.object(User, 'set_password', self.record_thread(User.set_password)):
+            response = self.register('naujas', 'naujas@example.com')
+        self.assertRedirects(response, reverse('index'), fetch_redirect_response=False)
+        self.assertTrue(User.objects.get(username='naujas').check_password(self.password))
+        self.assertEqual(len(self.threads), 1)
+        self.assertTrue(self.threads[0].startswith('auth-hashing'))
+
+    def test_register_race_is_a_form_error(self):
+        self.register('pirmas', 'vardas@example.com')
+        with mock.patch('main.forms.users_with_email', return_value=User.objects.none()):
+            response = self.register('antras', 'Vardas@example.com')
+        self.assertContains(response, 'Username or email address already in use.')
+        self.assertEqual(User.objects.count(), 1)
+
+    def test_login(self):
+        user = User.objects.create_user('pirmas', 'vardas@example.com', self.password)
+        with mock.patch('main.auth.verify_password', self.record_thread(verify_password)):
+            response = self.client.post(reverse('user_login'), {'username': 'pirmas', 'password': self.password})
+        self.assertRedirects(response, reverse('index'), fetch_redirect_response=False)
+        self.assertEqual(self.client.session['_auth_user_id'], str(user.pk))
+        self.assertTrue(self.threads[0].startswith('auth-hashing'))
+
+    def test_failed_logins(self):
+        User.objects.create_user('pirmas', 'vardas@example.com', self.password)
+        failed = []
+
+        def receiver(credentials, **kwargs):
+            failed.append(credentials['username'])
+        user_login_failed.connect(receiver)
+        self.addCleanup(user_login_failed.disconnect, receiver)
+        for username, password in [('pirmas', 'neteisingas'), ('nera', self.password)]:
+            response = self.client.post(reverse('user_login'), {'username': username, 'password': password})
+            self.assertContains(response, 'Invalid username or password')
+        self.assertNotIn('_auth_user_id', self.client.session)
+        self.assertEqual(failed, ['pirmas', 'nera'])
+
+
+class SessionStoreTest(TestCase):
+    """Table-backed sessions only write when their data changed"""
+    def setUp(self):
+        caches['sessions'].clear()
+
+    def saved_session(self, store_class):
+        store = store_class()
+        store['theme'] = 'dark'
+        store.save()
+        return store.session_key
+
+    def test_unchanged_sessions_are_not_written(self):
+        for store_class in [db.SessionStore, cached_db.SessionStore]:
+            with self.subTest(store_class.__module__):
+                store = store_class(self.saved_session(store_class))
+                store['theme'] = 'dark'
+                self.assertTrue(store.modified)
+                with mock.patch.object(Session, 'save') as save:
+                    store.save()
+                save.assert_not_called()
+
+    def test_changed_sessions_are_written(self):
+        for store_class in [db.SessionStore, cached_db.SessionStore]:
+            with self.subTest(store_class.__module__):
+                key = self.saved_session(store_class)
+                store = store_class(key)
+                store['theme'] = 'light'
+                store.save()
+                caches['sessions'].clear()
+                self.assertEqual(store_class(key)['theme'], 'light')
+
+    def test_cached_sessions_are_read_once(self):
+        key = self.saved_session(cached_db.SessionStore)
+        with self.assertNumQueries(0):
+            self.assertEqual(cached_db.SessionStore(key)['theme'], 'dark')
+
+    def test_logging_in_again_writes_nothing(self):
+        User.objects.create_user('pirmas', 'vardas@example.com', 'Kitas-Slaptazodis-7')
+        credentials = {'username': 'pirmas', 'password': 'Kitas-Slaptazodis-7'}
+        self.client.post(reverse('user_login'), credentials)
+        with mock.patch.object(Session, 'save') as save:
+            # login() sets the same keys to the same values
+            self.assertEqual(self.client.post(reverse('user_login'), credentials).status_code, 302)
+        save.assert_not_called()
+        self.assertEqual(Session.objects.count(), 1)
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies')
+    def test_signed_cookie_sessions_use_no_table(self):
+        user = User.objects.create_user('pirmas', 'vardas@example.com', 'Kitas-Slaptazodis-7')
+        self.client.post(reverse('user_login'), {'username': 'pirmas', 'password': 'Kitas-Slaptazodis-7'})
+        self.assertEqual(self.client.session['_auth_user_id'], str(user.pk))
+        self.assertFalse(Session.objects.exists())
+
+
+class ExpireSessionsTest(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        Session.objects.bulk_create(
+            [Session(session_key=f'expired{i:02}', session_data='', expire_date=now - datetime.timedelta(days=1))
+             for i in range(25)]
+            + [Session(session_key=f'live{i:02}', session_data='', expire_date=now + datetime.timedelta(days=1))
+               for i in range(5)]
+        )
+
+    def test_expired_sessions_are_deleted_in_batches(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(expire_sessions(batch_size=10), 25)
+        self.assertEqual(sum(query['sql'].startswith('DELETE') for query in queries), 3)
+        self.assertEqual(set(Session.objects.values_list('session_key', flat=True)), {f'live{i:02}' for i in range(5)})
+
+    def test_command_stops_after_max_batches(self):
+        out = io.StringIO()
+        call_command('expire_sessions', batch_size=10, max_batches=2, stdout=out)
+        self.assertIn('Deleted 20 expired sessions', out.getvalue())
+        self.assertEqual(Session.objects.count(), 10)
@@ -1,43 +1,55 @@
+from asgiref.sync import sync_to_async
 from django.shortcuts import render
-from django.contrib.auth import login, authenticate
+from django.contrib.auth import alogin
+from django.db import IntegrityError, transaction
 from django.shortcuts import render, redirect, get_object_or_404
 
 from .forms import UserRegisterForm, UserLoginForm
 from django.views.decorators.csrf import csrf_exempt
 from .forms import WordForm
+from .auth import authenticate_user, create_user
+from .pages import render_page
 
 # Create your views here.
 
 def index(request):
-    return render(request, 'index.html')
+    return render_page(request, 'index.html')
 
-def register(request):
+# Async so that password hashing runs in main.auth's pool, not in the
+# thread shared by all sync code of the worker.
+@transaction.non_atomic_requests
+async def register(request):
     if request.method == "POST":
         form = UserRegisterForm(request.POST)
-        if form.is_valid():
-            form.save()
-            return redirect('index')
+        if await sync_to_async(form.is_valid)():
+            try:
+                await create_user(form)
+            except IntegrityError:
+                form.add_error(None, "Username or email address already in use.")
+            else:
+                return redirect('index')
     else:
-        form = UserRegisterForm()
+        return render_page(request, 'register.html', {'form': UserRegisterForm()})
 
     return render(request, 'register.html', {'form': form})
 
-def user_login(request):
+@transaction.non_atomic_requests
+async def user_login(request):
     if request.method == "POST":
         form = UserLoginForm(request.POST)
         if form.is_valid():
             username = form.cleaned_data['username']
             password = form.cleaned_data['password']
-            user = authenticate(request, username=username, password=password)
+            user = await authenticate_user(request, username, password)
 
             if user is not None:
-                login(request, user)
+                await alogin(request, user)
                 return redirect("index")
             else:
                 form.add_error(None, "Invalid username or password")
 
     else:
-        form = UserLoginForm()
+        return render_page(request, 'login.html', {'form': UserLoginForm()})
 
     return render(request, 'login.html', {'form': form})
     form = WordForm()
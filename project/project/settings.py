@@ -43,6 +43,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Add WhiteNoise for static files
+    'api.middleware.RequestMetricsMiddleware',  # Only active with REQUEST_METRICS
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -71,6 +72,10 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'project.wsgi.application'
+ASGI_APPLICATION = 'project.asgi.application'
+
+# 'asgi' (uvicorn workers) or 'wsgi' (sync workers), see gunicorn.conf.py
+SERVER_MODE = os.environ.get('SERVER_MODE', 'asgi')
 
 
 # Database
@@ -93,6 +98,155 @@ DATABASES = {
     }
 }
 
+# Connection pool of each worker process (DATABASE_POOL=0 turns it off and
+# keeps persistent connections instead). (min_size, max_size) by SERVER_MODE:
+# a sync worker serves one request at a time, plus the write-behind and
+# leaderboard threads; an ASGI worker runs the queries of its concurrent
+# requests in separate threads. A request waits up to DATABASE_POOL_TIMEOUT
+# seconds for a free connection, then fails with OperationalError.
+DATABASE_POOL = os.environ.get('DATABASE_POOL', '1') == '1'
+DATABASE_POOL_SIZES = {
+    'asgi': (2, 10),
+    'wsgi': (1, 3),
+}
+DATABASE_POOL_TIMEOUT = 10
+
+if DATABASE_POOL:
+    _pool_min_size, _pool_max_size = DATABASE_POOL_SIZES.get(SERVER_MODE, DATABASE_POOL_SIZES['asgi'])
+    # Pooled connections go back to the pool at the end of each request,
+    # which Django requires to be configured as CONN_MAX_AGE = 0.
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    # With a pool, this makes it check a connection with a round trip before
+    # handing it out, so one dropped by the server is replaced instead of
+    # failing a request.
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': int(os.environ.get('DATABASE_POOL_MIN_SIZE', _pool_min_size)),
+        'max_size': int(os.environ.get('DATABASE_POOL_MAX_SIZE', _pool_max_size)),
+        'timeout': DATABASE_POOL_TIMEOUT,
+        'max_idle': 300,
+        'max_lifetime': 1800,
+    }
+
+# The game state cache (see api.state) uses the 'game_state' cache with
+# GAME_STATE_BACKEND=django; point it at a cache shared by all workers.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'game_state': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'game-state',
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'sessions',
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+    'ratelimit': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'ratelimit',
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+}
+
+# Session engine (see main.sessions): 'db', 'cached_db' (through the
+# SESSION_CACHE_ALIAS cache, which must be shared by all workers) or
+# 'signed_cookies'. expire_sessions deletes SESSION_EXPIRY_BATCH_SIZE
+# expired rows per transaction.
+SESSION_BACKEND = os.environ.get('SESSION_BACKEND', 'db')
+SESSION_ENGINE = {
+    'db': 'main.sessions.db',
+    'cached_db': 'main.sessions.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}[SESSION_BACKEND]
+SESSION_CACHE_ALIAS = 'sessions'
+SESSION_EXPIRY_BATCH_SIZE = 5000
+
+# Index, login and register pages rendered once per theme and cached (see
+# main.pages); on unless DEBUG, since template edits only show after
+# PAGE_CACHE_TIMEOUT seconds or a restart
+PAGE_CACHE = os.environ.get('PAGE_CACHE', '0' if DEBUG else '1') == '1'
+PAGE_CACHE_ALIAS = 'default'
+PAGE_CACHE_TIMEOUT = 300
+
+# Per-client limits of the game API (see api.ratelimit): requests per 's',
+# 'm', 'h' or 'd' by limit name, counted per worker ('local') or in the
+# RATE_LIMIT_CACHE cache ('django'). Behind proxies, RATE_LIMIT_IP_HEADER
+# names the header they append the client address to (e.g.
+# 'HTTP_X_FORWARDED_FOR') and RATE_LIMIT_TRUSTED_PROXIES how many of them
+# there are. Off under DEBUG unless RATE_LIMIT=1.
+RATE_LIMIT = os.environ.get('RATE_LIMIT', '0' if DEBUG else '1') == '1'
+RATE_LIMITS = {
+    'game': '30/m',
+    'guess': '120/m',
+    'hint': '30/m',
+}
+RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'local')
+RATE_LIMIT_CACHE = 'ratelimit'
+RATE_LIMIT_MAX_CLIENTS = 100000
+RATE_LIMIT_IP_HEADER = os.environ.get('RATE_LIMIT_IP_HEADER', '')
+RATE_LIMIT_TRUSTED_PROXIES = int(os.environ.get('RATE_LIMIT_TRUSTED_PROXIES', '1'))
+
+# Most guesses one POST /api/guess/ may submit (over any number of games)
+MAX_GUESSES_PER_REQUEST = 100
+
+# Per-game state cache for the guess API (see api.state): 'local' (an LRU
+# with TTL in each worker), 'django' (the GAME_STATE_CACHE cache) or 'none'
+GAME_STATE_BACKEND = os.environ.get('GAME_STATE_BACKEND', 'local')
+GAME_STATE_CACHE = 'game_state'
+GAME_STATE_MAX_GAMES = 100000
+GAME_STATE_TTL = 3600
+
+# Seconds between checks of the dictionary version stamp (see api.dictionary)
+DICTIONARY_VERSION_CHECK_INTERVAL = 30
+
+# Daily word schedule (see api.daily): days precomputed ahead, and the number
+# of days within which a daily word is not repeated
+DAILY_WORD_DAYS_AHEAD = 120
+DAILY_WORD_REPEAT_WINDOW = 365
+
+# Hints (see api.hints): games whose candidates each worker keeps, for how
+# many seconds, and the number of ranked guesses returned
+HINT_MAX_GAMES = 10000
+HINT_TTL = 3600
+HINT_SUGGESTIONS = 5
+
+# Rows the global stats are spread over (see api.stats)
+GLOBAL_STATS_SHARDS = 16
+
+# Write-behind buffering of game starts, guesses and ends (see api.writebehind).
+# The interval is the durability window: queued events are lost if a worker
+# is killed before its next flush. Queued events are only visible to the
+# worker that queued them, so gunicorn.conf.py runs a single worker with it.
+GAME_WRITE_BEHIND = os.environ.get('GAME_WRITE_BEHIND', '') == '1'
+GAME_WRITE_BEHIND_INTERVAL = float(os.environ.get('GAME_WRITE_BEHIND_INTERVAL', 1.0))
+GAME_WRITE_BEHIND_MAX_EVENTS = 10000
+
+# Workers keep the leaderboards in memory and follow finished games through
+# Postgres LISTEN/NOTIFY; without it they re-read recent games at most every
+# LEADERBOARD_REFRESH_INTERVAL seconds.
+LEADERBOARD_LISTEN = os.environ.get('LEADERBOARD_LISTEN', '1') == '1'
+LEADERBOARD_REFRESH_INTERVAL = 5
+
+# game_sessions and game_guesses are partitioned by month: create_partitions
+# keeps this many months ahead, archive_partitions exports and drops months
+# older than the retention period into GAME_ARCHIVE_DIR.
+GAME_PARTITION_MONTHS_AHEAD = 3
+GAME_RETENTION_MONTHS = 12
+GAME_ARCHIVE_DIR = os.environ.get('GAME_ARCHIVE_DIR', str(BASE_DIR / 'archive'))
+
+# Opt-in request metrics served at /metrics (see api.middleware and
+# api.metrics). With several workers, REQUEST_METRICS_DIR should be a
+# directory they share, so /metrics adds all of them up. A
+# REQUEST_METRICS_PROFILE_RATE share of requests (0-1) is dumped as cProfile
+# files into REQUEST_METRICS_PROFILE_DIR.
+REQUEST_METRICS = os.environ.get('REQUEST_METRICS', '') == '1'
+REQUEST_METRICS_DIR = os.environ.get('REQUEST_METRICS_DIR', '')
+REQUEST_METRICS_PROFILE_RATE = float(os.environ.get('REQUEST_METRICS_PROFILE_RATE', 0))
+REQUEST_METRICS_PROFILE_DIR = os.environ.get('REQUEST_METRICS_PROFILE_DIR', str(BASE_DIR / 'profiles'))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -112,6 +266,10 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Threads per worker that hash passwords for the login and register views
+# (see main.auth), and so the most hashes a worker computes at once.
+AUTH_HASHING_WORKERS = int(os.environ.get('AUTH_HASHING_WORKERS', 2))
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
@@ -132,10 +290,30 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = [os.path.join(BASE_DIR, "main/static")]
 STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
 
-# WhiteNoise configuration
-WHITENOISE_USE_FINDERS = True
+# Production static files (STATIC_PRODUCTION, on unless DEBUG): content-hashed
+# names from a manifest, gzip and brotli copies made by collectstatic and
+# served by WhiteNoise with immutable cache headers, and the game scripts as
+# one minified bundle (see main.bundles). Needs collectstatic before starting.
+STATIC_PRODUCTION = os.environ.get('STATIC_PRODUCTION', '0' if DEBUG else '1') == '1'
+STATIC_BUNDLES = STATIC_PRODUCTION
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'main.storage.BundledStaticFilesStorage' if STATIC_PRODUCTION
+            else 'django.contrib.staticfiles.storage.StaticFilesStorage'
+        ),
+    },
+}
+
+# WhiteNoise configuration: in development files are found (and rescanned)
+# at request time, in production only STATIC_ROOT is indexed, once at startup
+WHITENOISE_USE_FINDERS = not STATIC_PRODUCTION
 WHITENOISE_MANIFEST_STRICT = False
-WHITENOISE_AUTOREFRESH = True
+WHITENOISE_AUTOREFRESH = not STATIC_PRODUCTION
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field